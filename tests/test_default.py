@@ -21,4 +21,1315 @@ def test_image_pane():
 def test_plane_outline_factory():
   ''' is no longer used it seems'''
   from vtkAtamai import PlaneOutlineFactory
-  o = PlaneOutlineFactory.PlaneOutlineFactory()
\ No newline at end of file
+  o = PlaneOutlineFactory.PlaneOutlineFactory()
+
+def test_dirty_propagation():
+  '''modifications are pushed from factories to the pane'''
+  import vtk
+  from vtkAtamai import ActorFactory, RenderPane
+
+  pane = RenderPane.RenderPane()
+  parent = ActorFactory.ActorFactory()
+  child = ActorFactory.ActorFactory()
+  parent.AddChild(child)
+  pane.ConnectActorFactory(parent)
+
+  # EndRender is what clears the flag after a real render
+  pane.EndRender(None, None)
+  assert not pane.NeedsRender()
+
+  child.Modified()
+  assert pane.NeedsRender()
+  pane.EndRender(None, None)
+
+  child.GetTransform().Translate(1.0, 0.0, 0.0)
+  assert pane.NeedsRender()
+  pane.EndRender(None, None)
+
+  # an external transform input is watched as well
+  transform = vtk.vtkTransform()
+  child.GetTransform().SetInput(transform)
+  pane.EndRender(None, None)
+  transform.RotateX(10.0)
+  assert pane.NeedsRender()
+  pane.EndRender(None, None)
+
+  pane.DisconnectActorFactory(parent)
+  pane.EndRender(None, None)
+  child.Modified()
+  assert not pane.NeedsRender()
+
+def test_dirty_polling_fallback():
+  '''factories that only override HasChangedSince are still polled'''
+  import vtk
+  from vtkAtamai import ActorFactory, RenderPane
+
+  class PolledFactory(ActorFactory.ActorFactory):
+    def __init__(self):
+      ActorFactory.ActorFactory.__init__(self)
+      self.table = vtk.vtkLookupTable()
+    def HasChangedSince(self, sinceMTime):
+      if ActorFactory.ActorFactory.HasChangedSince(self, sinceMTime):
+        return 1
+      return self.table.GetMTime() > sinceMTime
+
+  pane = RenderPane.RenderPane()
+  factory = PolledFactory()
+  pane.ConnectActorFactory(factory)
+  pane.EndRender(None, None)
+  assert not pane.NeedsRender()
+  factory.table.SetTableRange(0, 10)
+  assert pane.NeedsRender()
+
+def test_event_benchmark():
+  '''scripted events can be replayed through an offscreen frame'''
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, EventBenchmark
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  frame.SetSize(200, 200)
+
+  benchmark = EventBenchmark.EventBenchmark(frame)
+  events = EventBenchmark.DragScript(50, 50, 150, 150, steps=5,
+                                     width=200, height=200)
+  benchmark.Run(events, repeat=2)
+  stats = benchmark.GetStatistics()
+  assert stats['event']['count'] == 2 * len(events)
+  assert stats['dispatch']['p50'] <= stats['dispatch']['max']
+  assert stats['render']['count'] > 0
+  benchmark.tearDown()
+  frame.tearDown()
+
+def test_event_recorder():
+  '''recorded events are replayed with the same attributes'''
+  import io
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, EventBenchmark
+  from vtkAtamai import EventRecorder
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  frame.SetSize(200, 200)
+
+  log = io.BytesIO()
+  recorder = EventRecorder.EventRecorder(frame, log)
+  recorder.Start()
+  events = EventBenchmark.DragScript(50, 50, 150, 150, steps=5,
+                                     width=200, height=200)
+  for e in events:
+    frame.HandleEvent(e)
+  interactor = frame.GetRenderWindow().GetInteractor()
+  interactor.SetEventInformation(100, 100, 0, 0)
+  interactor.MouseWheelForwardEvent()
+  recorder.Stop()
+  assert 'HandleEvent' not in frame.__dict__
+
+  log.seek(0)
+  records = EventRecorder.ReadEventLog(log)
+  kinds = [r[1] for r in records]
+  assert kinds[0] == EventRecorder.GEOMETRY
+  assert kinds.count(EventRecorder.EVENT) == len(events)
+  assert kinds[-1] == EventRecorder.WHEEL_FORWARD
+  first = records[1][2]
+  assert (first.type, first.num, first.x, first.y) == ('4', 1, 50, 50)
+  assert records[0][2] == (200, 200, [(0, 0, 200, 200)])
+
+  other = OffscreenPaneFrame.OffscreenPaneFrame(100, 100)
+  RenderPane.RenderPane(other)
+  log.seek(0)
+  n = EventRecorder.EventReplayer(other).Replay(log)
+  assert n == len(records)
+  assert other.GetSize() == (200, 200)
+  frame.tearDown()
+  other.tearDown()
+
+def test_motion_coalescing():
+  '''held motion events collapse into the latest one, in order'''
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, EventBenchmark
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  frame.SetSize(200, 200)
+
+  seen = []
+  pane.BindEvent('<ButtonPress-1>', lambda e: seen.append(('press', e.x)))
+  pane.BindEvent('<B1-Motion>', lambda e: seen.append(('motion', e.x)))
+  pane.BindEvent('<ButtonRelease-1>',
+                 lambda e: seen.append(('release', e.x)))
+
+  frame.SetMotionCoalescing(1)
+  events = EventBenchmark.DragScript(50, 100, 150, 100, steps=10,
+                                     width=200, height=200)
+  for e in events[:-1]:
+    frame.HandleEvent(e)
+  assert seen == [('press', 50)]
+  frame.ProcessScheduled()
+  assert seen == [('press', 50), ('motion', 150)]
+  assert frame.GetNumberOfDroppedEvents() == 9
+
+  # a release flushes the held motion before it is dispatched
+  frame.HandleEvent(events[3])
+  frame.HandleEvent(events[-1])
+  assert seen[-2:] == [('motion', 80), ('release', 150)]
+  frame.tearDown()
+
+def test_scheduler(monkeypatch):
+  '''callbacks run in deadline order and periodic ones do not drift'''
+  from vtkAtamai import Scheduler
+
+  now = [100.0]
+  monkeypatch.setattr(Scheduler, '_Clock', lambda: now[0])
+
+  scheduler = Scheduler.Scheduler()
+  calls = []
+  scheduler.Add(1, 300, lambda: calls.append('once'))
+  scheduler.Add(2, 100, lambda: calls.append('every'), 100)
+  scheduler.Add(3, 50, lambda: calls.append('cancelled'))
+  scheduler.Remove(3)
+  assert abs(scheduler.GetTimeout() - 100.0) < 1e-6
+
+  # run late, the next periodic deadline stays on the 100 ms grid
+  now[0] = 100.130
+  assert scheduler.RunDue() == 1
+  assert abs(scheduler.GetTimeout() - 70.0) < 1e-6
+
+  # fall far behind, the missed periodic calls are skipped
+  now[0] = 100.450
+  scheduler.RunDue()
+  assert calls == ['every', 'every', 'once']
+  assert abs(scheduler.GetTimeout() - 50.0) < 1e-6
+
+  scheduler.Remove(2)
+  assert scheduler.GetTimeout() is None
+  assert scheduler.GetNumberOfScheduled() == 0
+
+def test_event_dispatch():
+  '''the most specific binding wins, and rebinding takes effect'''
+  from vtkAtamai import EventHandler
+
+  def event(type, num=0, state=0, keysym='??'):
+    e = EventHandler.Event()
+    e.type, e.num, e.state, e.keysym = type, num, state, keysym
+    return e
+
+  handler = EventHandler.EventHandler()
+  handler.BindEvent('<ButtonPress>', lambda e: 'any')
+  handler.BindEvent('<ButtonPress-1>', lambda e: 'b1')
+  handler.BindEvent('<Shift-ButtonPress-1>', lambda e: 'shift-b1')
+  handler.BindEvent('<Control-KeyPress-Left>', lambda e: 'ctrl-left')
+
+  assert handler.HandleEvent(event('4', 1)) == 'b1'
+  assert handler.HandleEvent(event(4, 1, 1)) == 'shift-b1'
+  assert handler.HandleEvent(event('4', 3)) == 'any'
+  assert handler.HandleEvent(event('2', state=4, keysym='Left')) == 'ctrl-left'
+  assert handler.HandleEvent(event('2', keysym='Left')) == 1
+  assert handler.HandleEvent(event('6')) == 1
+
+  handler.BindEvent('<ButtonPress-1>', None)
+  assert handler.HandleEvent(event('4', 1)) == 'any'
+
+  # slots and extra attributes are both copied
+  e = event('6', 1, 256)
+  e.actor = 'actor'
+  copy = EventHandler.Event(e)
+  assert (copy.type, copy.state, copy.actor) == ('6', 256, 'actor')
+
+  # as are the attributes of a Tkinter event
+  import tkinter
+  tk = tkinter.Event()
+  tk.type, tk.x, tk.y, tk.state, tk.num = '7', 10, 20, 256, '??'
+  tk.widget = 'widget'
+  copy = EventHandler.Event(tk)
+  assert (copy.type, copy.x, copy.y, copy.state) == ('7', 10, 20, 256)
+  assert copy.widget == 'widget'
+  assert EventHandler.DeriveEvent(tk, '8').x == 10
+
+def test_focus_change():
+  '''focus changes across a grid of panes send derived events'''
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, EventBenchmark
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  panes = []
+  for i in range(4):
+    pane = RenderPane.RenderPane(frame)
+    pane.SetViewport((i % 2) / 2.0, (i // 2) / 2.0,
+                     (i % 2 + 1) / 2.0, (i // 2 + 1) / 2.0)
+    panes.append(pane)
+  frame.SetSize(200, 200)
+
+  seen = []
+  for pane in panes:
+    pane.BindEvent('<FocusIn>', lambda e, p=pane: seen.append((p, e.type)))
+    pane.BindEvent('<FocusOut>', lambda e, p=pane: seen.append((p, e.type)))
+
+  for e in EventBenchmark.FocusScript(200, 200, 2, 2):
+    frame.HandleEvent(e)
+  focus_in = [p for p, t in seen if t == '9']
+  assert focus_in == panes
+  # the derived events are copies, the originals keep their type
+  e = EventBenchmark.MakeEvent('6', 10, 10)
+  frame.HandleEvent(e)
+  assert e.type == '6'
+
+  frame.tearDown()
+
+  # the same, with Tkinter events as tkPaneFrame sends them
+  import tkinter
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  panes = []
+  for i in range(4):
+    pane = RenderPane.RenderPane(frame)
+    pane.SetViewport((i % 2) / 2.0, (i // 2) / 2.0,
+                     (i % 2 + 1) / 2.0, (i // 2 + 1) / 2.0)
+    panes.append(pane)
+  frame.SetSize(200, 200)
+  seen = []
+  for pane in panes:
+    pane.BindEvent('<FocusIn>', lambda e, p=pane:
+                   seen.append((p, e.type, e.x, e.y, e.state)))
+  for e in EventBenchmark.FocusScript(200, 200, 2, 2):
+    tk = tkinter.Event()
+    for key in ('type', 'x', 'y', 'num', 'state', 'width', 'height',
+                'keysym', 'char'):
+      setattr(tk, key, getattr(e, key))
+    frame.HandleEvent(tk)
+  assert [p for p, t, x, y, state in seen if t == '9'] == panes
+  for p, t, x, y, state in seen:
+    assert x >= 0 and y >= 0 and state >= 0
+  frame.tearDown()
+
+def test_spatial_index():
+  '''panes and widgets are found through a uniform grid index'''
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, SpatialIndex
+
+  index = SpatialIndex.GridIndex()
+  index.Build([('a', (0, 0, 10, 10)), ('b', (5, 5, 20, 20)),
+               ('c', None)])
+  assert index.Find(7, 7) == 'a'
+  assert index.Find(10, 10) == 'b'
+  # items without a rectangle are only found through the test
+  assert index.Find(50, 50) is None
+  assert index.Find(50, 50, lambda item: True) == 'c'
+  assert index.Find(15, 15, lambda item: True) == 'b'
+  index = SpatialIndex.GridIndex(inclusive=1)
+  index.Build([('a', (0, 0, 10, 10))])
+  assert index.Find(10, 10) == 'a'
+  assert index.Find(11, 10) is None
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  panes = []
+  for i in range(4):
+    pane = RenderPane.RenderPane(frame)
+    pane.SetViewport((i % 2) / 2.0, (i // 2) / 2.0,
+                     (i % 2 + 1) / 2.0, (i // 2 + 1) / 2.0)
+    panes.append(pane)
+  frame.SetSize(200, 200)
+  assert frame._FindPane(50, 50) is panes[0]
+  assert frame._FindPane(150, 150) is panes[3]
+  # moving a viewport invalidates the index
+  panes[0].SetViewport(0.5, 0.5, 1.0, 1.0)
+  assert frame._FindPane(150, 150) is panes[0]
+  frame.SetSize(400, 400)
+  assert frame._FindPane(300, 100) is panes[1]
+  frame.tearDown()
+
+def test_render_timing():
+  '''render timings are collected per window, pane, callback and input'''
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, RenderTiming
+  from vtkAtamai import SlicePlaneFactory, PlaneOutlineFactory
+  from vtkAtamai import EventBenchmark
+
+  stats = RenderTiming.RollingStatistics(size=4)
+  for value in (5.0, 1.0, 2.0, 3.0, 4.0):
+    stats.Add(value)
+  assert stats.GetCount() == 4 and stats.GetTotalCount() == 5
+  assert stats.GetMean() == 2.5 and stats.GetMaximum() == 4.0
+  assert stats.GetPercentile(50) == 2.5
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  source = EventBenchmark._MakeImageSource(32)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  plane.SetInputConnection(source.GetOutputPort())
+  plane.SetPlaneOrientationToXY()
+  outline = PlaneOutlineFactory.PlaneOutlineFactory()
+  outline.SetPlane(plane)
+  pane.ConnectActorFactory(plane)
+  pane.ConnectActorFactory(outline)
+  frame.SetSize(200, 200)
+
+  timer = RenderTiming.GetRenderTimer()
+  timer.Reset()
+  timer.Enable()
+  try:
+    pane.Modified()
+    frame.Render()
+    plane.Push(1.0)
+    frame.Render()
+  finally:
+    timer.Disable()
+  assert timer.GetStatistics('window', frame).GetTotalCount() == 2
+  assert timer.GetStatistics('renderer', pane).GetTotalCount() == 2
+  label = timer.GetLabel(outline) + '.OnRenderEvent'
+  assert timer.GetStatistics('callback', label).GetTotalCount() == 2
+  label = timer.GetLabel(plane) + '[0] reslice'
+  assert timer.GetStatistics('pipeline', label).GetTotalCount() >= 1
+  assert label in timer.GetReport()
+  assert timer.GetSummary().startswith('render timing:')
+
+  # nothing is recorded while disabled
+  frame.Render()
+  pane.Modified()
+  frame.Render()
+  assert timer.GetStatistics('window', frame).GetTotalCount() == 2
+  timer.Reset()
+  frame.tearDown()
+
+def test_lod_controller():
+  '''quality drops when rendering is too slow, and is restored after'''
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, SlicePlaneFactory
+  from vtkAtamai import EventBenchmark
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  source = EventBenchmark._MakeImageSource(32)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  plane.SetInputConnection(source.GetOutputPort())
+  pane.ConnectActorFactory(plane)
+  frame.SetSize(200, 200)
+  frame.Render()
+
+  # no renderer can keep up with this
+  frame.SetDesiredFPS(1e6)
+  lod = frame.GetLODController()
+  lod.SetRefineDelay(0)
+  for e in EventBenchmark.DragScript(20, 20, 180, 180, steps=20,
+                                     width=200, height=200)[:-1]:
+    frame.HandleEvent(e)
+    pane.Modified()
+    frame.Render()
+  assert lod.IsInteracting()
+  assert lod.GetQuality() == lod.MinimumQuality
+  assert plane.GetRenderQuality() == lod.MinimumQuality
+  assert plane.GetImageReslice().GetInterpolationMode() == 0
+  # a held button is still an interaction
+  frame.ProcessScheduled()
+  assert lod.IsInteracting()
+
+  # release the button, the refinement render restores full quality
+  e = EventBenchmark.DragScript(20, 20, 180, 180, steps=20,
+                                width=200, height=200)[-1]
+  frame.HandleEvent(e)
+  frame.ProcessScheduled()
+  assert not lod.IsInteracting()
+  assert plane.GetRenderQuality() == 1.0
+  assert plane.GetImageReslice().GetInterpolationMode() == 1
+  # the interactive quality is remembered for next time
+  assert lod.GetQuality() == lod.MinimumQuality
+  frame.tearDown()
+
+def test_progressive_reslice():
+  '''slices are resampled coarsely at low quality, and refined after'''
+  import time
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, SlicePlaneFactory
+  from vtkAtamai import EventBenchmark
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  source = EventBenchmark._MakeImageSource(32)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  plane.SetInputConnection(source.GetOutputPort())
+  plane.SetPlaneOrientationToXY()
+  pane.ConnectActorFactory(plane)
+  frame.SetSize(200, 200)
+  frame.Render()
+
+  reslice = plane.GetImageReslice()
+  spacing = reslice.GetOutputSpacing()
+  extent = reslice.GetOutputExtent()
+  plane.SetRenderQuality(0.125)
+  assert reslice.GetOutputSpacing()[0] == 4 * spacing[0]
+  assert reslice.GetOutputExtent()[1] + 1 == (extent[1] + 1) // 4
+  plane.SetRenderQuality(0.5)
+  assert reslice.GetOutputSpacing() == spacing
+  plane.ProgressiveResliceOff()
+  plane.SetRenderQuality(0.125)
+  assert reslice.GetOutputSpacing() == spacing
+  plane.ProgressiveResliceOn()
+  assert reslice.GetOutputSpacing()[0] == 4 * spacing[0]
+  plane.SetRenderQuality(1.0)
+  assert reslice.GetOutputExtent() == extent
+
+  # a drag that pauses with the button held is refined
+  frame.SetDesiredFPS(1e6)
+  lod = frame.GetLODController()
+  lod.SetRefineDelay(0)
+  lod.SetPauseDelay(10)
+  script = EventBenchmark.DragScript(20, 20, 180, 180, steps=10,
+                                     width=200, height=200)
+  for e in script[:-1]:
+    frame.HandleEvent(e)
+    pane.Modified()
+    frame.Render()
+  assert lod.IsInteracting()
+  time.sleep(0.05)
+  frame.ProcessScheduled()
+  assert not lod.IsInteracting()
+  assert reslice.GetOutputExtent() == extent
+  # and the release does not start a new interaction
+  frame.HandleEvent(script[-1])
+  assert not lod.IsInteracting()
+  frame.tearDown()
+
+def test_lod_controller_wx():
+  '''the refinement render is scheduled with wx timers on wxPaneFrame'''
+  import sys
+  from unittest import mock
+  from vtkAtamai import OffscreenPaneFrame, RenderPane, SlicePlaneFactory
+  from vtkAtamai import EventBenchmark
+
+  # a stand-in for wx, with timers that the test fires by hand
+  timers = []
+  class Timer(object):
+    def Start(self, millisecs, oneShot):
+      self.running = 1
+      timers.append(self)
+    def Stop(self):
+      self.running = 0
+  wx = mock.MagicMock()
+  wx.Platform = '__WXMSW__'
+  wx.Window = object
+  wx.Timer = Timer
+  with mock.patch.dict(sys.modules, {'wx': wx}):
+    sys.modules.pop('vtkAtamai.wxPaneFrame', None)
+    from vtkAtamai import wxPaneFrame
+    sys.modules.pop('vtkAtamai.wxPaneFrame', None)
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  for method in ('ScheduleOnce', 'UnSchedule', '_StartTimer'):
+    setattr(frame, method,
+            getattr(wxPaneFrame.wxPaneFrame, method).__get__(frame))
+  pane = RenderPane.RenderPane(frame)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  source = EventBenchmark._MakeImageSource(32)
+  plane.SetInputConnection(source.GetOutputPort())
+  pane.ConnectActorFactory(plane)
+  frame.SetSize(200, 200)
+  frame.Render()
+
+  frame.SetDesiredFPS(1e6)
+  lod = frame.GetLODController()
+  lod.SetRefineDelay(0)
+  for e in EventBenchmark.DragScript(20, 20, 180, 180, steps=10,
+                                     width=200, height=200):
+    frame.HandleEvent(e)
+    pane.Modified()
+    frame.Render()
+  assert lod.IsInteracting()
+  assert plane.GetRenderQuality() < 1.0
+  # nothing is left in the PaneFrame scheduler, the wx timers do it
+  frame.ProcessScheduled()
+  assert lod.IsInteracting()
+  while [t for t in timers if t.running]:
+    timer = [t for t in timers if t.running][0]
+    timer.running = 0
+    timer.Notify()
+  assert not lod.IsInteracting()
+  assert plane.GetRenderQuality() == 1.0
+  assert not wxPaneFrame.wxPaneFrame._Timers
+  frame.tearDown()
+
+def test_volume_pick_ray():
+  '''the vectorized pick ray matches a step-by-step march through VTK'''
+  import math
+  import numpy as np
+  import vtk
+  from vtkAtamai import VolumeRayQuery, EventBenchmark
+
+  source = EventBenchmark._MakeImageSource(32)
+  image = source.GetOutput()
+  vol = vtk.vtkImplicitVolume()
+  vol.SetVolume(image)
+  transform = vtk.vtkTransform()
+  transform.RotateZ(10)
+  vol.SetTransform(transform)
+  opacity = vtk.vtkPiecewiseFunction()
+  opacity.AddPoint(0, 0.0)
+  opacity.AddPoint(255, 0.2)
+  table = vtk.vtkLookupTable()
+  table.SetTableRange(0, 255)
+  table.SetAlphaRange(0.0, 0.3)
+  table.Build()
+
+  points = np.random.default_rng(0).uniform(0, 31, (20, 3))
+  values = VolumeRayQuery.SampleImplicitVolume(vol, points)
+  expected = [vol.FunctionValue(*p) for p in points]
+  assert np.allclose(values, expected)
+  gradients = VolumeRayQuery.ImplicitVolumeGradient(vol, points)
+  assert np.allclose(gradients, [vol.FunctionGradient(*p) for p in points])
+  alpha = VolumeRayQuery.PiecewiseFunctionValues(opacity, values)
+  assert np.allclose(alpha, [opacity.GetValue(v) for v in values])
+  opacity.SetNodeValue(1, (255, 0.2, 0.3, 0.5))
+  alpha = VolumeRayQuery.PiecewiseFunctionValues(opacity, values)
+  assert np.allclose(alpha, [opacity.GetValue(v) for v in values])
+  alpha = VolumeRayQuery.LookupTableAlpha(table, values)
+  maxidx = table.GetNumberOfColors() - 1
+  assert np.allclose(alpha, [table.GetTableValue(
+    min(max(int(round(v / 255.0 * maxidx)), 0), maxidx))[3]
+    for v in values])
+
+  # march along a ray the old way, one step at a time
+  p1, p2 = (-2.0, 3.0, 15.5), (33.0, 28.0, 16.5)
+  N = 40
+  d = [(b - a) / N for a, b in zip(p1, p2)]
+  dr = math.sqrt(sum(x * x for x in d))
+  crossings = []
+  for threshold in (0.5, 0.9, 0.999):
+    transparency = 1.0
+    expected = None
+    for i in range(N):
+      value = vol.FunctionValue(*[a + i * x + x / 2 for a, x in zip(p1, d)])
+      transparency *= math.pow(1.0 - opacity.GetValue(value), dr)
+      if 1.0 - transparency > threshold:
+        expected = i
+        break
+    positions = np.array(p1) + np.outer(np.arange(N), d)
+    values = VolumeRayQuery.SampleImplicitVolume(
+      vol, positions + 0.5 * np.array(d))
+    alpha = VolumeRayQuery.PiecewiseFunctionValues(opacity, values)
+    crossing = VolumeRayQuery.FindAccumulatedCrossing(alpha, dr, threshold)
+    assert crossing == expected
+    crossings.append(crossing)
+  # the ray is opaque enough for the lower thresholds only
+  assert crossings[0] < crossings[1] and crossings[2] is None
+
+  # a batch of rays gives the same hits as the single ray
+  query = VolumeRayQuery.VolumeRayQuery()
+  query.SetImplicitVolume(vol)
+  query.SetOpacityTransferFunction(opacity)
+  query.SetPickThreshold(0.5)
+  query.SetStepSize(math.sqrt(sum(x * x for x in np.subtract(p2, p1))) / N)
+  hits = query.CastRays([p1, p2, p1], [p2, p1, (-2.0, 3.0, 14.5)])
+  assert list(hits.hit) == [True, True, False]
+  assert np.allclose(hits.entry[0], positions[crossings[0]])
+  assert np.allclose(hits.entryNormal[0],
+                     [-x for x in vol.FunctionGradient(*hits.entry[0])])
+  assert np.allclose(hits.entry[0], hits.exit[1])
+  entry, entryNormal, exit, exitNormal = query.CastRay(p1, p2)
+  assert np.allclose(entry, hits.entry[0])
+  assert np.allclose(exitNormal, hits.exitNormal[0])
+
+def test_transfer_function_cache():
+  '''cached tables map values like VTK, and follow changes'''
+  import numpy as np
+  import vtk
+  from vtkAtamai import TransferFunctionCache
+
+  cache = TransferFunctionCache.TransferFunctionCache()
+  values = np.linspace(-20.0, 280.0, 301)
+
+  table = vtk.vtkLookupTable()
+  table.SetTableRange(0, 255)
+  table.SetAlphaRange(0.0, 1.0)
+  table.Build()
+  maxidx = table.GetNumberOfColors() - 1
+  expected = [table.GetTableValue(
+    min(max(int(round(v / 255.0 * maxidx)), 0), maxidx)) for v in values]
+  assert np.allclose(cache.MapColors(table, values), expected)
+
+  # a lookup table that was never built
+  unbuilt = vtk.vtkLookupTable()
+  unbuilt.SetTableRange(0, 255)
+  rgba = cache.MapColors(unbuilt, values)
+  assert np.allclose(rgba[-1], unbuilt.GetTableValue(maxidx))
+  assert np.allclose(cache.MapOpacity(unbuilt, values), 1.0)
+
+  opacity = vtk.vtkPiecewiseFunction()
+  opacity.AddPoint(0, 0.0)
+  opacity.AddPoint(100, 0.5, 0.3, 0.6)
+  opacity.AddPoint(255, 0.2)
+  assert np.allclose(cache.MapOpacity(opacity, values),
+                     [opacity.GetValue(v) for v in values], atol=1e-3)
+
+  colors = vtk.vtkColorTransferFunction()
+  colors.AddRGBPoint(0, 1.0, 0.0, 0.0)
+  colors.AddRGBPoint(255, 0.0, 0.5, 1.0)
+  rgba = cache.MapColors(colors, values)
+  assert np.allclose(rgba[:, 0:3], [colors.GetColor(v) for v in values])
+  assert (rgba[:, 3] == 1.0).all()
+
+  # the tables are rebuilt when the functions are modified
+  first = cache.GetTable(opacity)
+  assert cache.GetTable(opacity) is first
+  opacity.AddPoint(50, 1.0)
+  assert cache.GetTable(opacity) is not first
+  assert np.allclose(cache.MapOpacity(opacity, [50.0]), [1.0])
+  assert cache.GetNumberOfTables() == 4
+
+def test_volume_pick_bricks():
+  '''picks that skip transparent bricks match the full march'''
+  import numpy as np
+  import vtk
+  from vtk.util import numpy_support
+  from vtkAtamai import VolumeRayQuery, EventBenchmark
+
+  source = vtk.vtkImageGaussianSource()
+  source.SetWholeExtent(0, 39, 0, 39, 0, 39)
+  source.SetCenter(20, 20, 20)
+  source.SetMaximum(255.0)
+  source.SetStandardDeviation(8.0)
+  cast = vtk.vtkImageCast()
+  cast.SetInputConnection(source.GetOutputPort())
+  cast.SetOutputScalarTypeToUnsignedChar()
+  cast.Update()
+  image = cast.GetOutput()
+  vol = vtk.vtkImplicitVolume()
+  vol.SetVolume(image)
+  opacity = vtk.vtkPiecewiseFunction()
+  opacity.AddPoint(0, 0.0)
+  opacity.AddPoint(150, 0.0)
+  opacity.AddPoint(255, 0.5)
+
+  query = VolumeRayQuery.VolumeRayQuery()
+  query.SetImplicitVolume(vol)
+  query.SetOpacityTransferFunction(opacity)
+  query.SetPickThreshold(0.9)
+  rng = np.random.RandomState(0)
+  starts = rng.uniform(-2, 41, (40, 3))
+  ends = rng.uniform(-2, 41, (40, 3))
+  starts[:, 0] = -2.0
+  ends[:, 0] = 41.0
+  hits = query.CastRays(starts, ends)
+  # most of the volume is transparent, so most bricks are skipped
+  assert query._VisibleBricks.mean() < 0.25
+  assert 0 < hits.hit.sum() < len(hits)
+  for k in range(len(hits)):
+    expected = EventBenchmark._MarchRay(vol, opacity, starts[k], ends[k],
+                                        1.0, 0.9)
+    assert hits.hit[k] == (expected is not None)
+    if expected:
+      assert np.allclose(hits.entry[k], expected[0])
+      assert np.allclose(hits.exit[k], expected[2])
+
+  # single rays do not build the bricks, but they give the same picks
+  single = VolumeRayQuery.VolumeRayQuery()
+  single.SetImplicitVolume(vol)
+  single.SetOpacityTransferFunction(opacity)
+  single.SetPickThreshold(0.9)
+  for mode in ('Accumulate', 'Surface'):
+    getattr(query, 'SetModeTo' + mode)()
+    getattr(single, 'SetModeTo' + mode)()
+    hits = query.CastRays(starts, ends)
+    for k in range(len(hits)):
+      result = single.CastRay(starts[k], ends[k])
+      assert (result is not None) == hits.hit[k]
+      for j, side in ((0, hits.entry), (2, hits.exit)):
+        if result and result[j] is not None:
+          assert np.allclose(result[j], side[k])
+          assert np.allclose(result[j + 1], hits.entryNormal[k] if j == 0
+                             else hits.exitNormal[k])
+  assert not single._GetSampler().HasBricks()
+  query.SetModeToAccumulate()
+
+  # the bricks hold the range of the samples within them, and they
+  # are rebuilt when the image changes
+  sampler = query._GetSampler()
+  low, high = sampler.GetBricks()
+  data = numpy_support.vtk_to_numpy(
+    image.GetPointData().GetScalars()).reshape(40, 40, 40)
+  assert low.shape == (5, 5, 5)
+  assert high[2, 2, 2] == data[16:25, 16:25, 16:25].max()
+  assert low[0, 1, 4] == data[0:9, 8:17, 32:40].min()
+  data[0, 0, 0] = 255
+  image.Modified()
+  assert query._GetSampler().GetBricks()[1][0, 0, 0] == 255
+
+
+def test_locator_cache():
+  '''locators are kept between picks and rebuilt when the data changes'''
+  import numpy as np
+  import vtk
+  from vtkAtamai import LocatorCache
+
+  sphere = vtk.vtkSphereSource()
+  sphere.SetThetaResolution(40)
+  sphere.SetPhiResolution(40)
+  sphere.Update()
+  mesh = sphere.GetOutput()
+  points = np.array([mesh.GetPoint(i) for i in range(mesh.GetNumberOfPoints())])
+
+  cache = LocatorCache.LocatorCache(size=2)
+  locator = cache.GetLocator(mesh)
+  for point in [(0.5, 0.1, 0.0), (-0.2, 0.3, 0.4), (0.0, 0.0, -2.0)]:
+    pointId = cache.FindPoint(mesh, point)
+    distances = np.sum((points - point)**2, axis=1)
+    assert np.isclose(distances[pointId], distances.min())
+  assert cache.GetLocator(mesh) is locator
+
+  mesh.GetPoints().SetPoint(0, 5.0, 5.0, 5.0)
+  mesh.GetPoints().Modified()
+  assert cache.GetLocator(mesh) is not locator
+  assert cache.FindPoint(mesh, (4.9, 5.0, 5.0)) == 0
+
+  # least recently used locators are discarded
+  others = [vtk.vtkPolyData(), vtk.vtkPolyData()]
+  for other in others:
+    other.SetPoints(mesh.GetPoints())
+    cache.GetLocator(other)
+  assert cache.GetNumberOfLocators() == 2
+  assert cache.FindPoint(vtk.vtkPolyData(), (0, 0, 0)) == -1
+
+  image = vtk.vtkImageData()
+  image.SetDimensions(4, 4, 4)
+  assert cache.GetLocator(image) is None
+  assert cache.FindPoint(image, (1.2, 2.0, 2.9)) == image.ComputePointId([1, 2, 3])
+
+
+def test_smart_pick():
+  '''only picked factories are asked, nearest picks stop early'''
+  import vtk
+  from vtkAtamai import ActorFactory, EventHandler
+  from vtkAtamai import OffscreenPaneFrame, RenderPane
+
+  class SphereFactory(ActorFactory.ActorFactory):
+    def __init__(self, center):
+      ActorFactory.ActorFactory.__init__(self)
+      self.source = vtk.vtkSphereSource()
+      self.source.SetCenter(center)
+      self.calls = 0
+    def _MakeActors(self):
+      actor = self._NewActor()
+      actor.SetMapper(vtk.vtkPolyDataMapper())
+      actor.GetMapper().SetInputConnection(self.source.GetOutputPort())
+      return [actor]
+    def GetPickList(self, event):
+      self.calls += 1
+      return ActorFactory.ActorFactory.GetPickList(self, event)
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  factories = [SphereFactory(c) for c in
+               [(0, 0, -6), (0, 0, 0), (0, 0, -3), (3, 0, 0)]]
+  for factory in factories:
+    pane.ConnectActorFactory(factory)
+  camera = pane.GetRenderer().GetActiveCamera()
+  camera.SetPosition(0, 0, 10)
+  camera.SetFocalPoint(0, 0, 0)
+  pane.GetRenderer().ResetCameraClippingRange()
+  frame.Render()
+
+  def pick(x, y, nearest=0):
+    for factory in factories:
+      factory.calls = 0
+    e = EventHandler.Event()
+    e.x, e.y, e.renderer = x, y, pane.GetRenderer()
+    return [info.factory for info in pane.DoSmartPick(e, nearest)]
+
+  assert pick(100, 100) == [factories[1], factories[2], factories[0]]
+  assert [f.calls for f in factories] == [1, 1, 1, 0]
+  assert pick(100, 100, nearest=1) == [factories[1]]
+  assert [f.calls for f in factories] == [0, 1, 0, 0]
+  assert pick(5, 195) == []
+  assert [f.calls for f in factories] == [0, 0, 0, 0]
+  frame.tearDown()
+
+
+def test_pick_cache():
+  '''repeated picks are cached until the camera or the scene changes'''
+  import vtk
+  from vtkAtamai import ActorFactory, EventHandler, PickCache
+  from vtkAtamai import OffscreenPaneFrame, RenderPane
+
+  cache = PickCache.PickCache(size=2)
+  cache.Add('a', 1)
+  cache.Add('b', 2)
+  assert cache.Get('a') == 1
+  cache.Add('c', 3)
+  assert cache.Get('b') is None
+  assert cache.Get('c', lambda value: value != 3) is None
+  assert (cache.GetNumberOfHits(), cache.GetNumberOfMisses()) == (1, 2)
+  assert cache.GetNumberOfItems() == 1
+
+  class SphereFactory(ActorFactory.ActorFactory):
+    def __init__(self):
+      ActorFactory.ActorFactory.__init__(self)
+      self.table = vtk.vtkLookupTable()
+      self.source = vtk.vtkSphereSource()
+    def _MakeActors(self):
+      actor = self._NewActor()
+      actor.SetMapper(vtk.vtkPolyDataMapper())
+      actor.GetMapper().SetInputConnection(self.source.GetOutputPort())
+      return [actor]
+    def HasChangedSince(self, sinceMTime):
+      if ActorFactory.ActorFactory.HasChangedSince(self, sinceMTime):
+        return 1
+      return self.table.GetMTime() > sinceMTime
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  factory = SphereFactory()
+  pane.ConnectActorFactory(factory)
+  pane.GetRenderer().ResetCamera()
+  frame.Render()
+  cache = pane.GetPickCache()
+
+  e = EventHandler.Event()
+  e.x, e.y, e.renderer = 100, 100, pane.GetRenderer()
+  first = pane.DoSmartPick(e)
+  assert len(first) == 1
+  assert pane.DoSmartPick(e) == first
+  assert (cache.GetNumberOfHits(), cache.GetNumberOfMisses()) == (1, 1)
+
+  # the camera, the factory's transform, and polled objects all count
+  pane.GetRenderer().GetActiveCamera().Dolly(1.1)
+  pane.DoSmartPick(e)
+  factory.GetTransform().Translate(0.0, 0.0, 0.1)
+  assert pane.DoSmartPick(e)[0].position != first[0].position
+  factory.table.SetTableRange(0, 10)
+  pane.DoSmartPick(e)
+  assert (cache.GetNumberOfHits(), cache.GetNumberOfMisses()) == (1, 4)
+  pane.DoSmartPick(e)
+  assert cache.GetNumberOfHits() == 2
+
+  # as do changes upstream of the mapper
+  before = pane.DoSmartPick(e)[0].position
+  factory.source.SetRadius(0.25)
+  after = pane.DoSmartPick(e)[0].position
+  assert after != before
+  assert cache.GetNumberOfHits() == 3
+  frame.tearDown()
+
+
+def test_pick_many():
+  '''batch picks agree with one-at-a-time picks'''
+  import numpy as np
+  import vtk
+  from vtkAtamai import ActorFactory, EventHandler
+  from vtkAtamai import OffscreenPaneFrame, RenderPane
+
+  class SphereFactory(ActorFactory.ActorFactory):
+    def __init__(self, center):
+      ActorFactory.ActorFactory.__init__(self)
+      self.source = vtk.vtkSphereSource()
+      self.source.SetCenter(center)
+      self.source.SetRadius(0.6)
+    def _MakeActors(self):
+      actor = self._NewActor()
+      actor.SetMapper(vtk.vtkPolyDataMapper())
+      actor.GetMapper().SetInputConnection(self.source.GetOutputPort())
+      return [actor]
+
+  class CustomFactory(SphereFactory):
+    # factories with their own GetPickList are picked one at a time
+    def GetPickList(self, event):
+      return SphereFactory.GetPickList(self, event)
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  pane.ConnectActorFactory(SphereFactory((0, 0, 0)))
+  pane.ConnectActorFactory(CustomFactory((0.8, 0.3, -1)))
+  pane.ConnectActorFactory(SphereFactory((-0.7, -0.5, 0.5)))
+  pane.GetActorFactories()[0].GetTransform().Scale(1.0, 1.5, 1.0)
+  camera = pane.GetRenderer().GetActiveCamera()
+  camera.SetPosition(1, 2, 8)
+  camera.SetFocalPoint(0, 0, 0)
+  pane.GetRenderer().ResetCameraClippingRange()
+  frame.Render()
+
+  xs, ys = np.meshgrid(np.arange(10, 200, 15), np.arange(10, 200, 15))
+  xy = np.column_stack([xs.ravel(), ys.ravel()])
+  positions, normals, ids, distances = pane.PickMany(xy)
+  assert len(set(ids)) == 4
+
+  e = EventHandler.Event()
+  e.renderer = pane.GetRenderer()
+  for i, (x, y) in enumerate(xy):
+    e.x, e.y = x, y
+    picks = pane.DoSmartPick(e, nearest=1)
+    if not picks:
+      assert ids[i] == -1 and np.isinf(distances[i])
+      continue
+    assert pane.GetActorFactories()[ids[i]] is picks[0].factory
+    assert np.allclose(positions[i], picks[0].position, atol=1e-6)
+    assert np.isclose(distances[i], picks[0].distance)
+    if picks[0].normal is not None:
+      assert np.allclose(normals[i], picks[0].normal, atol=1e-6)
+  frame.tearDown()
+
+def test_cursor_tracking():
+  '''the 3D cursor follows the mouse once per rendered frame'''
+  import vtk
+  from vtkAtamai import ActorFactory, CursorFactory, EventHandler
+  from vtkAtamai import OffscreenPaneFrame, RenderPane
+
+  class SphereFactory(ActorFactory.ActorFactory):
+    def __init__(self):
+      ActorFactory.ActorFactory.__init__(self)
+      self.source = vtk.vtkSphereSource()
+      self.source.SetThetaResolution(64)
+      self.source.SetPhiResolution(64)
+    def _MakeActors(self):
+      actor = self._NewActor()
+      actor.SetMapper(vtk.vtkPolyDataMapper())
+      actor.GetMapper().SetInputConnection(self.source.GetOutputPort())
+      return [actor]
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  pane.ConnectActorFactory(SphereFactory())
+  cursor = CursorFactory.CursorFactory()
+  pane.ConnectCursor(cursor)
+  pane._ShowCursor()
+  camera = pane.GetRenderer().GetActiveCamera()
+  camera.SetPosition(0, 0, 5)
+  camera.SetFocalPoint(0, 0, 0)
+  pane.GetRenderer().ResetCameraClippingRange()
+  frame.Render()
+
+  calls = []
+  pane._UpdateCursor = lambda f=pane._UpdateCursor: calls.append(1) or f()
+  e = EventHandler.Event()
+  for x in (90, 95, 100):
+    e.x, e.y = x, 100
+    pane.DoCursorMotion(e)
+  assert not calls and pane.NeedsRender()
+  frame.Render()
+  assert len(calls) == 1
+  x, y, z = cursor.GetCursorPosition()
+  assert abs(x * x + y * y + z * z - 0.25) < 1e-2 and z > 0
+
+  # nothing under the mouse: the cursor goes to the focal plane
+  e.x, e.y = 10, 10
+  pane.DoCursorMotion(e)
+  frame.Render()
+  assert abs(cursor.GetCursorPosition()[2]) < 1e-6
+  frame.tearDown()
+
+def test_reslice_cache():
+  '''revisited slices are served from the reslice cache'''
+  import vtk
+  from vtkAtamai import OffscreenPaneFrame, RenderPane
+  from vtkAtamai import ResliceCache, SlicePlaneFactory
+
+  cache = ResliceCache.GetResliceCache()
+  cache.Clear()
+  cache.ResetStatistics()
+
+  source = vtk.vtkImageSinusoidSource()
+  source.SetWholeExtent(0, 63, 0, 63, 0, 63)
+  source.SetDirection(0, 0, 1)
+  table = vtk.vtkLookupTable()
+  table.SetRange(-255, 255)
+  table.Build()
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  plane.SetInputConnection(source.GetOutputPort(), table=table)
+  plane.SetPlaneOrientationToXY()
+  pane.ConnectActorFactory(plane)
+  pane.GetRenderer().ResetCamera()
+  frame.Render()
+
+  executions = []
+  plane.GetImageReslice().AddObserver(
+    'EndEvent', lambda o, e: executions.append(1))
+  slices = {}
+  for index in (10, 11, 12, 11, 10):
+    plane.SetSliceIndex(index)
+    frame.Render()
+    scalars = plane.GetOutputPort(color=1, pad=1).GetProducer().GetOutput()\
+      .GetPointData().GetScalars()
+    values = [scalars.GetTuple(i) for i in range(0, 4096, 97)]
+    assert slices.setdefault(index, values) == values
+  assert len(executions) == 3 and slices[10] != slices[11]
+  assert cache.GetNumberOfHits() == 2 and cache.GetHitRate() > 0.0
+
+  # changing the lookup table does not reslice
+  table.SetRange(-100, 100)
+  frame.Render()
+  assert len(executions) == 3
+
+  # the input is part of the key
+  source.SetPeriod(10)
+  frame.Render()
+  assert len(executions) == 4
+
+  # as are all the settings of the reslice filter
+  def GetRange():
+    colors = plane.GetOutputPort(color=1, pad=1).GetProducer()
+    return colors.GetInput().GetScalarRange()
+  plane.SetSliceIndex(10)
+  frame.Render()
+  low, high = GetRange()
+  plane.SetSliceIndex(11)
+  frame.Render()
+  plane.GetImageReslice().SetScalarScale(2.0)
+  plane.SetSliceIndex(10)
+  frame.Render()
+  assert GetRange() == (2 * low, 2 * high)
+  plane.SetSliceIndex(11)
+  frame.Render()
+  plane.GetImageReslice().SetScalarScale(1.0)
+  plane.SetSliceIndex(10)
+  frame.Render()
+  assert GetRange() == (low, high)
+  count = len(executions)
+  plane.GetImageReslice().SetWrap(1)
+  plane.SetSliceIndex(11)
+  frame.Render()
+  assert len(executions) == count + 1
+  plane.SetSliceIndex(10)
+  frame.Render()
+  plane.SetSliceIndex(11)
+  frame.Render()
+  plane.GetImageReslice().SetOutputDirection(1, 0, 0, 0, -1, 0, 0, 0, -1)
+  plane.SetSliceIndex(10)
+  frame.Render()
+  assert len(executions) == count + 3
+
+  # the memory limit is respected
+  size = cache.GetMemorySize()
+  cache.SetMemoryLimit(size // 2)
+  assert 0 < cache.GetMemorySize() <= size // 2
+  cache.SetMemoryLimit(ResliceCache._MemoryLimit)
+  cache.Clear()
+  frame.tearDown()
+
+def test_slice_prefetcher():
+  '''scrolling slices are resliced ahead of time on worker threads'''
+  import vtk
+  from vtkAtamai import OffscreenPaneFrame, RenderPane
+  from vtkAtamai import ResliceCache, SlicePlaneFactory, SlicePrefetcher
+
+  cache = ResliceCache.GetResliceCache()
+  cache.Clear()
+  prefetcher = SlicePrefetcher.GetSlicePrefetcher()
+  prefetcher.ResetStatistics()
+
+  source = vtk.vtkImageSinusoidSource()
+  source.SetWholeExtent(0, 63, 0, 63, 0, 63)
+  source.SetDirection(0.3, 0.2, 1.0)
+  source.Update()
+  table = vtk.vtkLookupTable()
+  table.SetRange(-255, 255)
+  table.Build()
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  plane.SetInputData(source.GetOutput(), table=table)
+  plane.SetPlaneOrientationToXY()
+  pane.ConnectActorFactory(plane)
+  pane.GetRenderer().ResetCamera()
+  frame.Render()
+
+  def GetSlice():
+    scalars = plane.GetOutputPort(color=1, pad=1).GetProducer().GetOutput()\
+      .GetPointData().GetScalars()
+    return [scalars.GetTuple(i) for i in range(0, 4096, 97)]
+
+  executions = []
+  plane.GetImageReslice().AddObserver(
+    'EndEvent', lambda o, e: executions.append(1))
+  slices = []
+  for index in range(10, 18):
+    plane.SetSliceIndex(index)
+    prefetcher.Wait()
+    frame.Render()
+    slices.append(GetSlice())
+  assert len(executions) < 4
+  assert prefetcher.GetNumberOfHits() > 0 and prefetcher.GetHitRate() > 0.0
+
+  # the prefetched slices are the same as the resliced ones
+  prefetcher.SetDepth(0)
+  cache.Clear()
+  for index in range(10, 18):
+    plane.SetSliceIndex(index)
+    frame.Render()
+    assert GetSlice() == slices[index - 10]
+  prefetcher.SetDepth(4)
+
+  # also with the other settings of the reslice filter
+  plane.GetImageReslice().SetScalarScale(0.5)
+  plane.GetImageReslice().SetBorder(0)
+  hits = prefetcher.GetNumberOfHits()
+  for index in range(10, 18):
+    plane.SetSliceIndex(index)
+    prefetcher.Wait()
+    frame.Render()
+    assert GetSlice() != slices[index - 10]
+    slices[index - 10] = GetSlice()
+  assert prefetcher.GetNumberOfHits() > hits
+  prefetcher.SetDepth(0)
+  cache.Clear()
+  for index in range(10, 18):
+    plane.SetSliceIndex(index)
+    frame.Render()
+    assert GetSlice() == slices[index - 10]
+  prefetcher.SetDepth(4)
+  cache.Clear()
+  frame.tearDown()
+
+def test_pipeline_executions():
+  '''each frame executes the slice pipeline at most once'''
+  import vtk
+  from vtkAtamai import OffscreenPaneFrame, RenderPane
+  from vtkAtamai import ResliceCache, SlicePlaneFactory
+
+  ResliceCache.GetResliceCache().Clear()
+  source = vtk.vtkImageSinusoidSource()
+  source.SetWholeExtent(0, 63, 0, 63, 0, 63)
+  table = vtk.vtkLookupTable()
+  table.SetRange(-255, 255)
+  table.Build()
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  executions = {'source': 0, 'reslice': 0, 'colors': 0}
+  def Count(stage):
+    def Counter(o, e):
+      if stage in executions:
+        executions[stage] += 1
+    return Counter
+  source.AddObserver('EndEvent', Count('source'))
+
+  # nothing executes until the first render
+  plane.SetInputConnection(source.GetOutputPort(), table=table)
+  plane.SetPlaneOrientationToXY()
+  plane.SetSliceIndex(20)
+  plane.GetImageReslice().AddObserver('EndEvent', Count('reslice'))
+  plane._ImageMapToColors[0].AddObserver('EndEvent', Count('colors'))
+  pane.ConnectActorFactory(plane)
+  pane.GetRenderer().ResetCamera()
+  assert executions == {'source': 0, 'reslice': 0, 'colors': 0}
+  assert plane.GetSliceIndex() == 20
+  assert plane._ImageMapToColors[0].GetOutputFormat() == 3
+
+  # the source may execute again for each slice, since the reslice
+  # filter only asks it for the slices that it needs
+  frame.Render()
+  del executions['source']
+  assert executions == {'reslice': 1, 'colors': 1}
+  pane.Modified()
+  frame.Render()
+  assert executions == {'reslice': 1, 'colors': 1}
+  plane.SetSliceIndex(21)
+  frame.Render()
+  assert executions == {'reslice': 2, 'colors': 2}
+
+  # a new lookup table only needs the color mapping
+  table2 = vtk.vtkLookupTable()
+  table2.SetRange(0, 255)
+  table2.Build()
+  plane.SetLookupTable(table2)
+  assert executions == {'reslice': 2, 'colors': 2}
+  frame.Render()
+  assert executions == {'reslice': 2, 'colors': 3}
+  ResliceCache.GetResliceCache().Clear()
+  frame.tearDown()
+
+def test_thread_settings():
+  '''thread settings apply per factory, with process-wide defaults'''
+  import vtk
+  from vtkAtamai import SlicePlaneFactory, ThreadSettings, EventBenchmark
+
+  source = EventBenchmark._MakeImageSource(32)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  plane.SetInputConnection(source.GetOutputPort())
+  reslice = plane.GetImageReslice()
+  default = reslice.GetNumberOfThreads()
+
+  shared = ThreadSettings.GetThreadSettings()
+  assert plane.GetThreadSettings().GetParent() is shared
+  try:
+    shared.SetNumberOfThreads(3)
+    assert reslice.GetNumberOfThreads() == 3
+    plane.GetThreadSettings().SetNumberOfThreads(2)
+    shared.SetNumberOfThreads(5)
+    assert reslice.GetNumberOfThreads() == 2
+    plane.GetThreadSettings().SetNumberOfThreads(None)
+    assert reslice.GetNumberOfThreads() == 5
+    plane.GetThreadSettings().SetEnableSMP(1)
+    assert reslice.GetEnableSMP()
+  finally:
+    shared.SetNumberOfThreads(None)
+  assert reslice.GetNumberOfThreads() == default
+
+  results = EventBenchmark.ResliceMicrobenchmark([1, 2], size=16,
+                                                 pixels=32, repeat=1)
+  for case in ('axial', 'oblique', 'slab'):
+    assert len(results[case]) == 2
+    assert min(results[case]) > 0
+
+def test_incremental_slab():
+  '''thick slabs are scrolled by reslicing only the slices that enter'''
+  import numpy as np
+  import vtk
+  from vtk.util import numpy_support
+  from vtkAtamai import OffscreenPaneFrame, RenderPane
+  from vtkAtamai import ResliceCache, SlicePlaneFactory
+
+  ResliceCache.GetResliceCache().Clear()
+  source = vtk.vtkImageSinusoidSource()
+  source.SetWholeExtent(0, 63, 0, 63, 0, 63)
+  source.SetDirection(0.3, 0.5, 1)
+  source.SetPeriod(7)
+  table = vtk.vtkLookupTable()
+  table.SetRange(-255, 255)
+  table.Build()
+
+  frame = OffscreenPaneFrame.OffscreenPaneFrame(200, 200)
+  pane = RenderPane.RenderPane(frame)
+  plane = SlicePlaneFactory.SlicePlaneFactory()
+  plane.SetInputConnection(source.GetOutputPort(), table=table)
+  plane.SetPlaneOrientationToXY()
+  pane.ConnectActorFactory(plane)
+  pane.GetRenderer().ResetCamera()
+  colors = plane.GetOutputPort(color=1, pad=1).GetProducer()
+
+  def GetImage():
+    return numpy_support.vtk_to_numpy(
+      colors.GetInput().GetPointData().GetScalars()).copy()
+
+  # the thin slices, from the reslice filter
+  thin = {}
+  for index in range(10, 30):
+    plane.SetSliceIndex(index)
+    frame.Render()
+    thin[index] = GetImage()
+
+  reslice = plane.GetImageReslice()
+  reslice.SetSlabThickness(8.0)
+  for mode, func in ((vtk.VTK_IMAGE_SLAB_MEAN, np.mean),
+                     (vtk.VTK_IMAGE_SLAB_MAX, np.max)):
+    reslice.SetBlendMode(mode)
+    for index in (20, 21, 22, 25, 24, 15):
+      plane.SetSliceIndex(index)
+      frame.Render()
+      expected = func([thin[i] for i in range(index - 4, index + 5)],
+                      axis=0)
+      assert np.allclose(GetImage(), expected)
+      # after the first slab, only the slices that enter are resliced
+      extent = plane._Slabs[0].GetImageReslice().GetOutputExtent()
+      if index in (21, 22, 24):
+        assert extent[5] - extent[4] == 0
+
+  # without the incremental slab, the reslice filter makes the slab
+  plane.IncrementalSlabOff()
+  frame.Render()
+  assert colors.GetInput() is reslice.GetOutput()
+
+  # the other settings of the reslice filter give the same slab
+  reslice.SetBlendMode(vtk.VTK_IMAGE_SLAB_SUM)
+  reslice.SetScalarShift(10.0)
+  reslice.SetScalarScale(0.5)
+  slabs = {}
+  for incremental in (1, 0):
+    plane.SetIncrementalSlab(incremental)
+    for index in (20, 21, 24):
+      plane.SetSliceIndex(index)
+      frame.Render()
+      assert np.allclose(slabs.setdefault(index, GetImage()), GetImage())
+  ResliceCache.GetResliceCache().Clear()
+  frame.tearDown()
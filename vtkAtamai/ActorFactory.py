@@ -107,6 +107,9 @@ Public Methods:
                            specified time, you must override this if your
                            factory has any inputs or other externally
                            modifyable VTK objects that need to be checked
+                           (the RenderPane only polls this method for
+                           factories that do not set _PushModified, see
+                           "A little extra info about modification" below)
 
     GetClassName(*name*) -- get the class name
 
@@ -124,6 +127,11 @@ Public Methods:
     Render()            -- render all PaneFrames that contain this
                            ActorFactory
 
+    SetRenderQuality(*q*) -- render at a reduced quality (0 < q < 1)
+                           during interaction, 1.0 is full quality, the
+                           default implementation passes q to the
+                           children (see LODController)
+
   The following methods are used primarily by RenderPane:
 
     AddToRenderer(*renderer*)  -- add the actors to the renderer
@@ -150,6 +158,14 @@ Public Methods:
     Modified()          -- update the Modification time - the factory should
                          call this whenever an attribute is modified
 
+    _UpdateWatchedObjects() -- observe the VTK objects returned by
+                           _GetWatchedObjects(), call this whenever an
+                           input, lookup table, property etc. is set
+
+    _GetWatchedObjects() -- return the VTK objects whose modification
+                           should cause a render (override this in
+                           derived classes that have inputs etc.)
+
     ScheduleOnce(*ms*,*func*) -- schedule a function to be called after
                            the specified number of milliseconds
                            (returns an id you can use to unschedule)
@@ -178,6 +194,9 @@ Protected Attributes:
 
     _MTime         -- vtkTimeStamp a la vtkObject, use Modified() to change
 
+    _DirtyListeners -- the RenderPanes and parent factories that must be
+                      told when this factory is modified
+
     _Renderers     -- a list of renderers that this factory is attached to
 
     _ActorDict     -- a dictionary which, given a renderer,
@@ -265,6 +284,22 @@ A little extra info about child components:
   then you must call child.GetTransform().SetInput(None) after
   actorFactory.AddChild(*child*) has been called.
 
+
+A little extra info about modification:
+
+  Modifications are pushed rather than polled.  Modified() marks all of
+  the RenderPanes that display the factory (directly or through a parent
+  factory) as needing a render, so that the RenderPane does not have to
+  walk the whole factory hierarchy before every render.  Changes to the
+  Transform are picked up automatically, and any other VTK objects that
+  affect the rendering should be returned by _GetWatchedObjects() so
+  that _UpdateWatchedObjects() can observe them.
+
+  A derived class that overrides HasChangedSince() but relies on the
+  push mechanism must set the class attribute '_PushModified = 1',
+  otherwise the RenderPane will keep polling its HasChangedSince()
+  method just like it did before.
+
 """
 
 #======================================
@@ -272,6 +307,7 @@ from zope.interface import implementer
 from vtkAtamai.interfaces import IActorFactory
 from . import EventHandler
 from . import PaneFrame
+from . import LocatorCache
 import vtk
 import logging
 
@@ -292,6 +328,20 @@ class PickInformation(object):
         #    (i.e. a vector perpendicular to the normal)
 
 
+def RequiresPolling(obj):
+    """Check whether HasChangedSince() must be polled for *obj*.
+
+    This is true if the most-derived HasChangedSince() method of the
+    object's class was defined in a class that did not set _PushModified,
+    i.e. if the override might check objects that are not watched.
+
+    """
+    for cls in obj.__class__.__mro__:
+        if 'HasChangedSince' in cls.__dict__:
+            return not cls.__dict__.get('_PushModified', 0)
+    return 0
+
+
 @implementer(IActorFactory)
 class ActorFactory(EventHandler.EventHandler):
 
@@ -319,6 +369,13 @@ class ActorFactory(EventHandler.EventHandler):
         self._MTime = vtk.vtkObject()
         self._RenderTime = vtk.vtkObject()
 
+        # panes and parents that are told when we are modified
+        self._DirtyListeners = []
+        self._Propagating = 0
+
+        # (object, observer tag) for the VTK objects that we observe
+        self._WatchedObjects = []
+
         # list of renderers the actors are displayed in
         self._Renderers = []
         # dictionary of actors for each renderer
@@ -327,8 +384,13 @@ class ActorFactory(EventHandler.EventHandler):
         # ActorFactories which are children of this one
         self._Children = []
 
+        # the rendering quality, see SetRenderQuality()
+        self._RenderQuality = 1.0
+
         # the transform for all of the actors
         self._Transform = vtk.vtkTransform()
+        self._TransformInputs = []
+        self._Transform.AddObserver('ModifiedEvent', self._OnTransformModified)
 
         # this transform is used as a spare
         self._DummyTransform = vtk.vtkTransform()
@@ -343,6 +405,11 @@ class ActorFactory(EventHandler.EventHandler):
         self.RemoveAllObservers()
         self.RemoveAllEventHandlers()
 
+        for obj, tag in list(self._WatchedObjects):
+            self._UnwatchModified(obj)
+        self._Transform.RemoveAllObservers()
+        self._DirtyListeners = []
+
         # remove additional actors
         for renderer in list(self._ActorDict.keys()):
             self.RemoveFromRenderer(renderer)
@@ -428,14 +495,20 @@ class ActorFactory(EventHandler.EventHandler):
         if child.GetTransform() != self._Transform:
             child.GetTransform().SetInput(self._Transform)
         self._Children.append(child)
+        child._AddDirtyListener(self)
+        if self._RenderQuality != child.GetRenderQuality():
+            child.SetRenderQuality(self._RenderQuality)
+        self._InvalidatePolling()
         self.Modified()
 
     def RemoveChild(self, child):
         """Remove a child component from from this ActorFactory."""
         if child in self._Children:
             self._Children.remove(child)
+            child._RemoveDirtyListener(self)
         for renderer in self._Renderers:
             child.RemoveFromRenderer(renderer)
+        self._InvalidatePolling()
         self.Modified()
 
     def GetChildren(self):
@@ -565,12 +638,12 @@ class ActorFactory(EventHandler.EventHandler):
                     # transform the position into data coordinates
                     transform.SetMatrix(actor.GetMatrix())
                     dataPos = transform.GetInverse().TransformPoint(position)
-                    pointId = dataSet.FindPoint(dataPos[0],
-                                                dataPos[1],
-                                                dataPos[2])
+                    # the locator is kept between picks, it is only
+                    # rebuilt when the dataset is modified
+                    pointId = LocatorCache.FindPoint(dataSet, dataPos)
                     normals = dataSet.GetPointData().GetNormals()
 
-                    if (normals):
+                    if (normals and pointId >= 0):
                         # transform the normal back into world coordinates
                         try:  # VTK 3.x
                             normal = transform.TransformNormal(
@@ -612,9 +685,134 @@ class ActorFactory(EventHandler.EventHandler):
         return 0
 
     def Modified(self):
-        """Update the timestamp for this object."""
+        """Update the timestamp for this object.
+
+        This also marks every RenderPane that displays this factory,
+        directly or via a parent, as needing a render.
+
+        """
         if self._MTime:
             self._MTime.Modified()
+            self._MarkDirty()
+
+    #--------------------------------------
+    def _AddDirtyListener(self, listener):
+        """Add a pane or factory that is told when we are modified.
+
+        The *listener* must provide _MarkDirty() and _InvalidatePolling()
+        methods.  This is called by RenderPane.ConnectActorFactory() and
+        by AddChild(), and by factories that track another factory.
+
+        """
+        if listener not in self._DirtyListeners:
+            self._DirtyListeners.append(listener)
+
+    def _RemoveDirtyListener(self, listener):
+        """Remove a listener added by _AddDirtyListener()."""
+        if listener in self._DirtyListeners:
+            self._DirtyListeners.remove(listener)
+
+    def _MarkDirty(self):
+        """Pass a modification on to all listeners.
+
+        Unlike Modified(), this does not touch our own timestamp.  It is
+        called for modifications of watched objects and of child factories.
+
+        """
+        # guard against cycles, e.g. a factory that tracks its own parent
+        if self._Propagating:
+            return
+        self._Propagating = 1
+        try:
+            for listener in self._DirtyListeners:
+                listener._MarkDirty()
+        finally:
+            self._Propagating = 0
+
+    def _InvalidatePolling(self):
+        """Tell the panes that the factory hierarchy has changed."""
+        if self._Propagating:
+            return
+        self._Propagating = 1
+        try:
+            for listener in self._DirtyListeners:
+                listener._InvalidatePolling()
+        finally:
+            self._Propagating = 0
+
+    def GetPolledFactories(self):
+        """Get this factory and all descendants that require polling.
+
+        These are the factories whose HasChangedSince() method is not
+        covered by the push mechanism, see RequiresPolling().
+
+        """
+        factories = []
+        if RequiresPolling(self):
+            factories.append(self)
+        for child in self._Children:
+            factories = factories + child.GetPolledFactories()
+        return factories
+
+    def _GetWatchedObjects(self):
+        """Get the VTK objects that are observed for modifications.
+
+        Override this in derived classes to add inputs, lookup tables,
+        properties and any other externally modifiable VTK objects that
+        are checked in HasChangedSince().  None entries are ignored.
+
+        """
+        return list(self._TransformInputs)
+
+    def _UpdateWatchedObjects(self):
+        """Observe exactly the objects returned by _GetWatchedObjects()."""
+        watched = [obj for obj in self._GetWatchedObjects() if obj is not None]
+        for obj, tag in list(self._WatchedObjects):
+            if not [o for o in watched if o is obj]:
+                self._UnwatchModified(obj)
+        for obj in watched:
+            self._WatchModified(obj)
+
+    def _WatchModified(self, obj):
+        """Mark our panes dirty whenever the VTK object *obj* is modified."""
+        if obj is None or self._FindWatched(obj) is not None:
+            return
+        tag = obj.AddObserver('ModifiedEvent', self._OnWatchedModified)
+        self._WatchedObjects.append((obj, tag))
+
+    def _UnwatchModified(self, obj):
+        """Stop watching an object passed to _WatchModified()."""
+        item = self._FindWatched(obj)
+        if item is not None:
+            obj.RemoveObserver(item[1])
+            self._WatchedObjects.remove(item)
+
+    def _FindWatched(self, obj):
+        # data objects are not hashable, so search by identity
+        for item in self._WatchedObjects:
+            if item[0] is obj:
+                return item
+        return None
+
+    def _OnWatchedModified(self, obj, event):
+        self._MarkDirty()
+
+    def _OnTransformModified(self, obj, event):
+        # modifying the transform itself is seen directly, but if the
+        # transform has an input (other than a parent factory's transform,
+        # which is watched by the parent) then the input must be watched
+        inputs = []
+        transform = self._Transform.GetInput()
+        while transform is not None and transform not in inputs:
+            inputs.append(transform)
+            try:
+                transform = transform.GetInput()
+            except AttributeError:
+                transform = None
+        if inputs != self._TransformInputs:
+            self._TransformInputs = inputs
+            self._UpdateWatchedObjects()
+        self._MarkDirty()
 
     def AddObserver(self, eventname, callback):
         return self._MTime.AddObserver(eventname, callback)
@@ -660,6 +858,23 @@ class ActorFactory(EventHandler.EventHandler):
 
         return IsA_Helper(self.__class__, classname)
 
+    #--------------------------------------
+    def SetRenderQuality(self, quality):
+        """Set the quality for rendering, where 1.0 is full quality.
+
+        This is called by the LODController when the frame rate is too
+        low during interaction, and with 1.0 when interaction stops.
+        Factories that can trade quality for speed should override
+        this and call the base class method.
+
+        """
+        self._RenderQuality = quality
+        for child in self._Children:
+            child.SetRenderQuality(quality)
+
+    def GetRenderQuality(self):
+        return self._RenderQuality
+
    #--------------------------------------
     def GetTransform(self):
         """Get the transform for this object.
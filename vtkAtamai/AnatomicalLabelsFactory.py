@@ -100,6 +100,7 @@ Public Methods:
 
 #======================================
 from .ActorFactory import *
+from . import RenderTiming
 import math
 
 #======================================
@@ -107,9 +108,14 @@ import math
 
 class AnatomicalLabelsFactory(ActorFactory):
 
+    # the input is watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self, labels=['L', 'R', 'P', 'A', 'I', 'S']):
         ActorFactory.__init__(self)
 
+        self._Input = None
+
         self._PositiveProperty = vtk.vtkProperty()
         self._PositiveProperty.SetColor(0.0, 1.0, 0.0)
 
@@ -174,6 +180,7 @@ class AnatomicalLabelsFactory(ActorFactory):
         self._offset = offset
         self._volumeCenter = (xc, yc, zc)
         self._bounds = (xmin, xmax, ymin, ymax, zmin, zmax)
+        self._UpdateWatchedObjects()
 
     def SetVisibility(self, status=0, label=None):
         if label is None:
@@ -192,6 +199,12 @@ class AnatomicalLabelsFactory(ActorFactory):
     def GetInput(self):
         return self._Input
 
+    def _GetWatchedObjects(self):
+        watched = ActorFactory._GetWatchedObjects(self)
+        if self._Input:
+            watched.append(self._Input.GetProducer())
+        return watched
+
     def HasChangedSince(self, sinceMTime):
         if (ActorFactory.HasChangedSince(self, sinceMTime)):
             return 1
@@ -248,6 +261,7 @@ class AnatomicalLabelsFactory(ActorFactory):
         except AttributeError:
             pass
 
+    @RenderTiming.TimedCallback
     def OnRenderEvent(self, renderer, event):
         actors = self._ActorDict[renderer]
         xmin, xmax, ymin, ymax, zmin, zmax = self._bounds
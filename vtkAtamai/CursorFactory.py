@@ -144,7 +144,7 @@ class CursorFactory(ActorFactory):
         self._Split.SetClipFunction(plane)
         self._Split.GenerateClipScalarsOff()
         self._Split.GenerateClippedOutputOn()
-        self._Split.SetInput(self._Input)
+        self._SetSplitInput(self._Input)
 
         self._TopCursorData = self._Split.GetOutput()
         self._BotCursorData = self._Split.GetClippedOutput()
@@ -173,6 +173,7 @@ class CursorFactory(ActorFactory):
 
         self.__CursorSource = vtk.vtkCursor3D()
         self.__CursorSource.SetModelBounds(-a, a, -a, a, -a, a)
+        self.__CursorSource.Update()
 
         return self.__CursorSource.GetOutput()
 
@@ -180,9 +181,16 @@ class CursorFactory(ActorFactory):
         if self._Input == input:
             return
         self._Input = input
-        self._Split.SetInput(input)
+        self._SetSplitInput(input)
         self.Modified()
 
+    def _SetSplitInput(self, input):
+        # VTK-6
+        if vtk.vtkVersion().GetVTKMajorVersion() > 5:
+            self._Split.SetInputData(input)
+        else:
+            self._Split.SetInput(input)
+
     def GetInput(self):
         return self._Input
 
@@ -261,13 +269,19 @@ class CursorFactory(ActorFactory):
     def _MakeActors(self):
         topActor = self._NewActor()
         topMapper = vtk.vtkPolyDataMapper()
-        topMapper.SetInput(self._TopCursorData)
+        if vtk.vtkVersion().GetVTKMajorVersion() > 5:
+            topMapper.SetInputConnection(self._Split.GetOutputPort(0))
+        else:
+            topMapper.SetInput(self._TopCursorData)
         topActor.SetMapper(topMapper)
         topActor.SetProperty(self._TopProperty)
 
         botActor = self._NewActor()
         botMapper = vtk.vtkPolyDataMapper()
-        botMapper.SetInput(self._BotCursorData)
+        if vtk.vtkVersion().GetVTKMajorVersion() > 5:
+            botMapper.SetInputConnection(self._Split.GetOutputPort(1))
+        else:
+            botMapper.SetInput(self._BotCursorData)
         botActor.SetMapper(botMapper)
         botActor.SetProperty(self._BotProperty)
 
@@ -0,0 +1,745 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: EventBenchmark.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+"""
+EventBenchmark - replay scripted events through a PaneFrame and time them
+
+  The EventBenchmark feeds a list of event objects through the
+  HandleEvent() method of a PaneFrame (usually an OffscreenPaneFrame)
+  and records how long each event takes to dispatch and how long
+  each frame takes to render.  The render time is measured with
+  observers on the vtkRenderWindow, and the dispatch time is the time
+  spent in HandleEvent() minus the time spent rendering.
+
+  The module can also be run as a script to benchmark a few standard
+  scenes::
+
+    python -m vtkAtamai.EventBenchmark [--scene name] [--repeat n]
+                                       [--coalesce] [--micro] [--pick]
+                                       [--reslice] [--threads n,n,...]
+
+  The --micro option runs microbenchmarks of the event dispatch core
+  (EventHandler.HandleEvent and Event creation) instead of the scenes,
+  the --pick option compares volume picking one step at a time
+  with VolumeRayQuery, and the --reslice option measures how the
+  reslicing throughput scales with the number of threads.
+
+  Each scene runs in its own interpreter, so that a scene that cannot
+  be built (or that crashes) is reported without stopping the others.
+
+Derived From:
+
+  object
+
+See Also:
+
+  OffscreenPaneFrame, PaneFrame, EventHandler
+
+Initialization:
+
+  EventBenchmark(*frame*)
+
+Public Methods:
+
+  Run(*events*,*repeat*=1)     -- send the events through the frame
+                                  and record the timings
+
+  Reset()                      -- discard all recorded timings
+
+  GetStatistics()              -- get a dict with the 'event', 'dispatch'
+                                  and 'render' statistics, each of which
+                                  is a dict with 'count', 'mean', 'p50',
+                                  'p90', 'p99' and 'max' in seconds
+
+  PrintReport(*title*='')      -- print the statistics in milliseconds
+
+  tearDown()                   -- remove the observers from the frame
+
+Module Functions:
+
+  MakeEvent(*type*,*x*,*y*,...) -- create an event object
+
+  ClickScript(*x*,*y*,...)     -- events for a button press and release
+
+  DragScript(*x0*,*y0*,*x1*,*y1*,...)
+                               -- events for a press, a drag and a release
+
+  WheelScript(*x*,*y*,...)     -- events for a mouse wheel, sent as
+                                  Tk-style presses of buttons 4 and 5
+
+  DefaultScript(*width*,*height*)
+                               -- the standard click/drag/wheel sequence
+
+  FocusScript(*width*,*height*,*rows*=4,*columns*=4)
+                               -- move and click through a grid of panes,
+                                  so that every event changes the focus
+
+  Percentiles(*values*)        -- compute the summary statistics
+
+  DispatchMicrobenchmark(*n*=200000)
+                               -- time the event dispatch core, returns
+                                  a dict of nanoseconds per operation
+
+  PickMicrobenchmark(*size*=256,*rays*=200)
+                               -- time volume picking, returns a dict
+                                  of milliseconds per ray, and for the
+                                  first ray and the first batch (which
+                                  builds the bricks)
+
+  ResliceMicrobenchmark(*threads*=None,*size*=256,*pixels*=1024)
+                               -- time axial, oblique and slab reslicing
+                                  with each number of threads, returns
+                                  a dict of lists of output megavoxels
+                                  per second
+
+"""
+
+#======================================
+from builtins import range
+from builtins import object
+from past.utils import old_div
+import argparse
+import math
+import subprocess
+import sys
+import time
+import logging
+
+import numpy
+import vtk
+
+from vtkAtamai import EventHandler
+from vtkAtamai import ThreadSettings
+from vtkAtamai import VolumeRayQuery
+
+logger = logging.getLogger(__name__)
+
+#======================================
+
+
+def MakeEvent(type, x, y, num=0, state=0, width=400, height=400,
+              keysym='??', char='\0'):
+    """Create an event object like the ones made by the PaneFrames."""
+    e = EventHandler.Event()
+    e.type = type
+    e.x = x
+    e.y = y
+    e.num = num
+    e.state = state
+    e.width = width
+    e.height = height
+    e.keysym = keysym
+    e.char = char
+    return e
+
+
+def ClickScript(x, y, button=1, state=0, width=400, height=400):
+    """Events for a single click of the specified button."""
+    return [MakeEvent('4', x, y, button, state, width, height),
+            MakeEvent('5', x, y, button, state | (0x80 << button),
+                      width, height)]
+
+
+def DragScript(x0, y0, x1, y1, steps=20, button=1, state=0,
+               width=400, height=400):
+    """Events for dragging from (x0,y0) to (x1,y1) with a button held."""
+    held = state | (0x80 << button)
+    events = [MakeEvent('4', x0, y0, button, state, width, height)]
+    for i in range(1, steps + 1):
+        x = int(x0 + (x1 - x0) * i / float(steps) + 0.5)
+        y = int(y0 + (y1 - y0) * i / float(steps) + 0.5)
+        events.append(MakeEvent('6', x, y, button, held, width, height))
+    events.append(MakeEvent('5', x1, y1, button, held, width, height))
+    return events
+
+
+def WheelScript(x, y, clicks=5, forward=1, state=0, width=400, height=400):
+    """Events for turning the mouse wheel.
+
+    These are sent the way Tk sends them under X11, i.e. as a press
+    and release of button 4 (forward) or button 5 (backward).
+    """
+    button = forward and 4 or 5
+    events = []
+    for i in range(clicks):
+        events = events + ClickScript(x, y, button, state, width, height)
+    return events
+
+
+def DefaultScript(width=400, height=400):
+    """The standard sequence: enter, click, drag with each button, wheel."""
+    cx = width // 2
+    cy = height // 2
+    dx = width // 4
+    dy = height // 4
+    events = [MakeEvent('7', cx, cy, 0, 0, width, height)]
+    events = events + ClickScript(cx, cy, 1, 0, width, height)
+    events = events + DragScript(cx - dx, cy, cx + dx, cy + dy, 20, 1, 0,
+                                 width, height)
+    events = events + DragScript(cx, cy - dy, cx, cy + dy, 20, 2, 0,
+                                 width, height)
+    events = events + DragScript(cx, cy, cx, cy + dy, 20, 3, 0,
+                                 width, height)
+    events = events + WheelScript(cx, cy, 5, 1, 0, width, height)
+    events = events + WheelScript(cx, cy, 5, 0, 0, width, height)
+    events.append(MakeEvent('8', cx, cy, 0, 0, width, height))
+    return events
+
+
+def FocusScript(width=400, height=400, rows=4, columns=4):
+    """Visit every pane in a rows x columns layout, and click in each."""
+    events = [MakeEvent('7', 1, 1, 0, 0, width, height)]
+    for row in range(rows):
+        for column in range(columns):
+            x = int((column + 0.5) * width / columns)
+            y = int((row + 0.5) * height / rows)
+            events.append(MakeEvent('6', x, y, 0, 0, width, height))
+            events = events + ClickScript(x, y, 1, 0, width, height)
+    events.append(MakeEvent('8', 1, 1, 0, 0, width, height))
+    return events
+
+
+def Percentiles(values):
+    """Summary statistics (in the same units as the values)."""
+    if len(values) == 0:
+        return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p90': 0.0,
+                'p99': 0.0, 'max': 0.0}
+    a = numpy.asarray(values, 'd')
+    p50, p90, p99 = numpy.percentile(a, (50, 90, 99))
+    return {'count': len(a), 'mean': float(a.mean()), 'p50': float(p50),
+            'p90': float(p90), 'p99': float(p99), 'max': float(a.max())}
+
+#======================================
+
+
+class EventBenchmark(object):
+
+    def __init__(self, frame):
+        self._Frame = frame
+
+        # elapsed times, in seconds
+        self._EventTimes = []
+        self._DispatchTimes = []
+        self._RenderTimes = []
+
+        # time spent rendering during the current event
+        self._RenderStart = None
+        self._RenderTotal = 0.0
+
+        renwin = frame.GetRenderWindow()
+        self._ObserverTags = [
+            renwin.AddObserver('StartEvent', self._OnStartRender),
+            renwin.AddObserver('EndEvent', self._OnEndRender)]
+
+    def tearDown(self):
+        renwin = self._Frame.GetRenderWindow()
+        if renwin:
+            for tag in self._ObserverTags:
+                renwin.RemoveObserver(tag)
+        self._ObserverTags = []
+        self._Frame = None
+
+    def _OnStartRender(self, obj, event):
+        self._RenderStart = time.perf_counter()
+
+    def _OnEndRender(self, obj, event):
+        if self._RenderStart is None:
+            return
+        elapsed = time.perf_counter() - self._RenderStart
+        self._RenderStart = None
+        self._RenderTimes.append(elapsed)
+        self._RenderTotal = self._RenderTotal + elapsed
+
+    def Reset(self):
+        self._EventTimes = []
+        self._DispatchTimes = []
+        self._RenderTimes = []
+
+    def Run(self, events, repeat=1):
+        """Send the events through the frame, repeat times over."""
+        frame = self._Frame
+        for i in range(repeat):
+            for event in events:
+                # HandleEvent may modify the event, so send a copy
+                e = EventHandler.Event(event)
+                self._RenderTotal = 0.0
+                t = time.perf_counter()
+                frame.HandleEvent(e)
+                elapsed = time.perf_counter() - t
+                self._EventTimes.append(elapsed)
+                self._DispatchTimes.append(max(elapsed - self._RenderTotal,
+                                               0.0))
+            # let the scheduled callbacks (e.g. quality render) run
+            if hasattr(frame, 'ProcessScheduled'):
+                frame.ProcessScheduled()
+
+    def GetStatistics(self):
+        return {'event': Percentiles(self._EventTimes),
+                'dispatch': Percentiles(self._DispatchTimes),
+                'render': Percentiles(self._RenderTimes)}
+
+    def PrintReport(self, title='', file=None):
+        """Print the statistics, in milliseconds."""
+        if file is None:
+            file = sys.stdout
+        stats = self.GetStatistics()
+        if title:
+            file.write("%s\n" % title)
+        file.write("  %-10s %7s %9s %9s %9s %9s %9s\n" %
+                   ('(ms)', 'count', 'mean', 'p50', 'p90', 'p99', 'max'))
+        for key in ('event', 'dispatch', 'render'):
+            s = stats[key]
+            file.write("  %-10s %7d %9.3f %9.3f %9.3f %9.3f %9.3f\n" %
+                       (key, s['count'], 1000 * s['mean'], 1000 * s['p50'],
+                        1000 * s['p90'], 1000 * s['p99'], 1000 * s['max']))
+
+#======================================
+# microbenchmarks
+
+
+def _TimeLoop(func, n):
+    t = time.perf_counter()
+    for i in range(n):
+        func()
+    return (time.perf_counter() - t) * 1e9 / n
+
+
+def DispatchMicrobenchmark(n=200000):
+    """Time the dispatch core, in nanoseconds per operation."""
+    handler = EventHandler.EventHandler()
+    callback = lambda e: None
+    # a typical set of bindings for a RenderPane
+    for descriptor in ('<ButtonPress-1>', '<Shift-ButtonPress-1>',
+                       '<ButtonPress-2>', '<ButtonPress-3>',
+                       '<B1-Motion>', '<Motion>', '<ButtonRelease-1>',
+                       '<KeyPress-r>', '<Control-KeyPress-Left>',
+                       '<Enter>', '<Leave>', '<Configure>'):
+        handler.BindEvent(descriptor, callback)
+
+    motion = MakeEvent('6', 100, 100, 1, 256)
+    # the panes add these to the events that they receive
+    motion.renderer = vtk.vtkRenderer()
+    motion.picker = vtk.vtkCellPicker()
+    motion.pane = handler
+    press = MakeEvent('4', 100, 100, 1, 1)
+    key = MakeEvent('2', 100, 100, keysym='Left', state=4)
+    unbound = MakeEvent('9', 100, 100)
+
+    return {
+        'motion': _TimeLoop(lambda: handler.HandleEvent(motion), n),
+        'press': _TimeLoop(lambda: handler.HandleEvent(press), n),
+        'key': _TimeLoop(lambda: handler.HandleEvent(key), n),
+        'unbound': _TimeLoop(lambda: handler.HandleEvent(unbound), n),
+        'new event': _TimeLoop(
+            lambda: MakeEvent('6', 100, 100, 1, 256), n),
+        'copy event': _TimeLoop(lambda: EventHandler.Event(motion), n),
+        'derive event': _TimeLoop(
+            lambda: EventHandler.DeriveEvent(motion, '8'), n),
+    }
+
+
+def _PrintMicrobenchmark(file=None):
+    if file is None:
+        file = sys.stdout
+    results = DispatchMicrobenchmark()
+    file.write("Event dispatch core\n")
+    for key in ('motion', 'press', 'key', 'unbound', 'new event',
+                'copy event', 'derive event'):
+        file.write("  %-12s %9.1f ns\n" % (key, results[key]))
+
+def _MarchRay(vol, opacity, p1, p2, spacing, threshold):
+    # the pick ray march as VolumeFactory used to do it, with one
+    # call to vtkImplicitVolume per step
+    vec = [b - a for a, b in zip(p1, p2)]
+    pathlength = math.sqrt(vec[0] ** 2 + vec[1] ** 2 + vec[2] ** 2)
+    N = int(math.ceil(abs(old_div(pathlength, spacing))))
+    dx, dy, dz = (old_div(vec[0], N), old_div(vec[1], N),
+                  old_div(vec[2], N))
+    dr = math.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
+    result = []
+    for (x0, y0, z0), s in ((p1, 1), (p2, -1)):
+        transparency = 1.0
+        for i in range(N):
+            x = x0 + s * i * dx
+            y = y0 + s * i * dy
+            z = z0 + s * i * dz
+            value = vol.FunctionValue(x + s * old_div(dx, 2),
+                                      y + s * old_div(dy, 2),
+                                      z + s * old_div(dz, 2))
+            alpha = opacity.GetValue(value)
+            transparency = transparency * math.pow(1.0 - alpha, dr)
+            if (1.0 - transparency) > threshold:
+                result.append((x, y, z))
+                result.append(vol.FunctionGradient(x, y, z))
+                break
+        else:
+            return None
+    return result
+
+
+def PickMicrobenchmark(size=256, rays=200):
+    """Time volume picking, in milliseconds per ray."""
+    # a blob in the middle, with empty space around it
+    source = vtk.vtkImageGaussianSource()
+    source.SetWholeExtent(0, size - 1, 0, size - 1, 0, size - 1)
+    source.SetCenter(0.5 * size, 0.5 * size, 0.5 * size)
+    source.SetMaximum(255.0)
+    source.SetStandardDeviation(0.25 * size)
+    cast = vtk.vtkImageCast()
+    cast.SetInputConnection(source.GetOutputPort())
+    cast.SetOutputScalarTypeToUnsignedChar()
+    cast.Update()
+    image = cast.GetOutput()
+    vol = vtk.vtkImplicitVolume()
+    vol.SetVolume(image)
+    vol.SetTransform(vtk.vtkTransform())
+    opacity = vtk.vtkPiecewiseFunction()
+    opacity.AddPoint(0, 0.0)
+    opacity.AddPoint(100, 0.0)
+    opacity.AddPoint(255, 0.02)
+    query = VolumeRayQuery.VolumeRayQuery()
+    query.SetImplicitVolume(vol)
+    query.SetOpacityTransferFunction(opacity)
+    query.SetPickThreshold(0.99)
+
+    # rays through the volume from corner to corner
+    rng = numpy.random.RandomState(0)
+    starts = rng.uniform(0, size - 1, (rays, 3))
+    ends = rng.uniform(0, size - 1, (rays, 3))
+    starts[:, 0] = 0
+    ends[:, 0] = size - 1
+    pairs = list(zip(starts.tolist(), ends.tolist()))
+
+    n = max(rays // 10, 1)
+    t = time.perf_counter()
+    for p1, p2 in pairs[0:n]:
+        _MarchRay(vol, opacity, p1, p2, 1.0, 0.99)
+    loop = (time.perf_counter() - t) * 1e3 / n
+    # single rays do not build the brick grid for empty-space skipping
+    t = time.perf_counter()
+    query.CastRay(*pairs[0])
+    first = (time.perf_counter() - t) * 1e3
+    t = time.perf_counter()
+    for p1, p2 in pairs:
+        query.CastRay(p1, p2)
+    single = (time.perf_counter() - t) * 1e3 / rays
+    # but batches do
+    t = time.perf_counter()
+    query.CastRays(starts[0:2], ends[0:2])
+    firstBatch = (time.perf_counter() - t) * 1e3
+    t = time.perf_counter()
+    query.CastRays(starts, ends)
+    batch = (time.perf_counter() - t) * 1e3 / rays
+
+    return {'step loop': loop, 'first ray': first, 'single ray': single,
+            'first batch': firstBatch, 'batch': batch}
+
+
+def _PrintPickMicrobenchmark(file=None):
+    if file is None:
+        file = sys.stdout
+    results = PickMicrobenchmark()
+    file.write("Volume picking, 256^3 volume\n")
+    for key in ('step loop', 'single ray', 'batch'):
+        file.write("  %-12s %9.3f ms/ray %7.1fx\n" %
+                   (key, results[key], results['step loop'] / results[key]))
+    for key in ('first ray', 'first batch'):
+        file.write("  %-12s %9.3f ms\n" % (key, results[key]))
+
+
+def _MakeReslice(case, source, size, pixels):
+    # a slice through the middle of the volume, with more pixels than
+    # the volume has voxels so that there is enough work for the threads
+    if case == 'slab':
+        reslice = vtk.vtkImageSlabReslice()
+        reslice.SetSlabThickness(0.125 * size)
+        reslice.SetBlendModeToMean()
+    else:
+        reslice = vtk.vtkImageReslice()
+        reslice.SetOutputDimensionality(2)
+    reslice.SetInputConnection(source.GetOutputPort())
+    reslice.SetInterpolationModeToLinear()
+    transform = vtk.vtkTransform()
+    transform.Translate(0.5 * size, 0.5 * size, 0.5 * size)
+    if case == 'oblique':
+        transform.RotateX(30.0)
+        transform.RotateY(30.0)
+    transform.Translate(-0.5 * size, -0.5 * size, 0.0)
+    reslice.SetResliceTransform(transform)
+    spacing = float(size) / pixels
+    reslice.SetOutputSpacing(spacing, spacing, 1.0)
+    reslice.SetOutputOrigin(0.0, 0.0, 0.0)
+    reslice.SetOutputExtent(0, pixels - 1, 0, pixels - 1, 0, 0)
+    return reslice
+
+
+def ResliceMicrobenchmark(threads=None, size=256, pixels=1024, repeat=5):
+    """Time reslicing, in output megavoxels per second."""
+    if threads is None:
+        n = vtk.vtkMultiThreader.GetGlobalDefaultNumberOfThreads()
+        threads = [1]
+        while threads[-1] * 2 < n:
+            threads.append(threads[-1] * 2)
+        if threads[-1] != n:
+            threads.append(n)
+
+    source = _MakeImageSource(size)
+    settings = ThreadSettings.ThreadSettings()
+    results = {}
+    for case in ('axial', 'oblique', 'slab'):
+        reslice = _MakeReslice(case, source, size, pixels)
+        results[case] = []
+        for n in threads:
+            settings.SetNumberOfThreads(n)
+            settings.Apply(reslice)
+            # the first execution allocates the output
+            reslice.Update()
+            best = None
+            for i in range(repeat):
+                reslice.Modified()
+                t = time.perf_counter()
+                reslice.Update()
+                t = time.perf_counter() - t
+                if best is None or t < best:
+                    best = t
+            results[case].append(pixels * pixels * 1e-6 / best)
+
+    results['threads'] = threads
+    return results
+
+
+def _PrintResliceMicrobenchmark(threads=None, file=None):
+    if file is None:
+        file = sys.stdout
+    results = ResliceMicrobenchmark(threads)
+    file.write("Reslicing, 256^3 volume to 1024^2 slices, Mvoxel/s "
+               "(speedup)\n")
+    file.write("  %-8s" % 'threads')
+    for case in ('axial', 'oblique', 'slab'):
+        file.write(" %18s" % case)
+    file.write("\n")
+    for i, n in enumerate(results['threads']):
+        file.write("  %-8d" % n)
+        for case in ('axial', 'oblique', 'slab'):
+            file.write(" %10.1f (%4.1fx)" %
+                       (results[case][i],
+                        results[case][i] / results[case][0]))
+        file.write("\n")
+
+#======================================
+# the standard scenes
+
+
+def _MakeImageSource(size=128):
+    source = vtk.vtkImageSinusoidSource()
+    source.SetWholeExtent(0, size - 1, 0, size - 1, 0, size - 1)
+    source.SetPeriod(size / 4.0)
+    cast = vtk.vtkImageShiftScale()
+    cast.SetInputConnection(source.GetOutputPort())
+    cast.SetShift(1.0)
+    cast.SetScale(127.5)
+    cast.SetOutputScalarTypeToUnsignedChar()
+    cast.Update()
+    return cast
+
+
+def _MakeRenderPaneScene(frame, source):
+    from vtkAtamai import RenderPane, SlicePlaneFactory
+    pane = RenderPane.RenderPane(frame)
+    factory = SlicePlaneFactory.SlicePlaneFactory()
+    factory.AddInputConnection(source.GetOutputPort())
+    pane.ConnectActorFactory(factory)
+    pane.GetRenderer().ResetCamera()
+    return pane
+
+
+def _MakeImagePaneScene(frame, source):
+    from vtkAtamai import ImagePane
+    pane = ImagePane.ImagePane(frame)
+    pane.SetInput(source.GetOutput())
+    return pane
+
+
+def _MakeOrthoPlanesScene(frame, source):
+    from vtkAtamai import RenderPane, OrthoPlanesFactory
+    pane = RenderPane.RenderPane(frame)
+    factory = OrthoPlanesFactory.OrthoPlanesFactory()
+    factory.AddInputConnection(source.GetOutputPort())
+    pane.ConnectActorFactory(factory)
+    pane.GetRenderer().ResetCamera()
+    return pane
+
+
+def _MakeGrid4x4Scene(frame, source):
+    # sixteen panes, to measure the cost of focus changes
+    from vtkAtamai import RenderPane, OutlineFactory
+    for row in range(4):
+        for column in range(4):
+            pane = RenderPane.RenderPane(frame)
+            pane.SetViewport(column / 4.0, row / 4.0,
+                             (column + 1) / 4.0, (row + 1) / 4.0)
+            factory = OutlineFactory.OutlineFactory()
+            factory.SetInputConnection(source.GetOutputPort())
+            pane.ConnectActorFactory(factory)
+            pane.GetRenderer().ResetCamera()
+    return pane
+
+
+Scenes = {'RenderPane': _MakeRenderPaneScene,
+          'ImagePane': _MakeImagePaneScene,
+          'OrthoPlanes': _MakeOrthoPlanesScene,
+          'Grid4x4': _MakeGrid4x4Scene}
+
+# the scenes that use something other than DefaultScript()
+Scripts = {'Grid4x4': FocusScript}
+
+
+def RunScene(name, repeat=10, width=400, height=400, file=None,
+             coalesce=0):
+    """Build the named scene offscreen and benchmark the default script."""
+    from vtkAtamai import OffscreenPaneFrame
+    frame = OffscreenPaneFrame.OffscreenPaneFrame(width, height)
+    frame.SetMotionCoalescing(coalesce)
+    # keep a reference to the source for as long as the scene exists
+    source = _MakeImageSource()
+    Scenes[name](frame, source)
+    frame.SetSize(width, height)
+    frame.Start()
+
+    benchmark = EventBenchmark(frame)
+    benchmark.Run(Scripts.get(name, DefaultScript)(width, height), repeat)
+    benchmark.PrintReport("%s (%dx%d, %d passes)" %
+                          (name, width, height, repeat), file)
+    if coalesce:
+        (file or sys.stdout).write("  dropped motion events: %d\n" %
+                                   frame.GetNumberOfDroppedEvents())
+    stats = benchmark.GetStatistics()
+    benchmark.tearDown()
+    frame.tearDown()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay scripted events through offscreen scenes.")
+    parser.add_argument('--scene', choices=sorted(Scenes.keys()),
+                        help="run only this scene, in this process")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--width', type=int, default=400)
+    parser.add_argument('--height', type=int, default=400)
+    parser.add_argument('--coalesce', action='store_true',
+                        help="turn on motion coalescing in the frame")
+    parser.add_argument('--micro', action='store_true',
+                        help="run the dispatch microbenchmarks instead")
+    parser.add_argument('--pick', action='store_true',
+                        help="run the volume picking benchmark instead")
+    parser.add_argument('--reslice', action='store_true',
+                        help="run the reslice threading benchmark instead")
+    parser.add_argument('--threads',
+                        help="comma-separated thread counts for --reslice")
+    args = parser.parse_args(argv)
+
+    if args.micro:
+        _PrintMicrobenchmark()
+        return 0
+
+    if args.pick:
+        _PrintPickMicrobenchmark()
+        return 0
+
+    if args.reslice:
+        threads = None
+        if args.threads:
+            threads = [int(x) for x in args.threads.split(',')]
+        _PrintResliceMicrobenchmark(threads)
+        return 0
+
+    if args.scene:
+        RunScene(args.scene, args.repeat, args.width, args.height,
+                 coalesce=args.coalesce)
+        return 0
+
+    status = 0
+    for name in sorted(Scenes.keys()):
+        cmd = [sys.executable, '-m', 'vtkAtamai.EventBenchmark',
+               '--scene', name, '--repeat', str(args.repeat),
+               '--width', str(args.width), '--height', str(args.height)]
+        if args.coalesce:
+            cmd.append('--coalesce')
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        out, err = proc.communicate()
+        if proc.returncode == 0:
+            sys.stdout.write(out)
+        else:
+            status = 1
+            # skip the VTK log messages, which are colorized
+            lines = [l for l in err.splitlines()
+                     if l.strip() and not l.startswith('\x1b')]
+            if proc.returncode < 0:
+                reason = "killed by signal %d" % -proc.returncode
+            elif lines:
+                reason = lines[-1]
+            else:
+                reason = "exit status %d" % proc.returncode
+            sys.stdout.write("%s: skipped, scene failed (%s)\n" %
+                             (name, reason))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -122,6 +122,15 @@ Class Attributes:
                         e.g. "Motion", into Tkinter-style event
                         type constants
 
+  EventCode          -- dictionary to convert event descriptors
+                        into integer event codes
+
+Module Functions:
+
+  DeriveEvent(*event*,*type*)
+                     -- make a shallow copy of an event with a new type,
+                        e.g. to turn a Motion event into a Leave event
+
 
 Event Binding:
 
@@ -185,6 +194,17 @@ Event Handling:
   successfully, or '1' if the event was ignored.
 
 
+Dispatch:
+
+  Internally the event types are converted to the integer codes in
+  EventHandler.EventCode, and each (code, keysym or button, modifier)
+  combination is resolved to a callback only once.  The result is
+  kept in a dispatch table that is cleared whenever BindEvent() is
+  called, so HandleEvent() is usually a single dictionary lookup.
+  The event.type can be a Tk-style string (e.g. '6'), an int, or a
+  Tkinter event type.
+
+
 Bugs, Missing Features:
 
   - Only one callback can be bound to a particular event at any point
@@ -196,12 +216,14 @@ Bugs, Missing Features:
     textual event.type attribute ("Motion" instead of "6") should be
     done.
 
-  - Alternatively, constants could be introduced e.g. ET_Motion = "6"
-    but this would be less efficient than using string literals.
+  - Alternatively, the integer constants in EventHandler.EventCode
+    could be used for event.type, but most of the code still compares
+    event.type against the Tk-style strings.
 
 """
 
 #======================================
+import operator
 import time
 import sys
 
@@ -219,7 +241,16 @@ else:  # UNIX
 
 class Event(object):
 
-    """The event class is just a container for attributes."""
+    """The event class is just a container for attributes.
+
+    The standard attributes are stored in slots, any other attributes
+    (e.g. the 'actor' or 'picker' added by the RenderPane) go into the
+    instance dictionary.
+
+    """
+
+    __slots__ = ('type', 'state', 'num', 'x', 'y', 'width', 'height',
+                 'keysym', 'char', '__dict__')
 
     def __init__(self, event=None):
         """Construct an event object.
@@ -229,8 +260,45 @@ class Event(object):
 
         """
         if event is not None:
-            for key, val in list(event.__dict__.items()):
-                setattr(self, key, val)
+            if isinstance(event, Event):
+                try:
+                    (self.type, self.state, self.num, self.x, self.y,
+                     self.width, self.height, self.keysym, self.char) = \
+                        _GetEventSlots(event)
+                except AttributeError:
+                    # some of the slots are not set
+                    for key in _EventSlots:
+                        val = getattr(event, key, _Unset)
+                        if val is not _Unset:
+                            setattr(self, key, val)
+                self.__dict__.update(event.__dict__)
+            else:
+                # e.g. a Tkinter event, whose attributes are all in its
+                # __dict__, setattr puts the standard ones into slots
+                for key, val in event.__dict__.items():
+                    setattr(self, key, val)
+
+
+_EventSlots = Event.__slots__[:-1]
+_GetEventSlots = operator.attrgetter(*_EventSlots)
+
+
+def DeriveEvent(event, type):
+    """Make a new event from an existing one, but with a new type.
+
+    This is a shallow copy: attributes such as 'renderer' or 'picker'
+    refer to the same objects as in the original event, but setting
+    attributes on the new event does not change the original.  The
+    original can be an Event or a Tkinter event.
+
+    """
+    e = Event(event)
+    e.type = type
+    return e
+
+# marks an unset slot, or a dispatch table entry that is not resolved
+_Unset = object()
+_Unresolved = _Unset
 
 #======================================
 
@@ -291,6 +359,30 @@ class EventHandler(object):
         "Configure": _func('22'),
     }
 
+    # Dictionary to convert an event type descriptor to an integer code.
+    EventCode = {
+        "KeyPress": 2,
+        "Key": 2,
+        "KeyRelease": 3,
+        "ButtonPress": 4,
+        "Button": 4,
+        "ButtonRelease": 5,
+        "Motion": 6,
+        "Enter": 7,
+        "Leave": 8,
+        "FocusIn": 9,
+        "FocusOut": 10,
+        "Configure": 22,
+    }
+
+    # Cache that converts any event.type (string, int, or Tkinter
+    # EventType) into an integer code, see _TypeCode()
+    _TypeCodes = {}
+    for _code in EventCode.values():
+        _TypeCodes[_code] = _code
+        _TypeCodes[str(_code)] = _code
+    del _code
+
     def __init__(self):
         """Create an EventHandler with no bindings."""
 
@@ -299,6 +391,18 @@ class EventHandler(object):
 
     def RemoveAllEventHandlers(self):
         self.__EventDict = {}
+        self.__DispatchTable = {}
+
+    @staticmethod
+    def _TypeCode(type):
+        """Convert an event type to an integer code."""
+        code = EventHandler._TypeCodes.get(type)
+        if code is None:
+            code = int(type)
+            # limit the size, in case types are made on the fly
+            if len(EventHandler._TypeCodes) < 256:
+                EventHandler._TypeCodes[type] = code
+        return code
 
     #-------------------------------------------------------------------
     def BindEvent(self, eventDescriptor, func):
@@ -337,18 +441,24 @@ class EventHandler(object):
 
         # find the event type
         try:
-            type = self.EventType[field[0]]
+            type = self._TypeCode(self.EventType[field[0]])
             del field[0]
         except KeyError:
-            type = '2'
+            type = 2
 
         # find the keysym/button
         keysym = None
         try:
             keysym = field[0]
             # need to modify keysym if shift or caps
-            if ((type in ('2', '3')) and (modifier & 3) and (len(keysym) == 1)):
+            if ((type in (2, 3)) and (modifier & 3) and (len(keysym) == 1)):
                 keysym = keysym.upper()
+            # buttons are matched against event.num, which is an int
+            if type in (4, 5):
+                try:
+                    keysym = int(keysym)
+                except ValueError:
+                    pass
 
             del field[0]
         except:
@@ -357,6 +467,9 @@ class EventHandler(object):
         if (len(field) != 0):
             raise ValueError("malformed event discriptor " + eventDescriptor)
 
+        # the bindings have changed, so the dispatch table is stale
+        self.__DispatchTable = {}
+
         # check to see if event is already bound, and make an
         # entry if it isn't
         try:
@@ -374,10 +487,7 @@ class EventHandler(object):
             eventList = keysymList
 
         # grab the function that was previously bound
-        try:
-            oldfunc = eventList[1][modifier]
-        except:
-            oldfunc = None
+        oldfunc = eventList[1].get(modifier)
 
         if func:
             # specify which modifiers have specific handlers,
@@ -418,31 +528,55 @@ class EventHandler(object):
         """
         # dispatch events to the handlers
         type = event.type
-        try:
-            modifier = event.state
-        except AttributeError:
-            modifier = 0
-        keysym = '0'
-        if int(type) <= 3:    # if key event
+        code = self._TypeCodes.get(type)
+        if code is None:
+            code = self._TypeCode(type)
+        modifier = getattr(event, 'state', 0)
+        if code <= 3:    # if key event
             keysym = event.keysym
-        elif int(type) <= 5:  # if mouse press event
-            keysym = str(event.num)
-
-        # search for the event (this is pretty quick)
-        try:
-            eventList = self.__EventDict[type]
-            try:  # see if there is a keysym/button specific binding
-                keysymList = eventList[2][keysym]
-                func = keysymList[1][keysymList[0] & modifier]
-            except KeyError:
-                func = eventList[1][eventList[0] & modifier]
-
-        except KeyError:  # event not bound
+        elif code <= 5:  # if mouse press event
+            keysym = event.num
+        else:
+            keysym = '0'
+
+        # look up the resolved callback (this is very quick)
+        key = (code, keysym, modifier)
+        func = self.__DispatchTable.get(key, _Unresolved)
+        if func is _Unresolved:
+            func = self._ResolveEvent(code, keysym, modifier)
+            # the modifiers include the double-click count, so
+            # don't let the table grow without bound
+            if len(self.__DispatchTable) > 1024:
+                self.__DispatchTable = {}
+            self.__DispatchTable[key] = func
+
+        if func is None:  # event not bound
             return 1
 
         # call the handler function!
         return func(event)
 
+    def _ResolveEvent(self, code, keysym, modifier):
+        """Find the callback for an event, or None if not bound."""
+        eventList = self.__EventDict.get(code)
+        if eventList is None:
+            return None
+
+        if code in (4, 5) and not isinstance(keysym, int):
+            try:
+                keysym = int(keysym)
+            except (TypeError, ValueError):
+                pass
+
+        # see if there is a keysym/button specific binding
+        func = None
+        keysymList = eventList[2].get(keysym)
+        if keysymList is not None:
+            func = keysymList[1].get(keysymList[0] & modifier)
+        if func is None:
+            func = eventList[1].get(eventList[0] & modifier)
+        return func
+
     #-------------------------------------------------------------------
     def PrintEvent(self, event):
         """A diagnostic method that prints all event attributes."""
@@ -0,0 +1,449 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: EventRecorder.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+"""
+EventRecorder - record the events of a PaneFrame and replay them later
+
+  The EventRecorder captures every event that a PaneFrame receives and
+  writes it to a compact binary log, along with the time at which it
+  arrived and the geometry of the window and its panes.  The
+  EventReplayer sends the events in such a log through another
+  PaneFrame, either at their original pace or as fast as possible,
+  so that a real session can be profiled offline (e.g. with an
+  OffscreenPaneFrame).
+
+  All of the GUI toolkits (tk, qt, wx and the plain vtk interactor)
+  convert their native events into event objects and pass them to
+  PaneFrame.HandleEvent(), so that is where the recorder is hooked in.
+  Because of this, the log contains the converted events, i.e. the
+  coordinates are already flipped to VTK display coordinates.  Mouse
+  wheel events do not go through HandleEvent(), they are taken from
+  the render window interactor instead.
+
+  A typical session looks like this::
+
+    recorder = EventRecorder.EventRecorder(frame, 'session.evl')
+    recorder.Start()
+    ...
+    recorder.Stop()
+
+    replayer = EventRecorder.EventReplayer(offscreenFrame)
+    replayer.Replay('session.evl', realtime=1)
+
+Derived From:
+
+  object
+
+See Also:
+
+  PaneFrame, OffscreenPaneFrame, EventBenchmark
+
+Initialization:
+
+  EventRecorder(*frame*,*file*)
+
+  *frame*  - the PaneFrame to record
+
+  *file*   - a filename, or a file object opened for binary writing
+
+  EventReplayer(*frame*)
+
+  *frame*  - the PaneFrame that the events will be sent to
+
+Public Methods:
+
+  EventRecorder:
+
+  Start()                      -- start recording (writes the header and
+                                  the current geometry)
+
+  Stop()                       -- stop recording and close the log
+                                  (unless a file object was supplied)
+
+  IsRecording()                -- check whether recording is in progress
+
+  GetNumberOfRecords()         -- number of records written so far
+
+  EventReplayer:
+
+  Replay(*file*,*realtime*=0,*speed*=1.0)
+                               -- send the logged events to the frame,
+                                  returns the number of records replayed
+
+Module Functions:
+
+  ReadEventLog(*file*)         -- read a log, returns a list of
+                                  (*time*,*kind*,*data*) tuples, where
+                                  *data* is an event object for EVENT,
+                                  WHEEL_FORWARD and WHEEL_BACKWARD records
+                                  or a (*width*,*height*,*viewports*) tuple
+                                  for GEOMETRY records
+
+Log Format:
+
+  The log starts with the 4-byte magic string 'AEVL' and a 16-bit
+  version number.  Each record is a little-endian struct of the time
+  in seconds since the start of the recording (double) and the kind of
+  record (byte), followed by the record body.  An event body has the
+  type, button number, state, x, y, width and height of the event,
+  followed by the keysym and char as length-prefixed UTF-8 strings.
+  A geometry body has the window size and the pixel viewport of each
+  pane.
+
+"""
+
+#======================================
+from builtins import range
+from builtins import object
+import struct
+import time
+import logging
+
+from vtkAtamai import EventHandler
+from vtkAtamai import RenderTiming
+
+logger = logging.getLogger(__name__)
+
+#======================================
+
+MAGIC = b'AEVL'
+VERSION = 1
+
+# the kinds of records
+EVENT = 0
+WHEEL_FORWARD = 1
+WHEEL_BACKWARD = 2
+GEOMETRY = 3
+
+_Header = struct.Struct('<4sH')
+_RecordHead = struct.Struct('<dB')
+_EventBody = struct.Struct('<BBIhhHH')
+_GeometryBody = struct.Struct('<HHB')
+_Viewport = struct.Struct('<hhhh')
+
+
+def _Clamp(value, low, high):
+    return min(max(int(value), low), high)
+
+
+def _PackString(s):
+    if s is None:
+        s = ''
+    if not isinstance(s, str):
+        s = str(s)
+    data = s.encode('utf-8')[:255]
+    return struct.pack('<B', len(data)) + data
+
+
+def _PackEvent(event):
+    """Convert an event object (or a Tk event) into a record body."""
+    # Tk uses '??' for the attributes that don't apply to an event
+    num = getattr(event, 'num', 0)
+    if not isinstance(num, int):
+        num = 0
+    state = getattr(event, 'state', 0)
+    if not isinstance(state, int):
+        state = 0
+    body = _EventBody.pack(int(event.type) & 0xff,
+                           _Clamp(num, 0, 255),
+                           state & 0xffffffff,
+                           _Clamp(getattr(event, 'x', 0), -32768, 32767),
+                           _Clamp(getattr(event, 'y', 0), -32768, 32767),
+                           _Clamp(getattr(event, 'width', 0) or 0, 0, 65535),
+                           _Clamp(getattr(event, 'height', 0) or 0, 0, 65535))
+    return body + _PackString(getattr(event, 'keysym', '??')) + \
+        _PackString(getattr(event, 'char', '\0'))
+
+
+def _ReadExactly(f, n):
+    data = f.read(n)
+    if len(data) != n:
+        raise EOFError("truncated event log")
+    return data
+
+
+def _ReadString(f):
+    n = struct.unpack('<B', _ReadExactly(f, 1))[0]
+    return _ReadExactly(f, n).decode('utf-8')
+
+
+def _ReadEvent(f):
+    type, num, state, x, y, width, height = \
+        _EventBody.unpack(_ReadExactly(f, _EventBody.size))
+    e = EventHandler.Event()
+    e.type = str(type)
+    e.num = num
+    e.state = state
+    e.x = x
+    e.y = y
+    e.width = width
+    e.height = height
+    e.keysym = _ReadString(f)
+    e.char = _ReadString(f)
+    return e
+
+
+def _ReadGeometry(f):
+    width, height, n = \
+        _GeometryBody.unpack(_ReadExactly(f, _GeometryBody.size))
+    viewports = []
+    for i in range(n):
+        viewports.append(_Viewport.unpack(_ReadExactly(f, _Viewport.size)))
+    return (width, height, viewports)
+
+
+def ReadEventLog(file):
+    """Read an event log, see the module documentation."""
+    if isinstance(file, str):
+        f = open(file, 'rb')
+    else:
+        f = file
+    try:
+        magic, version = _Header.unpack(_ReadExactly(f, _Header.size))
+        if magic != MAGIC:
+            raise ValueError("not an event log")
+        if version > VERSION:
+            raise ValueError("unsupported event log version %d" % version)
+        records = []
+        while 1:
+            head = f.read(_RecordHead.size)
+            if not head:
+                break
+            if len(head) != _RecordHead.size:
+                raise EOFError("truncated event log")
+            t, kind = _RecordHead.unpack(head)
+            if kind == GEOMETRY:
+                data = _ReadGeometry(f)
+            elif kind in (EVENT, WHEEL_FORWARD, WHEEL_BACKWARD):
+                data = _ReadEvent(f)
+            else:
+                raise ValueError("unknown record kind %d" % kind)
+            records.append((t, kind, data))
+    finally:
+        if f is not file:
+            f.close()
+    return records
+
+#======================================
+
+
+class EventRecorder(object):
+
+    def __init__(self, frame, file):
+        self._Frame = frame
+        self._File = file
+        self._Stream = None
+        self._StartTime = 0.0
+        self._NumberOfRecords = 0
+        self._ObserverTags = []
+
+    def IsRecording(self):
+        return self._Stream is not None
+
+    def GetNumberOfRecords(self):
+        return self._NumberOfRecords
+
+    def Start(self):
+        """Start recording the events that arrive at the frame."""
+        if self._Stream is not None:
+            return
+        if isinstance(self._File, str):
+            self._Stream = open(self._File, 'wb')
+        else:
+            self._Stream = self._File
+        self._Stream.write(_Header.pack(MAGIC, VERSION))
+        self._StartTime = RenderTiming.Clock()
+        self._NumberOfRecords = 0
+
+        # shadow the bound method, so that every backend goes through us
+        frame = self._Frame
+        handler = frame.HandleEvent
+        frame.HandleEvent = lambda e, s=self, h=handler: s._OnEvent(e, h)
+
+        interactor = frame._RenderWindowInteractor
+        if interactor:
+            self._ObserverTags = [
+                interactor.AddObserver('MouseWheelForwardEvent',
+                                       self._OnWheelForward),
+                interactor.AddObserver('MouseWheelBackwardEvent',
+                                       self._OnWheelBackward)]
+
+        self._WriteGeometry()
+
+    def Stop(self):
+        """Stop recording, and close the log if we opened it."""
+        if self._Stream is None:
+            return
+        frame = self._Frame
+        try:
+            del frame.HandleEvent
+        except AttributeError:
+            pass
+        interactor = frame._RenderWindowInteractor
+        if interactor:
+            for tag in self._ObserverTags:
+                interactor.RemoveObserver(tag)
+        self._ObserverTags = []
+
+        if self._Stream is not self._File:
+            self._Stream.close()
+        else:
+            self._Stream.flush()
+        self._Stream = None
+
+    def _WriteRecord(self, kind, body):
+        t = RenderTiming.Clock() - self._StartTime
+        self._Stream.write(_RecordHead.pack(t, kind) + body)
+        self._NumberOfRecords = self._NumberOfRecords + 1
+
+    def _WriteGeometry(self):
+        width, height = self._Frame.GetRenderWindow().GetSize()
+        body = _GeometryBody.pack(_Clamp(width, 0, 65535),
+                                  _Clamp(height, 0, 65535),
+                                  len(self._Frame.GetRenderPanes()) & 0xff)
+        for pane in self._Frame.GetRenderPanes()[:255]:
+            xmin, ymin, xmax, ymax = pane.GetRenderer().GetViewport()
+            body = body + _Viewport.pack(int(xmin * width + 0.5),
+                                         int(ymin * height + 0.5),
+                                         int(xmax * width + 0.5),
+                                         int(ymax * height + 0.5))
+        self._WriteRecord(GEOMETRY, body)
+
+    def _OnEvent(self, event, handler):
+        if self._Stream is not None:
+            try:
+                self._WriteRecord(EVENT, _PackEvent(event))
+            except (TypeError, ValueError, AttributeError):
+                logger.exception("EventRecorder: could not record event")
+        result = handler(event)
+        # the panes are rearranged by Configure events
+        if self._Stream is not None and str(event.type) == '22':
+            self._WriteGeometry()
+        return result
+
+    def _OnWheel(self, obj, kind):
+        e = EventHandler.Event()
+        e.type = '4'
+        e.num = (kind == WHEEL_FORWARD) and 4 or 5
+        e.state = 1 * (obj.GetShiftKey() > 0) | \
+            4 * (obj.GetControlKey() > 0) | \
+            self._Frame._State
+        (e.x, e.y) = obj.GetEventPosition()
+        (e.width, e.height) = obj.GetSize()
+        e.keysym = '??'
+        e.char = '\0'
+        self._WriteRecord(kind, _PackEvent(e))
+
+    def _OnWheelForward(self, obj, event):
+        self._OnWheel(obj, WHEEL_FORWARD)
+
+    def _OnWheelBackward(self, obj, event):
+        self._OnWheel(obj, WHEEL_BACKWARD)
+
+#======================================
+
+
+class EventReplayer(object):
+
+    def __init__(self, frame):
+        self._Frame = frame
+
+    def Replay(self, file, realtime=0, speed=1.0):
+        """Send the events in the log to the frame.
+
+        If realtime is set, the original timing is reproduced (scaled
+        by speed), otherwise the events are sent as fast as possible.
+        """
+        frame = self._Frame
+        records = ReadEventLog(file)
+        start = RenderTiming.Clock()
+        for t, kind, data in records:
+            if realtime:
+                delay = start + t / speed - RenderTiming.Clock()
+                if delay > 0:
+                    time.sleep(delay)
+            if kind == GEOMETRY:
+                self._SetGeometry(data)
+            elif kind == EVENT:
+                frame.HandleEvent(data)
+            else:
+                self._Wheel(kind, data)
+            # offscreen frames have no event loop to run the timers
+            if hasattr(frame, 'ProcessScheduled'):
+                frame.ProcessScheduled()
+        return len(records)
+
+    def _SetGeometry(self, geometry):
+        width, height, viewports = geometry
+        if len(viewports) != len(self._Frame.GetRenderPanes()):
+            logger.warning("EventReplayer: log has %d panes, frame has %d",
+                           len(viewports), len(self._Frame.GetRenderPanes()))
+        if hasattr(self._Frame, 'SetSize') and \
+                tuple(self._Frame.GetRenderWindow().GetSize()) != \
+                (width, height):
+            self._Frame.SetSize(width, height)
+
+    def _Wheel(self, kind, event):
+        interactor = self._Frame._RenderWindowInteractor
+        if not interactor:
+            return
+        interactor.SetEventInformation(event.x, event.y,
+                                       (event.state & 4) != 0,
+                                       (event.state & 1) != 0)
+        if kind == WHEEL_FORWARD:
+            interactor.MouseWheelForwardEvent()
+        else:
+            interactor.MouseWheelBackwardEvent()
@@ -220,6 +220,13 @@ class Frame(Widget):
 
         return (x >= 0 and y >= 0 and x < width and y < height)
 
+    def _GetHitRect(self):
+        x0, y0 = self._DisplayOrigin
+        borderwidth = self._Config['borderwidth']
+        width, height = self._DisplaySize
+        return (x0 - borderwidth, y0 - borderwidth,
+                x0 + width + borderwidth, y0 + height + borderwidth)
+
     def ConfigureGeometry(self, position, size):
         # account for the size of the border when doing configuration
 
@@ -73,11 +73,19 @@ ImagePane - high-quality image viewer
   RenderPane2D) is that the coordinate system in the window is a 2D
   coordinate system where horizontal is X, vertical is Y, and Z is always
   zero.
+
+  While the render quality is reduced by the LODController, the
+  dynamic interpolation (used during pan, zoom and slice) is limited
+  to linear at half quality, and to nearest-neighbour below that.
+
+  The threading of the reslice and color mapping filters is set with
+  the pane's GetThreadSettings(), see ThreadSettings.
 """
 
 import vtk
 from . import RenderPane
 from . import EventHandler
+from . import ThreadSettings
 import math
 import time
 
@@ -207,6 +215,9 @@ class ImagePane(RenderPane.RenderPane):
        and will automatically scale & pan with the image.
     """
 
+    # the image pipeline is watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self, *args, **kw):
         RenderPane.RenderPane.__init__(self, *args, **kw)
 
@@ -242,6 +253,9 @@ class ImagePane(RenderPane.RenderPane):
         self._StartX = 0
         self._StartY = 0
 
+        self._ThreadSettings = ThreadSettings.ThreadSettings(
+            ThreadSettings.GetThreadSettings())
+
         self._InitializeDrawPixels()
         self._InitializeTexture()
         self._InitializeTexture2()
@@ -305,6 +319,9 @@ class ImagePane(RenderPane.RenderPane):
         color.SetLookupTable(table)
         color.AddObserver('ExecuteInformationEvent', self.OnMapToColors)
 
+        self._ThreadSettings.AddFilter(reslice)
+        self._ThreadSettings.AddFilter(color)
+
         self._ImageReslice.append(reslice)
         self._ImageColor.append(color)
 
@@ -325,6 +342,8 @@ class ImagePane(RenderPane.RenderPane):
         self._Actor2D.GetProperty().SetDisplayLocationToBackground()
         self._Actor2D.SetMapper(self._ImageMapper)
 
+        self._UpdateWatchedObjects()
+
     def _InitializeTexture(self):
         """Perform the initializations for drawing with textures.
         This builds upon actions performed in _InitializeDrawPixels.
@@ -360,6 +379,9 @@ class ImagePane(RenderPane.RenderPane):
         color2.SetLookupTable(self._ImageColor[0].GetLookupTable())
         color2.AddObserver('ExecuteInformationEvent', self.OnMapToColors)
 
+        self._ThreadSettings.AddFilter(reslice2)
+        self._ThreadSettings.AddFilter(color2)
+
         self._ImageColor2.append(color2)
 
         info2 = vtk.vtkImageChangeInformation()
@@ -390,10 +412,10 @@ class ImagePane(RenderPane.RenderPane):
 
     def DynamicOn(self):
         if self._Dynamic == 0:
+            mode = self._GetDynamicInterpolationMode()
             for reslice in self._ImageReslice:
                 if reslice:
-                    reslice.SetInterpolationMode(
-                        self._DynamicInterpolationMode)
+                    reslice.SetInterpolationMode(mode)
             if self._RenderingMode == 1 and not self.IsOblique():
                 self._ImageActor.SetVisibility(0)
                 for actor2 in self._ImageActor2:
@@ -703,6 +725,7 @@ class ImagePane(RenderPane.RenderPane):
                     del self._ImageColor[i]
                     del self._ImageChangeInformation2[i]
                     del self._ImageActor2[i]
+            self._UpdateWatchedObjects()
             return
 
         n = self.GetNumberOfInputs()
@@ -756,6 +779,9 @@ class ImagePane(RenderPane.RenderPane):
             if self._Dynamic == 0:
                 actor2.SetVisibility(0)
 
+            for alg in (reslice, reslice2, color, color2):
+                self._ThreadSettings.AddFilter(alg)
+
             self._ImageReslice[i] = reslice
             self._ImageReslice2[i] = reslice2
             self._ImageColor[i] = color
@@ -778,6 +804,8 @@ class ImagePane(RenderPane.RenderPane):
         reslice2 = self._ImageReslice2[i]
         reslice2.SetInput(input)
 
+        self._UpdateWatchedObjects()
+
         """
         # rearrange pipeline as a test
         reslice = self._ImageReslice[i]
@@ -911,6 +939,14 @@ class ImagePane(RenderPane.RenderPane):
             if pair[1] == self._RenderingMode:
                 return pair[0]
 
+    def GetThreadSettings(self):
+        """w.GetThreadSettings()  -- the threading of the image filters
+
+        The settings apply to the reslice and color mapping filters,
+        and take their defaults from ThreadSettings.GetThreadSettings()
+        """
+        return self._ThreadSettings
+
     def SetInterpolationMode(self, mode):
         """w.SetInterpolationMode(mode)  -- set static interpolation
 
@@ -949,6 +985,25 @@ class ImagePane(RenderPane.RenderPane):
             if pair[1] == self._DynamicInterpolationMode:
                 return pair[0]
 
+    def _GetDynamicInterpolationMode(self):
+        # the dynamic interpolation, limited by the render quality
+        mode = self._DynamicInterpolationMode
+        if self._RenderQuality < 0.5:
+            mode = min(mode, self._InterpolationModes['Nearest'])
+        elif self._RenderQuality < 1.0:
+            mode = min(mode, self._InterpolationModes['Linear'])
+        return mode
+
+    def SetRenderQuality(self, quality):
+        """w.SetRenderQuality(q)  -- limit the dynamic interpolation
+        """
+        RenderPane.RenderPane.SetRenderQuality(self, quality)
+        if self._Dynamic:
+            mode = self._GetDynamicInterpolationMode()
+            for reslice in self._ImageReslice:
+                if reslice:
+                    reslice.SetInterpolationMode(mode)
+
     def GetImageCoords2D(self, *args):
         """w.GetImageCoords2D(x,y)  -- get 2D image coords for mouse (x,y)
 
@@ -1929,6 +1984,18 @@ class ImagePane(RenderPane.RenderPane):
         elif self.GetRenderingMode() == 'DrawPixels':
             self.SetRenderingMode('Texture')
 
+    def _GetWatchedObjects(self):
+        # the same objects that are checked by HasChangedSince()
+        watched = RenderPane.RenderPane._GetWatchedObjects(self)
+        watched.append(self._ImageBlend)
+        for i in range(len(self._ImageReslice)):
+            reslice = self._ImageReslice[i]
+            if reslice:
+                watched.append(reslice)
+                watched.append(reslice.GetInput())
+            watched.append(self._ImageColor[i])
+        return watched
+
     def HasChangedSince(self, sinceMTime):
         if RenderPane.RenderPane.HasChangedSince(self, sinceMTime):
             return 1
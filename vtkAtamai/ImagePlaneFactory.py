@@ -130,6 +130,9 @@ from .ActorFactory import *
 
 class ImagePlaneFactory(ActorFactory):
 
+    # inputs and lookup tables are watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self):
         ActorFactory.__init__(self)
 
@@ -190,6 +193,7 @@ class ImagePlaneFactory(ActorFactory):
         if (i == 0 and self._AutomaticPlaneGeneration):
             self.GeneratePlane()
         self._UpdateTextureCoords()
+        self._UpdateWatchedObjects()
 
         return i + 1
 
@@ -210,6 +214,7 @@ class ImagePlaneFactory(ActorFactory):
         del self._LookupTables[i]
         del self._Reslicers[i]
         del self._ClippingPlanes[i]
+        self._UpdateWatchedObjects()
 
     def SetInput(self, input, i=0):
         if (i == len(self._Inputs)):
@@ -220,6 +225,7 @@ class ImagePlaneFactory(ActorFactory):
         if (i == 0 and self._AutomaticPlaneGeneration):
             self.GeneratePlane()
         self._UpdateTextureCoords()
+        self._UpdateWatchedObjects()
 
     def GetInput(self, i=0):
         try:
@@ -264,6 +270,7 @@ class ImagePlaneFactory(ActorFactory):
             actor = actors[renderer][i]
             actor.GetTexture().SetLookupTable(table)
             actor.GetTexture().MapColorScalarsThroughLookupTableOn()
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def GetLookupTable(self, i=0):
@@ -345,6 +352,10 @@ class ImagePlaneFactory(ActorFactory):
         actor.SetTexture(texture)
         return actor
 
+    def _GetWatchedObjects(self):
+        return (ActorFactory._GetWatchedObjects(self) +
+                list(self._Inputs) + list(self._LookupTables))
+
     def HasChangedSince(self, sinceMTime):
         if (ActorFactory.HasChangedSince(self, sinceMTime)):
             return 1
@@ -0,0 +1,286 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: LODController.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+LODController - adapt the rendering quality to the frame rate
+
+  Each PaneFrame has an LODController that keeps interaction at the
+  frame's DesiredFPS.  While the user is interacting (i.e. dragging
+  with a mouse button held, or pressing keys) the time of each render
+  is measured, and if the recent renders are too slow the interactive
+  quality is halved, or if they are much faster than needed it is
+  doubled, between MinimumQuality and 1.0.
+
+  The quality is passed to the panes with SetRenderQuality(), and
+  from the panes to their factories, which decide what it means:
+
+    SlicePlaneFactory -- nearest-neighbor reslicing below 1.0, and
+                         coarser reslicing at 0.25 and below
+    ImagePane         -- the interpolation used while dragging
+    VolumeFactory     -- the texture LOD
+
+  The RenderWindow's DesiredUpdateRate is also set to the DesiredFPS
+  during interaction, for the benefit of VTK's own LOD actors.
+
+  When interaction stops, a single refinement render is done at full
+  quality after RefineDelay milliseconds.  There is no polling: one
+  timer is set when the interaction starts, and when it expires it is
+  set again for whatever remains of the delay since the last event.
+  If a drag pauses with the button still held, the refinement render
+  is done after PauseDelay milliseconds.  The interactive quality is
+  remembered, so the next interaction starts where the last one left
+  off.
+
+Derived From:
+
+  object
+
+See Also:
+
+  PaneFrame, RenderTiming
+
+Initialization:
+
+  LODController(*frame*)
+
+Public Methods:
+
+  SetEnabled(*flag*)           -- turn adaptation on or off, when off
+                                  everything is rendered at full
+                                  quality (default on)
+
+  SetRefineDelay(*ms*)         -- how long after the last interaction
+                                  to do the refinement render
+
+  SetPauseDelay(*ms*)          -- how long a drag must pause before
+                                  the refinement render is done
+
+  GetQuality()                 -- the interactive quality
+
+  IsInteracting()              -- true until the refinement render
+
+  Interact(*event*=None)       -- called by the frame for each event
+                                  that is part of an interaction
+
+  AddFrameTime(*seconds*)      -- called by the frame after each render
+
+  Cancel()                     -- cancel the pending refinement
+
+"""
+
+#======================================
+from builtins import object
+import logging
+
+from . import RenderTiming
+
+logger = logging.getLogger(__name__)
+
+#======================================
+
+
+class LODController(object):
+
+    # the lowest quality that will be used during interaction
+    MinimumQuality = 0.125
+
+    # the number of renders to average before changing the quality
+    NumberOfSamples = 3
+
+    # the DesiredUpdateRate for the refinement render
+    StillUpdateRate = 0.0001
+
+    def __init__(self, frame):
+        self._Frame = frame
+        self._Enabled = 1
+        self._RefineDelay = 300
+        self._PauseDelay = 500
+        self._Quality = 1.0
+        # the quality that the panes currently have
+        self._AppliedQuality = 1.0
+        self._Interacting = 0
+        self._LastInteraction = 0.0
+        # the mouse buttons that are held down, as Tk state bits
+        self._Buttons = 0
+        self._RefineId = None
+        self._FrameTimes = RenderTiming.RollingStatistics(
+            self.NumberOfSamples)
+
+    def SetEnabled(self, flag):
+        self._Enabled = flag and 1 or 0
+        if not self._Enabled:
+            self._Quality = 1.0
+            self._ApplyQuality(1.0)
+
+    def GetEnabled(self):
+        return self._Enabled
+
+    def EnabledOn(self):
+        self.SetEnabled(1)
+
+    def EnabledOff(self):
+        self.SetEnabled(0)
+
+    def SetRefineDelay(self, millisecs):
+        self._RefineDelay = millisecs
+
+    def GetRefineDelay(self):
+        return self._RefineDelay
+
+    def SetPauseDelay(self, millisecs):
+        self._PauseDelay = millisecs
+
+    def GetPauseDelay(self):
+        return self._PauseDelay
+
+    def GetQuality(self):
+        return self._Quality
+
+    def IsInteracting(self):
+        return self._Interacting
+
+    def Interact(self, event=None):
+        """Note that an interaction is in progress."""
+        self._LastInteraction = RenderTiming.Clock()
+        if event is not None:
+            # the event state has the buttons from before the event
+            buttons = event.state & 0x1f00
+            if event.type == '4':
+                buttons = buttons | (0x80 << event.num)
+            elif event.type == '5':
+                buttons = buttons & ~(0x80 << event.num)
+                if not self._Interacting:
+                    # the release after a pause, which has already
+                    # been refined, is not worth a low quality render
+                    self._Buttons = buttons
+                    return
+                # the pending refinement may be waiting for a pause
+                self.Cancel()
+            self._Buttons = buttons
+        if not self._Interacting:
+            self._Interacting = 1
+            self._FrameTimes.Reset()
+            frame = self._Frame
+            frame._RenderWindow.SetDesiredUpdateRate(frame.GetDesiredFPS())
+            if self._Enabled:
+                self._ApplyQuality(self._Quality)
+        if self._RefineId is None:
+            self._RefineId = self._Frame.ScheduleOnce(self._RefineDelay,
+                                                      self._Refine)
+
+    def AddFrameTime(self, seconds):
+        """Adapt the quality to the time taken by the last render."""
+        if not (self._Interacting and self._Enabled):
+            return
+        times = self._FrameTimes
+        times.Add(seconds)
+        if times.GetCount() < self.NumberOfSamples:
+            return
+
+        target = 1.0 / self._Frame.GetDesiredFPS()
+        mean = times.GetMean()
+        quality = self._Quality
+        if mean > 1.2 * target:
+            quality = max(quality * 0.5, self.MinimumQuality)
+        elif mean < 0.4 * target:
+            quality = min(quality * 2.0, 1.0)
+        if quality != self._Quality:
+            logger.debug("LODController: %.1f ms per frame, quality %g",
+                         mean * 1000.0, quality)
+            self._Quality = quality
+            self._ApplyQuality(quality)
+            # measure the new quality from scratch
+            times.Reset()
+
+    def Cancel(self):
+        if self._RefineId is not None:
+            self._Frame.UnSchedule(self._RefineId)
+            self._RefineId = None
+
+    def _Refine(self):
+        # called once after the interaction started, and then again
+        # for as long as the interaction continues
+        self._RefineId = None
+        frame = self._Frame
+        if frame._RenderWindow is None:
+            return
+        # a button held without moving is still an interaction, but
+        # after a long enough pause it is refined anyway
+        delay = self._RefineDelay
+        if self._Buttons:
+            delay = max(self._PauseDelay, delay)
+        remaining = delay - \
+            (RenderTiming.Clock() - self._LastInteraction) * 1000.0
+        if remaining > 0:
+            self._RefineId = frame.ScheduleOnce(
+                max(int(remaining + 0.5), 1), self._Refine)
+            return
+
+        self._Interacting = 0
+        frame._RenderWindow.SetDesiredUpdateRate(self.StillUpdateRate)
+        self._ApplyQuality(1.0)
+        # VTK's own LOD actors need a render at the new rate too
+        for pane in frame._RenderPanes:
+            pane.Modified()
+        frame.Render()
+
+    def _ApplyQuality(self, quality):
+        if quality == self._AppliedQuality:
+            return
+        self._AppliedQuality = quality
+        for pane in self._Frame._RenderPanes:
+            pane.SetRenderQuality(quality)
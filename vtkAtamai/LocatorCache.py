@@ -0,0 +1,211 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: LocatorCache.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+LocatorCache - shared point and cell locators for picking on large meshes
+
+  Finding the point of a mesh that is nearest to a pick position
+  needs a point locator.  Building the locator takes time in
+  proportion to the number of points, but once it is built each
+  search is fast.  The LocatorCache keeps the locators for the most
+  recently used datasets and rebuilds a locator only when the MTime
+  of its dataset changes, so that repeated picks and drags on the
+  same mesh do not pay for the build again:
+
+    pointId = LocatorCache.FindPoint(dataSet, position)
+
+  Cell locators, which are used to intersect rays with a mesh, are
+  kept in the same way.
+
+  Only datasets with explicit points (vtkPolyData, vtkUnstructuredGrid
+  and other vtkPointSets) use a locator.  For vtkImageData and the
+  other structured datasets the nearest point is computed directly by
+  the dataset's own FindPoint().
+
+  A locator holds a reference to its dataset, so the cache keeps at
+  most a few locators (of both kinds) and discards the least recently used.  The
+  reference also guarantees that the address of the dataset, which
+  is the key in the cache, is not reused while the locator is kept.
+
+Derived From:
+
+  object
+
+See Also:
+
+  ActorFactory, RayPicking
+
+Initialization:
+
+  LocatorCache(*size*=8)
+
+Public Methods:
+
+  GetLocator(*dataSet*)        -- get an up-to-date locator for dataSet,
+                                  or None if dataSet is not a vtkPointSet
+
+  GetCellLocator(*dataSet*)    -- get an up-to-date cell locator for
+                                  dataSet
+
+  FindPoint(*dataSet*,*point*) -- the id of the point nearest to point,
+                                  or -1 if dataSet has no points
+
+  GetNumberOfLocators()        -- the number of locators in the cache
+
+  Clear()                      -- discard all locators
+
+Module Functions:
+
+  GetLocatorCache()            -- the cache shared by the process
+
+  FindPoint(*dataSet*,*point*) -- find a point with the shared cache
+
+"""
+
+#======================================
+from builtins import object
+import collections
+import logging
+
+import vtk
+
+logger = logging.getLogger(__name__)
+
+# the number of locators that are kept
+_CacheSize = 8
+
+# vtkStaticPointLocator is much faster to build, but is new in VTK 8
+try:
+    _LocatorClass = vtk.vtkStaticPointLocator
+except AttributeError:
+    _LocatorClass = vtk.vtkPointLocator
+
+# likewise vtkStaticCellLocator
+try:
+    _CellLocatorClass = vtk.vtkStaticCellLocator
+except AttributeError:
+    _CellLocatorClass = vtk.vtkCellLocator
+
+#======================================
+
+
+def _DataSetFindPoint(dataSet, point):
+    """Call dataSet.FindPoint() for datasets without a locator."""
+    try:
+        return dataSet.FindPoint(point)
+    except TypeError:
+        return dataSet.FindPoint(point[0], point[1], point[2])
+
+
+class LocatorCache(object):
+
+    def __init__(self, size=_CacheSize):
+        self._Size = size
+        # address -> (mtime, locator), least recently used first,
+        # the datasets themselves are not hashable in all VTK versions
+        self._Locators = collections.OrderedDict()
+
+    def GetLocator(self, dataSet):
+        if not dataSet.IsA('vtkPointSet'):
+            return None
+        return self._GetLocator(dataSet, _LocatorClass)
+
+    def GetCellLocator(self, dataSet):
+        return self._GetLocator(dataSet, _CellLocatorClass)
+
+    def _GetLocator(self, dataSet, locatorClass):
+        key = (dataSet.__this__, locatorClass)
+        mtime = dataSet.GetMTime()
+        entry = self._Locators.pop(key, None)
+        if entry is None or entry[0] != mtime:
+            locator = locatorClass()
+            locator.SetDataSet(dataSet)
+            locator.BuildLocator()
+            entry = (mtime, locator)
+            logger.debug('built %s for %d points',
+                         locator.GetClassName(), dataSet.GetNumberOfPoints())
+        self._Locators[key] = entry
+        while len(self._Locators) > self._Size:
+            self._Locators.popitem(last=False)
+        return entry[1]
+
+    def FindPoint(self, dataSet, point):
+        if dataSet.GetNumberOfPoints() == 0:
+            return -1
+        locator = self.GetLocator(dataSet)
+        if locator is None:
+            return _DataSetFindPoint(dataSet, point)
+        return locator.FindClosestPoint(point)
+
+    def GetNumberOfLocators(self):
+        return len(self._Locators)
+
+    def Clear(self):
+        self._Locators.clear()
+
+
+_LocatorCache = LocatorCache()
+
+
+def GetLocatorCache():
+    """Get the LocatorCache that is shared by the process."""
+    return _LocatorCache
+
+
+def FindPoint(dataSet, point):
+    """Find the point of dataSet nearest to point, using the shared cache."""
+    return _LocatorCache.FindPoint(dataSet, point)
@@ -0,0 +1,142 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: OffscreenPaneFrame.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+"""
+OffscreenPaneFrame - a PaneFrame that renders without a display
+
+  This class renders into an offscreen buffer and never opens a
+  window, so it can be used for benchmarks and tests on machines
+  that have no display.  There is no GUI toolkit behind it: events
+  are fed in by calling HandleEvent() directly with event objects,
+  and scheduled callbacks only run when ProcessScheduled() is called.
+
+Derived From:
+
+  PaneFrame
+
+See Also:
+
+  PaneFrame, EventBenchmark
+
+Initialization:
+
+  OffscreenPaneFrame(*width*=400,*height*=400)
+
+Public Methods:
+
+  SetSize(*width*,*height*)    -- resize the offscreen buffer and send
+                                  a Configure event to the panes
+
+  GetSize()                    -- get the size of the offscreen buffer
+
+  ProcessScheduled()           -- run any scheduled callbacks that are due
+
+  Start()                      -- render once and return, since there
+                                  is no interaction loop
+
+"""
+
+#======================================
+import vtk
+
+from vtkAtamai import EventHandler
+from vtkAtamai import PaneFrame
+
+#======================================
+
+
+class OffscreenPaneFrame(PaneFrame.PaneFrame):
+
+    def __init__(self, width=400, height=400, **kw):
+        self._RenderWindow = vtk.vtkRenderWindow()
+        self._RenderWindow.OffScreenRenderingOn()
+        self._RenderWindow.SetSize(width, height)
+
+        # a generic interactor never talks to a window system, but it
+        # lets the base class bind its observers as usual
+        self._RenderWindowInteractor = vtk.vtkGenericRenderWindowInteractor()
+        self._RenderWindowInteractor.SetRenderWindow(self._RenderWindow)
+
+        PaneFrame.PaneFrame.__init__(self, width, height, **kw)
+
+        self._BindInteractor()
+
+    def SetSize(self, width, height):
+        """Resize the offscreen buffer and reconfigure the panes."""
+        self._RenderWindow.SetSize(width, height)
+        self._RenderWindowInteractor.SetSize(width, height)
+
+        e = EventHandler.Event()
+        e.type = '22'
+        e.state = self._State
+        e.keysym = '??'
+        e.char = '\0'
+        e.num = 0
+        e.x = 0
+        e.y = 0
+        e.width = width
+        e.height = height
+        self.HandleEvent(e)
+
+    def GetSize(self):
+        return tuple(self._RenderWindow.GetSize())
+
+    def ProcessScheduled(self):
+        """Run any ScheduleOnce/ScheduleEvery callbacks that are due."""
+        self._TrapTimer()
+
+    def Start(self):
+        self.Render(force_redraw=True)
@@ -47,12 +47,16 @@ from builtins import range
 from past.utils import old_div
 from .ActorFactory import *
 from .ClippingCubeFactory import *
+from . import VolumeRayQuery
 
 import math
 
 
 class VolumePlanesFactory(ActorFactory):
 
+    # input and lookup table are watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self):
         ActorFactory.__init__(self)
 
@@ -63,6 +67,7 @@ class VolumePlanesFactory(ActorFactory):
         self.AddChild(self._ClippingCube)
 
         self._Input = None
+        self._LookupTable = None
 
         # generate the pipeline
         self._ImagePrefilter = vtk.vtkImageGaussianSmooth()
@@ -102,6 +107,9 @@ class VolumePlanesFactory(ActorFactory):
         self._PickThreshold = 0.25
         # the implicit volume for finding the gradient
         self._ImplicitVolume = vtk.vtkImplicitVolume()
+        self._RayQuery = VolumeRayQuery.VolumeRayQuery()
+        self._RayQuery.SetImplicitVolume(self._ImplicitVolume)
+        self._RayQuery.SetModeToSurface()
 
         # the extent of the texture maps
         self._VolumeExtent = (128, 128, 128)
@@ -282,6 +290,7 @@ class VolumePlanesFactory(ActorFactory):
         self._ImplicitVolume.GetVolume().Update()
 
         self._Input = input
+        self._UpdateWatchedObjects()
 
     def GetInput(self):
         return self._Input
@@ -297,6 +306,7 @@ class VolumePlanesFactory(ActorFactory):
         self._LookupTable = table
         for actor in self._ActorsXY + self._ActorsYZ + self._ActorsZX:
             actor.GetTexture().SetLookupTable(table)
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def GetLookupTable(self):
@@ -308,6 +318,10 @@ class VolumePlanesFactory(ActorFactory):
     def GetVolumeExtent(self):
         return self._VolumeExtent
 
+    def _GetWatchedObjects(self):
+        return (ActorFactory._GetWatchedObjects(self) +
+                [self._Input, self._LookupTable])
+
     def HasChangedSince(self, sinceMTime):
         if (ActorFactory.HasChangedSince(self, sinceMTime)):
             return 1
@@ -333,72 +347,28 @@ class VolumePlanesFactory(ActorFactory):
         if len(picklist) == 2:
             point1 = picklist[0].position
             point2 = picklist[1].position
-            vec = (point2[0] - point1[0], point2[
-                   1] - point1[1], point2[2] - point1[2])
-            pathlength = math.sqrt(vec[0] ** 2 + vec[1] ** 2 + vec[2] ** 2)
-
-            # get mininum voxel spacing
-            spacing = min(list(map(abs, self._Input.GetSpacing())))
-
-            # get the number of steps required along the length
-            N = int(math.ceil(abs(old_div(pathlength, spacing))))
-            dx, dy, dz = (old_div(vec[0], N), old_div(vec[1], N), old_div(vec[2], N))
 
             # set up an implicit function that we can query
             vol = self._ImplicitVolume
             vol.SetTransform(self._Transform.GetLinearInverse())
             vol.SetOutValue(self._LookupTable.GetTableRange()[0])
 
-            table = self._LookupTable
-            range = table.GetTableRange()
-            maxidx = table.GetNumberOfColors() - 1
-            hitVolume = 0
-
-            # cast a ray into the volume from one side
-            x0, y0, z0 = point1
-            for i in range(N):
-                x = x0 + i * dx
-                y = y0 + i * dy
-                z = z0 + i * dz
-                value = vol.FunctionValue(x + old_div(dx, 2), y + old_div(dy, 2), z + old_div(dz, 2))
-                idx = int(
-                    round((value - range[0]) / (range[1] - range[0]) * maxidx))
-                if idx < 0:
-                    idx = 0
-                elif idx > maxidx:
-                    idx = maxidx
-                alpha = table.GetTableValue(idx)[3]
-                # check if alpha is greater than threshold
-                if alpha > self._PickThreshold:
-                    if i != 0:
-                        picklist[0].position = (x, y, z)
-                        gx, gy, gz = vol.FunctionGradient(x, y, z)
-                        picklist[0].normal = (-gx, -gy, -gz)
-                    hitVolume = 1
-                    break
-
-            if hitVolume:
-                # cast a ray into the volume from the other side
-                x1, y1, z1 = point2
-                for i in range(N):
-                    x = x1 - i * dx
-                    y = y1 - i * dy
-                    z = z1 - i * dz
-                    value = vol.FunctionValue(
-                        x - old_div(dx, 2), y - old_div(dy, 2), z - old_div(dz, 2))
-                    idx = int(round((value - range[
-                              0]) / (range[1] - range[0]) * maxidx))
-                    if idx < 0:
-                        idx = 0
-                    elif idx > maxidx:
-                        idx = maxidx
-                    alpha = table.GetTableValue(idx)[3]
-                    if alpha > self._PickThreshold:
-                        if i != 0:
-                            picklist[1].position = (x, y, z)
-                            gx, gy, gz = vol.FunctionGradient(x, y, z)
-                            picklist[1].normal = (-gx, -gy, -gz)
-                        break
+            query = self._RayQuery
+            query.SetLookupTable(self._LookupTable)
+            query.SetPickThreshold(self._PickThreshold)
+            # get mininum voxel spacing
+            query.SetStepSize(min(list(map(abs, self._Input.GetSpacing()))))
+
+            # cast a ray into the volume from each side
+            hit = query.CastRay(point1, point2)
+            if hit:
+                entry, entryNormal, exit, exitNormal = hit
+                if entry:
+                    picklist[0].position = entry
+                    picklist[0].normal = entryNormal
+                if exit:
+                    picklist[1].position = exit
+                    picklist[1].normal = exitNormal
             else:
                 picklist = []
 
@@ -95,6 +95,9 @@ import vtk
 
 class OutlineFactory(ActorFactory.ActorFactory):
 
+    # the input is watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self):
         self.count = 0
         ActorFactory.ActorFactory.__init__(self)
@@ -104,6 +107,7 @@ class OutlineFactory(ActorFactory.ActorFactory):
     def SetInputConnection(self, algorithm_output):
         self._OutlineFilter.SetInputConnection(algorithm_output)
         self._OutlineFilter.UpdateWholeExtent()  # this is important!!!
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def GetInputConnection(self):
@@ -130,6 +134,13 @@ class OutlineFactory(ActorFactory.ActorFactory):
             for actor in self._ActorDict[ren]:
                 actor.SetVisibility(yesno)
 
+    def _GetWatchedObjects(self):
+        watched = ActorFactory.ActorFactory._GetWatchedObjects(self)
+        if self._OutlineFilter.GetNumberOfInputConnections(0):
+            watched.append(self._OutlineFilter.GetInputAlgorithm(0, 0))
+            watched.append(self._OutlineFilter.GetInputDataObject(0, 0))
+        return watched
+
     def HasChangedSince(self, sinceMTime):
 
         if (ActorFactory.ActorFactory.HasChangedSince(self, sinceMTime)):
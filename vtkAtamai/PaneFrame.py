@@ -86,7 +86,9 @@ Public Methods:
   SetTitle(*title*)            -- set the title for the window
 
   Render()                     -- call Render() on the RenderWindow if
-                                  any panes need to be rendered
+                                  any panes need to be rendered, the
+                                  time is recorded as 'window' if
+                                  RenderTiming is enabled
 
   RenderAll()                  -- call Render() on all PaneFrames in this
                                   application
@@ -97,7 +99,7 @@ Public Methods:
 
   ScheduleEvery(*ms*,*func*)   -- schedule a function to be called every
                                   time the specified number of millisecs
-                                  have elapsed
+                                  have elapsed, without drifting
                                   (returns an id you can use to unschedule)
 
   UnSchedule(*id*)             -- remove the specified item from the schedule
@@ -105,6 +107,20 @@ Public Methods:
   SetDesiredFPS(*rate*)        -- set the desired frames-per-second for
                                   interaction with the window
 
+  GetLODController()           -- get the LODController that lowers the
+                                  rendering quality to reach the desired
+                                  frames-per-second during interaction
+
+  SetMotionCoalescing(*flag*)  -- if on, a burst of Motion events that
+                                  arrives faster than the frame can render
+                                  is collapsed into the latest one
+
+  FlushPendingMotion()         -- dispatch the Motion event that is being
+                                  held back by coalescing, if any
+
+  GetNumberOfDroppedEvents()   -- number of Motion events that were
+                                  discarded by coalescing
+
   Start()                      -- begin the interaction loop
                                   (this method will never return)
 
@@ -115,12 +131,22 @@ Protected Attributes:
   _RenderFTime   -- the time of the last render, in the same format
                     as the python time.time() function
 
+  _PaneIndex     -- SpatialIndex for finding the pane under the mouse,
+                    rebuilt when the window size or a viewport changes
+
 Notes:
 
   You will rarely want to bind any events to the PaneFrame.
   All interactions should be handled by binding
   methods to the RenderPane.
 
+  When motion coalescing is on, a Motion event is not dispatched right
+  away but is held until the GUI toolkit gets back to its event loop
+  (via _ScheduleMotionFlush).  A newer Motion event that arrives in the
+  meantime replaces the held one, and any other kind of event flushes
+  the held Motion first, so the order of button and key transitions
+  relative to the motion is preserved.
+
 """
 from __future__ import division
 
@@ -131,10 +157,14 @@ import vtk
 from zope.interface import implementer
 from vtkAtamai.interfaces import IPaneFrame
 from vtkAtamai import EventHandler
+from vtkAtamai import Scheduler
+from vtkAtamai import SpatialIndex
+from vtkAtamai import RenderTiming
+from vtkAtamai import LODController
 
 import time
+import math
 import logging
-import copy
 
 logger = logging.getLogger(__name__)
 
@@ -143,7 +173,8 @@ logger = logging.getLogger(__name__)
 class PaneFrame(EventHandler.EventHandler):
     # a list of all the PaneFrames in this application
     AllPaneFrames = []
-    _ScheduledCallbacks = []
+    # the scheduled callbacks, shared by all the PaneFrames
+    _Scheduler = Scheduler.Scheduler()
     _ScheduleId = 0
 
     def __del__(self):
@@ -154,17 +185,23 @@ class PaneFrame(EventHandler.EventHandler):
         if self in self.AllPaneFrames:
             self.AllPaneFrames.remove(self)
         # cancel any timers
-        if self._QualityRenderId is not None:
-            self.cancelTimers()
+        self.cancelTimers()
 
     def cancelTimers(self):
-        pass
+        self._LODController.Cancel()
 
     def tearDown(self):
+        self._DisarmTimer()
+        if PaneFrame._Scheduler.GetDeadlineCallback() == self._ArmTimer:
+            PaneFrame._Scheduler.SetDeadlineCallback(None)
+
         self._UnBindInteractor()
 
+        # drop any motion that is being held back
+        self._PendingMotion = None
+
         # disconnect RenderPanes
-        for pane in self._RenderPanes:
+        for pane in list(self._RenderPanes):
             self.DisconnectRenderPane(pane)
 
         self._FocusPane = self._RenderWindow = self._RenderWindowInteractor = None
@@ -183,14 +220,26 @@ class PaneFrame(EventHandler.EventHandler):
         # list of all panes in this frame
         self._RenderPanes = []
 
+        # spatial index of the panes, see _FindPane()
+        self._PaneIndex = None
+        self._PaneIndexSize = None
+        # the viewport of each pane when the index was built
+        self._PaneViewports = {}
+        # (renderer, observer tag) for each pane
+        self._PaneObservers = {}
+
         # the pane that the mouse is currently positioned over
         self._CurrentPane = None
 
         # the pane that has the focus (i.e. the one that was clicked in last)
         self._FocusPane = None
 
-        # the ID of the timer that checks whether to do high-quality renders
-        self._QualityRenderId = None
+        # adjusts the quality during interaction, and does a
+        # high-quality render when interaction stops
+        self._LODController = LODController.LODController(self)
+
+        # the interactor timer that is armed for the next deadline
+        self._TimerId = None
 
         # the time when the last render occurred
         self._RenderFTime = 0.0
@@ -200,6 +249,12 @@ class PaneFrame(EventHandler.EventHandler):
 
         self._State = 0
 
+        # motion coalescing, see HandleEvent()
+        self._CoalesceMotion = 0
+        self._PendingMotion = None
+        self._MotionFlushScheduled = 0
+        self._DroppedEvents = 0
+
         # if the renderwindow is already created, we are done
         if hasattr(self, '_RenderWindow'):
             return
@@ -298,17 +353,66 @@ class PaneFrame(EventHandler.EventHandler):
         """Get the desired frames-per-second for interaction."""
         return self._DesiredFPS
 
+    def GetLODController(self):
+        """Get the controller for the interactive level of detail."""
+        return self._LODController
+
+    # --------------------------------------
+    def SetMotionCoalescing(self, flag):
+        """Collapse bursts of Motion events into the latest one."""
+        self._CoalesceMotion = flag and 1 or 0
+        if not self._CoalesceMotion:
+            self.FlushPendingMotion()
+
+    def GetMotionCoalescing(self):
+        return self._CoalesceMotion
+
+    def MotionCoalescingOn(self):
+        self.SetMotionCoalescing(1)
+
+    def MotionCoalescingOff(self):
+        self.SetMotionCoalescing(0)
+
+    def GetNumberOfDroppedEvents(self):
+        """Get the number of Motion events discarded by coalescing."""
+        return self._DroppedEvents
+
+    def ResetNumberOfDroppedEvents(self):
+        self._DroppedEvents = 0
+
+    def FlushPendingMotion(self):
+        """Dispatch the Motion event held back by coalescing, if any."""
+        self._MotionFlushScheduled = 0
+        event = self._PendingMotion
+        if event is None:
+            return 1
+        self._PendingMotion = None
+        return self._DispatchEvent(event)
+
+    def _ScheduleMotionFlush(self):
+        # subclasses can override this if the scheduler is not driven
+        # by their event loop
+        self.ScheduleOnce(0, self.FlushPendingMotion)
+
     # --------------------------------------
     def _OnTimer(self, obj=None, event=""):
-        epochmillisecs = time.time() * 1000  # ms since epoch
-        for item in list(PaneFrame._ScheduledCallbacks):
-            if epochmillisecs > item[2]:
-                if item[3] <= 0:
-                    PaneFrame._ScheduledCallbacks.remove(item)
-                else:  # reschedule
-                    item[2] = epochmillisecs + item[3]
-                item[1]()
-        obj.CreateTimer(1)
+        PaneFrame._Scheduler.RunDue()
+        self._ArmTimer()
+
+    def _ArmTimer(self):
+        # arm a single one-shot timer for the earliest deadline, there
+        # is no timer at all while nothing is scheduled
+        self._DisarmTimer()
+        timeout = PaneFrame._Scheduler.GetTimeout()
+        if timeout is not None and self._RenderWindowInteractor:
+            self._TimerId = self._RenderWindowInteractor.CreateOneShotTimer(
+                max(1, int(math.ceil(timeout))))
+
+    def _DisarmTimer(self):
+        if self._TimerId is not None:
+            if self._RenderWindowInteractor:
+                self._RenderWindowInteractor.DestroyTimer(self._TimerId)
+            self._TimerId = None
 
     def _OnButtonPress(self, obj=None, event=""):
 
@@ -383,6 +487,7 @@ class PaneFrame(EventHandler.EventHandler):
 
     def _OnMouseWheelForward(self, obj=None, event=""):
 
+        self._LODController.Interact()
         # temporarily bind an interactor style so we can use it to zoom
         self.zoom_style.SetInteractor(self._RenderWindowInteractor)
         self.zoom_style.OnMouseWheelForward()
@@ -390,6 +495,7 @@ class PaneFrame(EventHandler.EventHandler):
 
     def _OnMouseWheelBackward(self, obj=None, event=""):
 
+        self._LODController.Interact()
         # temporarily bind an interactor style so we can use it to zoom
         self.zoom_style.SetInteractor(self._RenderWindowInteractor)
         self.zoom_style.OnMouseWheelBackward()
@@ -490,14 +596,7 @@ class PaneFrame(EventHandler.EventHandler):
 
     # --------------------------------------
     def _TrapTimer(self):
-        epochmillisecs = time.time() * 1000  # ms since epoch
-        for item in list(PaneFrame._ScheduledCallbacks):
-            if epochmillisecs > item[2]:
-                if item[3] <= 0:
-                    PaneFrame._ScheduledCallbacks.remove(item)
-                else:  # reschedule
-                    item[2] = epochmillisecs + item[3]
-                item[1]()
+        PaneFrame._Scheduler.RunDue()
 
     # --------------------------------------
     def _SetCurrentPane(self, pane, event):
@@ -508,18 +607,16 @@ class PaneFrame(EventHandler.EventHandler):
             return
 
         if self._CurrentPane is not None:
-            # make a deep copy of the current event
-            e = copy.deepcopy(event)
-            # but change the type to 'Leave'
-            e.type = '8'  # 'Leave'
+            # make a copy of the current event, but change the
+            # type to 'Leave'
+            e = EventHandler.DeriveEvent(event, '8')
             # and pass to the pane
             self._CurrentPane.HandleEvent(e)
 
         if pane is not None:
-            # make a deep copy of the current event
-            e = copy.deepcopy(event)
-            # but change the type to 'Enter'
-            e.type = '7'  # 'Enter'
+            # make a copy of the current event, but change the
+            # type to 'Enter'
+            e = EventHandler.DeriveEvent(event, '7')
             # and pass to the pane
             pane.HandleEvent(e)
 
@@ -534,18 +631,18 @@ class PaneFrame(EventHandler.EventHandler):
             return
 
         if self._FocusPane is not None:
-            # make a copy of the current event
-            e = copy.deepcopy(event)
-            # but change the type to 'FocusOut'
-            e.type = EventHandler.EventHandler.EventType['FocusOut']
+            # make a copy of the current event, but change the
+            # type to 'FocusOut'
+            e = EventHandler.DeriveEvent(
+                event, EventHandler.EventHandler.EventType['FocusOut'])
             # and pass to the pane
             self._FocusPane.HandleEvent(e)
 
         if pane is not None:
-            # make a copy of the current event
-            e = copy.deepcopy(event)
-            # but change the type to 'FocusIn'
-            e.type = EventHandler.EventHandler.EventType['FocusIn']
+            # make a copy of the current event, but change the
+            # type to 'FocusIn'
+            e = EventHandler.DeriveEvent(
+                event, EventHandler.EventHandler.EventType['FocusIn'])
             # and pass to the pane
             pane.HandleEvent(e)
 
@@ -591,29 +688,29 @@ class PaneFrame(EventHandler.EventHandler):
 
             pane.HandleEvent(e)
 
-    # --------------------------------------
-    def _QualityRender(self):
-        # this method is called every 0.5 seconds and checks to see
-        # if interaction has stopped, and if so then it does a
-        # high-quality render
-
-        if (time.time() - self._RenderFTime) < 0.5:
-            return
-
-        # check mouse button state - if a button is pressed, no HQ rendering
-        # will occur
-        if self._State != 0:
-            return
-
-        if self._RenderWindow.GetDesiredUpdateRate() < 0.1:
-            return
-
-        self._RenderWindow.SetDesiredUpdateRate(0.05)
-        ## JDG self.RenderAll(force_redraw=True)
-        self.Render(force_redraw=True)
+        # the viewports have all changed
+        self._BuildPaneIndex()
 
     # --------------------------------------
     def HandleEvent(self, event):
+        if self._CoalesceMotion:
+            if event.type == '6':
+                # hold the motion until the event loop is idle, any
+                # motion that is already being held is superseded
+                if self._PendingMotion is not None:
+                    self._DroppedEvents = self._DroppedEvents + 1
+                self._PendingMotion = event
+                if not self._MotionFlushScheduled:
+                    self._MotionFlushScheduled = 1
+                    self._ScheduleMotionFlush()
+                return 1
+            elif self._PendingMotion is not None:
+                # keep the held motion in order with this event
+                self.FlushPendingMotion()
+
+        return self._DispatchEvent(event)
+
+    def _DispatchEvent(self, event):
         # note: both key and mouse events are sent to the pane under
         #       the mouse, there is no "focus" for keypresses
 
@@ -623,27 +720,11 @@ class PaneFrame(EventHandler.EventHandler):
         # initialize return value to '1' (nothing done)
         returnval = 1
 
-        # set QualityRender to be called every so often for LOD stuff
-        if self._QualityRenderId is None:
-            self._QualityRenderId = \
-                self.ScheduleEvery(500, self._QualityRender)
-
-        # set an interactive update rate for next render
-        n = 0   # count the total number of actors
-        renderers = self._RenderWindow.GetRenderers()
-        renderers.InitTraversal()
-        while 1:
-            ren = renderers.GetNextItem()
-            if not ren:
-                break
-            n = n + ren.GetViewProps().GetNumberOfItems()
-        # divide the FPS by the number of props, to reverse the
-        #  calculation done in vtkRenderWindow (we assume that one
-        #  of the props is rendering much slower than all others,
-        #  the vtkRenderWindow assumes each prop takes the same time
-        #  to render which is almost never the case)
-#        if n != 0:  # avoid division by zero
-#            self._RenderWindow.SetDesiredUpdateRate(self._DesiredFPS*1.0/n)
+        # key presses and drags are interactions, these set the level
+        # of detail and schedule a high-quality render for afterwards
+        if event.type in ('2', '4', '5') or \
+                (event.type == '6' and event.state & 0x1f00):
+            self._LODController.Interact(event)
 
         # pass configure events to all panes
         if event.type == '22':
@@ -659,10 +740,7 @@ class PaneFrame(EventHandler.EventHandler):
             if len(self._RenderPanes) == 0:
                 raise Exception("No attached render panes!!")
 
-            for pane in self._RenderPanes:
-                if pane.GetRenderer().IsInViewport(event.x, event.y):
-                    newCurrentPane = pane
-                    break
+            newCurrentPane = self._FindPane(event.x, event.y)
             # set the focus if a button is not being held down or was
             # just pressed, or if the mouse button has just been released
             if event.state & 0x1f00 == 0 or \
@@ -683,10 +761,9 @@ class PaneFrame(EventHandler.EventHandler):
             else:
                 if len(self._RenderPanes) == 0:
                     raise Exception("No attached render panes!!")
-                for pane in self._RenderPanes:
-                    if pane.GetRenderer().IsInViewport(event.x, event.y):
-                        self._SetCurrentPane(pane, event)
-                        break
+                pane = self._FindPane(event.x, event.y)
+                if pane is not None:
+                    self._SetCurrentPane(pane, event)
 
         # set current pane to None if Leave
         elif event.type == '8':
@@ -712,6 +789,12 @@ class PaneFrame(EventHandler.EventHandler):
             return
         self._RenderPanes.append(pane)
         self._RenderWindow.AddRenderer(pane.GetRenderer())
+        renderer = pane.GetRenderer()
+        tag = renderer.AddObserver(
+            'ModifiedEvent',
+            lambda o, e, s=self, p=pane: s._OnViewportModified(p))
+        self._PaneObservers[pane] = (renderer, tag)
+        self._PaneIndex = None
 
     def DisconnectRenderPane(self, pane):
         if self._CurrentPane == pane:
@@ -720,6 +803,41 @@ class PaneFrame(EventHandler.EventHandler):
             self._FocusPane = None
         self._RenderPanes.remove(pane)
         self._RenderWindow.RemoveRenderer(pane.GetRenderer())
+        if pane in self._PaneObservers:
+            renderer, tag = self._PaneObservers.pop(pane)
+            renderer.RemoveObserver(tag)
+        self._PaneIndex = None
+
+    # --------------------------------------
+    def _OnViewportModified(self, pane):
+        # renderers are modified for many reasons, only a change of
+        # viewport requires the index to be rebuilt
+        if self._PaneIndex is not None and \
+                self._PaneViewports.get(pane) != \
+                tuple(pane.GetRenderer().GetViewport()):
+            self._PaneIndex = None
+
+    def _BuildPaneIndex(self):
+        # use the same test as vtkViewport::IsInViewport()
+        width, height = self._RenderWindow.GetSize()
+        entries = []
+        self._PaneViewports = {}
+        for pane in self._RenderPanes:
+            viewport = tuple(pane.GetRenderer().GetViewport())
+            self._PaneViewports[pane] = viewport
+            xmin, ymin, xmax, ymax = viewport
+            entries.append((pane, (xmin * width, ymin * height,
+                                   xmax * width, ymax * height)))
+        self._PaneIndex = SpatialIndex.GridIndex(inclusive=1)
+        self._PaneIndex.Build(entries)
+        self._PaneIndexSize = (width, height)
+
+    def _FindPane(self, x, y):
+        # find the pane at (x, y), or None
+        if self._PaneIndex is None or \
+                tuple(self._RenderWindow.GetSize()) != self._PaneIndexSize:
+            self._BuildPaneIndex()
+        return self._PaneIndex.Find(x, y)
 
     def GetRenderPanes(self):
         return self._RenderPanes
@@ -743,12 +861,18 @@ class PaneFrame(EventHandler.EventHandler):
         if len(self._RenderPanes) == 0:
             raise Exception("No attached render panes!!")
         for pane in self._RenderPanes:
-            if pane.HasChangedSince(pane.GetRenderTime()):
+            if pane.NeedsRender():
                 renderneeded = 1
                 break
         if renderneeded:
+            start = RenderTiming.Clock()
             self._RenderWindow.Render()
+            elapsed = RenderTiming.Clock() - start
             self._RenderFTime = time.time()
+            self._LODController.AddFrameTime(elapsed)
+            timer = RenderTiming.GetRenderTimer()
+            if timer.IsEnabled():
+                timer.Add('window', self, elapsed)
 
         return renderneeded
 
@@ -761,29 +885,26 @@ class PaneFrame(EventHandler.EventHandler):
         # schedule the specified function to be called after the
         # specified number of milliseconds
         PaneFrame._ScheduleId = PaneFrame._ScheduleId + 1
-        PaneFrame._ScheduledCallbacks.append(
-            [PaneFrame._ScheduleId, func, time.time() * 1000 + millisecs, 0.0])
-        return PaneFrame._ScheduleId
+        return PaneFrame._Scheduler.Add(PaneFrame._ScheduleId, millisecs, func)
 
     def ScheduleEvery(self, millisecs, func):
         # schedule the specified function to be called each time the
         # specified number of milliseconds has elapsed
         PaneFrame._ScheduleId = PaneFrame._ScheduleId + 1
-        PaneFrame._ScheduledCallbacks.append(
-            [PaneFrame._ScheduleId, func, time.time() * 1000 + millisecs, millisecs])
-        return PaneFrame._ScheduleId
+        return PaneFrame._Scheduler.Add(PaneFrame._ScheduleId, millisecs, func,
+                                        millisecs)
 
     def UnSchedule(self, id):
-        for item in list(PaneFrame._ScheduledCallbacks):
-            if item[0] == id:
-                PaneFrame._ScheduledCallbacks.remove(item)
+        PaneFrame._Scheduler.Remove(id)
 
     # --------------------------------------
     def Start(self):
 
         self.Render()
         self._RenderWindowInteractor.Initialize()
-        self._RenderWindowInteractor.CreateTimer(0)
+        # this frame's interactor runs the scheduled callbacks
+        PaneFrame._Scheduler.SetDeadlineCallback(self._ArmTimer)
+        self._ArmTimer()
         self._RenderWindowInteractor.Start()
 
 
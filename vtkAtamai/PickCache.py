@@ -0,0 +1,164 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: PickCache.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+PickCache - remember the results of recent picks
+
+  Drag interactions often pick the same display position again and
+  again while nothing in the scene changes.  The PickCache is a small
+  least-recently-used cache that maps a key, which describes the pick
+  position and the state of the scene, to the pick results.  It is
+  used by the RenderPane to store the PickInformation lists made by
+  DoSmartPick(), and it counts its hits and misses so that the
+  benefit can be measured:
+
+    cache = pane.GetPickCache()
+    print(cache.GetNumberOfHits(), cache.GetNumberOfMisses())
+
+  The cache knows nothing about what the keys mean, it is up to the
+  RenderPane to make a new key whenever the scene changes.
+
+Derived From:
+
+  object
+
+See Also:
+
+  RenderPane
+
+Initialization:
+
+  PickCache(*size*=16)
+
+Public Methods:
+
+  Get(*key*,*test*=None)       -- get the stored value, or None; if
+                                  test(*value*) is false then the value
+                                  is discarded and counted as a miss
+
+  Add(*key*,*value*)           -- store a value, the least recently
+                                  used value is discarded if the cache
+                                  is full
+
+  SetSize(*size*)              -- the maximum number of values, zero
+                                  disables the cache
+  GetSize()
+
+  GetNumberOfItems()           -- the number of values in the cache
+
+  GetNumberOfHits()            -- the number of Get() calls that found
+  GetNumberOfMisses()             a value, and that did not
+
+  ResetStatistics()            -- set the hit and miss counts to zero
+
+  Clear()                      -- discard all values
+
+"""
+
+#======================================
+from builtins import object
+import collections
+
+#======================================
+
+
+class PickCache(object):
+
+    def __init__(self, size=16):
+        self._Size = size
+        self._Items = collections.OrderedDict()
+        self.ResetStatistics()
+
+    def Get(self, key, test=None):
+        value = self._Items.pop(key, None)
+        if value is None or (test is not None and not test(value)):
+            self._Misses = self._Misses + 1
+            return None
+        # re-insert to make this the most recently used
+        self._Items[key] = value
+        self._Hits = self._Hits + 1
+        return value
+
+    def Add(self, key, value):
+        self._Items.pop(key, None)
+        self._Items[key] = value
+        while len(self._Items) > self._Size:
+            self._Items.popitem(last=False)
+
+    def SetSize(self, size):
+        self._Size = size
+        while len(self._Items) > self._Size:
+            self._Items.popitem(last=False)
+
+    def GetSize(self):
+        return self._Size
+
+    def GetNumberOfItems(self):
+        return len(self._Items)
+
+    def GetNumberOfHits(self):
+        return self._Hits
+
+    def GetNumberOfMisses(self):
+        return self._Misses
+
+    def ResetStatistics(self):
+        self._Hits = 0
+        self._Misses = 0
+
+    def Clear(self):
+        self._Items.clear()
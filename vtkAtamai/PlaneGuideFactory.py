@@ -66,6 +66,7 @@ from __future__ import division
 from builtins import range
 from past.utils import old_div
 from vtkAtamai.ActorFactory import *
+from vtkAtamai import RenderTiming
 
 import math
 
@@ -74,6 +75,9 @@ import math
 
 class PlaneGuideFactory(ActorFactory):
 
+    # the plane and property are watched, see SetPlane()
+    _PushModified = 1
+
     def __init__(self):
         ActorFactory.__init__(self)
         self._Property = vtk.vtkProperty()
@@ -81,11 +85,16 @@ class PlaneGuideFactory(ActorFactory):
         self._Line = []
         for i in range(4):
             self._Line.append(vtk.vtkPlaneSource())
+        self._UpdateWatchedObjects()
 
     def SetPlane(self, plane):
         if plane is None:
             return
 
+        # the plane tells us whenever it is modified
+        if self._Plane is not None and self._Plane is not plane:
+            self._Plane._RemoveDirtyListener(self)
+        plane._AddDirtyListener(self)
         self._Plane = plane
 
         s = 0.05
@@ -138,6 +147,7 @@ class PlaneGuideFactory(ActorFactory):
         except:
             pass
 
+    @RenderTiming.TimedCallback
     def OnRenderEvent(self, ren, event):
         if self._Property.GetOpacity() == 0.0:
             return
@@ -185,6 +195,9 @@ class PlaneGuideFactory(ActorFactory):
             for actor in self._ActorDict[renderer]:
                 actor.SetVisibility(i)
 
+    def _GetWatchedObjects(self):
+        return ActorFactory._GetWatchedObjects(self) + [self._Property]
+
     def HasChangedSince(self, sinceMTime):
         if ActorFactory.HasChangedSince(self, sinceMTime):
             return 1
@@ -91,12 +91,16 @@ Public Methods:
 
 #======================================
 from .ActorFactory import *
+from . import RenderTiming
 import math
 
 
 #======================================
 class PlaneIntersectionsFactory(ActorFactory):
 
+    # the planes and property are watched, see SetPlanes()
+    _PushModified = 1
+
     def __init__(self):
         ActorFactory.__init__(self)
 
@@ -108,6 +112,7 @@ class PlaneIntersectionsFactory(ActorFactory):
         self._Cutters = []
 
         self._Append = vtk.vtkAppendPolyData()
+        self._UpdateWatchedObjects()
 
     def SetColor(self, *args):
         self._Property.SetColor(*args)
@@ -115,6 +120,9 @@ class PlaneIntersectionsFactory(ActorFactory):
     def GetColor(self):
         return self._Property.GetColor()
 
+    def _GetWatchedObjects(self):
+        return ActorFactory._GetWatchedObjects(self) + [self._Property]
+
     def HasChangedSince(self, sinceMTime):
         if ActorFactory.HasChangedSince(self, sinceMTime):
             return 1
@@ -126,6 +134,11 @@ class PlaneIntersectionsFactory(ActorFactory):
         return 0
 
     def SetPlanes(self, planes):
+        # the planes tell us whenever they are modified
+        for plane in self._Planes:
+            plane._RemoveDirtyListener(self)
+        for plane in planes:
+            plane._AddDirtyListener(self)
         self._Planes = list(planes)
         planes = list(planes)
         done = []
@@ -165,6 +178,7 @@ class PlaneIntersectionsFactory(ActorFactory):
         except:
             pass
 
+    @RenderTiming.TimedCallback
     def OnRenderEvent(self, ren, event):
         camera = ren.GetActiveCamera()
         v = camera.GetViewPlaneNormal()
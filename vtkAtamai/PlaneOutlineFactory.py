@@ -86,6 +86,7 @@ Public Methods:
 """
 #======================================
 from .ActorFactory import *
+from . import RenderTiming
 import vtk
 import math
 
@@ -94,6 +95,9 @@ import math
 
 class PlaneOutlineFactory(ActorFactory):
 
+    # the plane and property are watched, see SetPlane()
+    _PushModified = 1
+
     def __init__(self):
         ActorFactory.__init__(self)
         self._Property = vtk.vtkProperty()
@@ -101,11 +105,16 @@ class PlaneOutlineFactory(ActorFactory):
         self._Line = []
         for i in range(4):
             self._Line.append(vtk.vtkLineSource())
+        self._UpdateWatchedObjects()
 
     def SetPlane(self, plane):
         if plane is None:
             return
 
+        # the plane tells us whenever it is modified
+        if self._Plane is not None and self._Plane is not plane:
+            self._Plane._RemoveDirtyListener(self)
+        plane._AddDirtyListener(self)
         self._Plane = plane
 
         s = 0.05
@@ -150,6 +159,7 @@ class PlaneOutlineFactory(ActorFactory):
         except:
             pass
 
+    @RenderTiming.TimedCallback
     def OnRenderEvent(self, ren, event):
         if self._Property.GetOpacity() == 0.0:
             return
@@ -193,6 +203,9 @@ class PlaneOutlineFactory(ActorFactory):
             for actor in self._ActorDict[renderer]:
                 actor.SetVisibility(i)
 
+    def _GetWatchedObjects(self):
+        return ActorFactory._GetWatchedObjects(self) + [self._Property]
+
     def HasChangedSince(self, sinceMTime):
         if ActorFactory.HasChangedSince(self, sinceMTime):
             return 1
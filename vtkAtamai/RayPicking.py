@@ -0,0 +1,337 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: RayPicking.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+RayPicking - intersect many view rays with the scene at once
+
+  A vtkPicker handles one display point per call, and tests every prop
+  in the renderer each time.  Tools such as lasso selection need to
+  pick hundreds of points per frame, so these functions work on numpy
+  arrays of rays instead:
+
+    p1, p2 = RayPicking.GetViewRays(renderer, xy)
+    t = RayPicking.IntersectParallelogram(origin, point1, point2, p1, p2)
+    t, normals = RayPicking.IntersectActor(actor, p1, p2)
+
+  Each ray is the line segment between the near and far clipping planes
+  below a display point, exactly as used by the picker.  The results
+  are given as the parametric position t along each segment, which is
+  NaN for the rays that miss.  Actors are intersected through a cell
+  locator from the shared LocatorCache, so the locator is only built
+  once for each mesh.
+
+  This module is used by RenderPane.PickMany().
+
+Derived From:
+
+  object
+
+See Also:
+
+  RenderPane, LocatorCache, SlicePlaneFactory
+
+Module Functions:
+
+  GetViewRays(*renderer*,*xy*) -- the world coordinates of the near and
+                                  far ends of the view rays below an
+                                  (N,2) array of display points
+
+  IntersectParallelogram(*origin*,*point1*,*point2*,*p1*,*p2*)
+                               -- intersect the segments p1,p2 with the
+                                  parallelogram spanned from origin to
+                                  point1 and point2
+
+  IntersectActor(*actor*,*p1*,*p2*,*tolerance*=0.0)
+                               -- intersect the segments with the data
+                                  displayed by a vtkActor, and also get
+                                  the point normals at the intersections
+
+  ClipIntersections(*actor*,*points*,*t*)
+                               -- set t to NaN where the points are cut
+                                  away by the mapper's clipping planes
+
+  IsPickable(*prop*)           -- whether a vtkPicker would consider the
+                                  prop at all
+
+"""
+
+#======================================
+from builtins import range
+import logging
+
+import numpy as np
+import vtk
+
+from . import LocatorCache
+
+logger = logging.getLogger(__name__)
+
+# pass-by-reference arguments, vtk.mutable before VTK 8
+try:
+    _Reference = vtk.reference
+except AttributeError:
+    _Reference = vtk.mutable
+
+#======================================
+
+
+def _MatrixToArray(matrix):
+    return np.array([[matrix.GetElement(i, j) for j in range(4)]
+                     for i in range(4)])
+
+
+def _TransformPoints(matrix, points):
+    """Apply a 4x4 matrix to an (N,3) array of points."""
+    h = np.dot(points, matrix[0:3, 0:3].T) + matrix[0:3, 3]
+    w = np.dot(points, matrix[3, 0:3]) + matrix[3, 3]
+    return h / w[:, np.newaxis]
+
+
+def GetViewRays(renderer, xy):
+    """Get the world coordinates at the near and far ends of view rays.
+
+    The display points are given as an (N,2) array.  Two (N,3) arrays
+    are returned, which are the points at display depth 0.0 and 1.0.
+
+    """
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+
+    # the display to view conversion is affine, so it can be found
+    # from four points, which takes care of viewports and tiling
+    def DisplayToView(x, y, z):
+        renderer.SetDisplayPoint(x, y, z)
+        renderer.DisplayToView()
+        return np.array(renderer.GetViewPoint())
+
+    v0 = DisplayToView(0.0, 0.0, 0.0)
+    displayToView = np.identity(4)
+    displayToView[0:3, 0] = DisplayToView(1.0, 0.0, 0.0) - v0
+    displayToView[0:3, 1] = DisplayToView(0.0, 1.0, 0.0) - v0
+    displayToView[0:3, 2] = DisplayToView(0.0, 0.0, 1.0) - v0
+    displayToView[0:3, 3] = v0
+
+    # this is the matrix that vtkRenderer.ViewToWorld() uses
+    camera = renderer.GetActiveCamera()
+    worldToView = _MatrixToArray(camera.GetCompositeProjectionTransformMatrix(
+        renderer.GetTiledAspectRatio(), 0, 1))
+    displayToWorld = np.dot(np.linalg.inv(worldToView), displayToView)
+
+    points = np.zeros((len(xy), 3))
+    points[:, 0:2] = xy
+    p1 = _TransformPoints(displayToWorld, points)
+    points[:, 2] = 1.0
+    p2 = _TransformPoints(displayToWorld, points)
+    return p1, p2
+
+
+def IntersectParallelogram(origin, point1, point2, p1, p2):
+    """Intersect line segments with a parallelogram.
+
+    The parallelogram has corners at origin, point1 and point2 (like a
+    vtkPlaneSource).  The segments are given by (N,3) arrays p1, p2.
+    The parametric position of each intersection along its segment is
+    returned, or NaN if the segment misses.
+
+    """
+    origin = np.asarray(origin, dtype=float)
+    u = np.asarray(point1, dtype=float) - origin
+    v = np.asarray(point2, dtype=float) - origin
+    normal = np.cross(u, v)
+    d = p2 - p1
+    denom = np.dot(d, normal)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.dot(origin - p1, normal) / denom
+        # solve for the coordinates of the intersection within the
+        # parallelogram, w = a*u + b*v
+        w = p1 + t[:, np.newaxis] * d - origin
+        uu = np.dot(u, u)
+        uv = np.dot(u, v)
+        vv = np.dot(v, v)
+        wu = np.dot(w, u)
+        wv = np.dot(w, v)
+        det = uu * vv - uv * uv
+        a = (wu * vv - wv * uv) / det
+        b = (wv * uu - wu * uv) / det
+        hit = ((t >= 0.0) & (t <= 1.0) & (a >= 0.0) & (a <= 1.0) &
+               (b >= 0.0) & (b <= 1.0))
+    return np.where(hit, t, np.nan)
+
+
+def IsPickable(prop):
+    """Check whether a vtkPicker would consider a prop at all."""
+    if not (prop.GetPickable() and prop.GetVisibility()):
+        return 0
+    if prop.IsA('vtkActor') and prop.GetProperty().GetOpacity() <= 0.0:
+        return 0
+    return 1
+
+
+def _GetDataSet(actor):
+    mapper = actor.GetMapper()
+    if mapper is None:
+        return None
+    try:
+        dataSet = mapper.GetInputAsDataSet()
+    except AttributeError:
+        dataSet = mapper.GetInput()
+    return dataSet
+
+
+def _ClipToBounds(bounds, q1, q2, tolerance):
+    """Find which segments pass through the padded bounds."""
+    bounds = np.asarray(bounds, dtype=float).reshape(3, 2)
+    low = bounds[:, 0] - tolerance
+    high = bounds[:, 1] + tolerance
+    d = q2 - q1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (low - q1) / d
+        t2 = (high - q1) / d
+    # segments parallel to a slab must start within it
+    parallel = (d == 0.0)
+    inside = (q1 >= low) & (q1 <= high)
+    tmin = np.where(parallel, np.where(inside, -np.inf, np.inf),
+                    np.minimum(t1, t2))
+    tmax = np.where(parallel, np.where(inside, np.inf, -np.inf),
+                    np.maximum(t1, t2))
+    enter = np.maximum(tmin.max(axis=1), 0.0)
+    leave = np.minimum(tmax.min(axis=1), 1.0)
+    return enter <= leave
+
+
+def IntersectActor(actor, p1, p2, tolerance=0.0):
+    """Intersect line segments with the data displayed by an actor.
+
+    The segments are given in world coordinates by (N,3) arrays p1, p2.
+    The parametric position of the first intersection along each
+    segment is returned, or NaN where the segment misses, as well as
+    an (N,3) array of world normals from the point normals of the data
+    (NaN if the data has no normals).  Like ActorFactory.GetPickList(),
+    the normal is that of the data point nearest to the intersection.
+    The tolerance, in world units, is used for lines and vertices.
+
+    """
+    n = len(p1)
+    t = np.full(n, np.nan)
+    normals = np.full((n, 3), np.nan)
+    dataSet = _GetDataSet(actor)
+    if dataSet is None or not dataSet.IsA('vtkDataSet') or \
+            dataSet.GetNumberOfCells() == 0:
+        return t, normals
+
+    # intersect in data coordinates
+    matrix = _MatrixToArray(actor.GetMatrix())
+    inverse = np.linalg.inv(matrix)
+    q1 = _TransformPoints(inverse, p1)
+    q2 = _TransformPoints(inverse, p2)
+    candidates = np.nonzero(_ClipToBounds(dataSet.GetBounds(), q1, q2,
+                                          tolerance))[0]
+    if len(candidates) == 0:
+        return t, normals
+
+    # the tolerance is only needed to hit lines and vertices, for surfaces
+    # it would snap rays that pass near an edge onto the edge
+    if dataSet.IsA('vtkPolyData') and \
+            dataSet.GetNumberOfLines() + dataSet.GetNumberOfVerts() == 0:
+        tolerance = 0.0
+
+    locator = LocatorCache.GetLocatorCache().GetCellLocator(dataSet)
+    tref = _Reference(0.0)
+    subId = _Reference(0)
+    cellId = _Reference(0)
+    x = [0.0, 0.0, 0.0]
+    pcoords = [0.0, 0.0, 0.0]
+    hits = []
+    for i in candidates:
+        if locator.IntersectWithLine(tuple(q1[i]), tuple(q2[i]), tolerance,
+                                     tref, x, pcoords, subId, cellId):
+            t[i] = float(tref)
+            hits.append((i, tuple(x)))
+
+    dataNormals = dataSet.GetPointData().GetNormals()
+    if hits and dataNormals:
+        # normals are transformed by the inverse transpose
+        normalMatrix = inverse[0:3, 0:3].T
+        for i, x in hits:
+            pointId = LocatorCache.FindPoint(dataSet, x)
+            if pointId >= 0:
+                normal = np.dot(normalMatrix, dataNormals.GetTuple3(pointId))
+                norm = np.sqrt(np.dot(normal, normal))
+                if norm > 0:
+                    normals[i] = normal / norm
+
+    return t, normals
+
+
+def ClipIntersections(actor, points, t):
+    """Discard the intersections removed by the mapper's clipping planes.
+
+    The clipping planes are applied in the data coordinates of the
+    actor, as VolumePlanesFactory does.  The array t is modified in
+    place and also returned.
+
+    """
+    planes = actor.GetMapper().GetClippingPlanes()
+    if not planes or planes.GetNumberOfItems() == 0:
+        return t
+    inverse = np.linalg.inv(_MatrixToArray(actor.GetMatrix()))
+    q = _TransformPoints(inverse, points)
+    planes.InitTraversal()
+    for i in range(planes.GetNumberOfItems()):
+        plane = planes.GetNextItem()
+        value = np.dot(q - plane.GetOrigin(), plane.GetNormal())
+        t[value < 0] = np.nan
+    return t
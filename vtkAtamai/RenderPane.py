@@ -105,6 +105,9 @@ Public Methods:
 
   GetActorFactories()      -- get the list of connected actor factories
 
+  SetRenderQuality(*q*)    -- set the quality for the pane and its
+                              factories, see LODController
+
 
   ConnectCursor(*cursor*)    -- connect a cursor (see CursorFactory.py)
 
@@ -149,6 +152,17 @@ Public Methods:
   Render()                 -- render this pane (and all other panes that
                               share the same PaneFrame)
 
+  NeedsRender()            -- true if the pane or anything in it has been
+                              modified since the last render (this is
+                              much cheaper than calling HasChangedSince())
+
+  GetPickCache()           -- the PickCache that keeps recent pick results,
+                              and counts hits and misses
+
+  PickMany(*xy*)           -- pick an (N,2) array of display points at
+                              once, returns arrays of positions, normals,
+                              factory indices and distances
+
 
   ScheduleOnce(*ms*, *func*)    -- schedule a function to be called after
                               the specified number of milliseconds
@@ -210,7 +224,11 @@ Handler Methods:
 Other Important Methods:
 
   StartRender()            -- this method is called immediately before
-                              each render
+                              each render, it moves the 3D cursor to the
+                              last mouse position (once per frame)
+
+  The time from the start to the end of each render is recorded as
+  'renderer' if RenderTiming is enabled.
 
 Protected Attributes:
 
@@ -218,6 +236,10 @@ Protected Attributes:
 
   _Picker                  -- the vtkCellPicker
 
+  _WidgetIndex             -- SpatialIndex for finding the widget under
+                              the mouse, rebuilt when the widget geometry
+                              changes
+
 To Do:
 
   - If a cursor is added while the mouse is in the pane, it will not render
@@ -237,16 +259,41 @@ import logging
 #======================================
 from . import EventHandler
 from . import PaneFrame
+from . import ActorFactory
+from . import SpatialIndex
+from . import RenderTiming
+from . import PickCache
+from . import RayPicking
 
 import math
 import types
 import sys
+import numpy as np
 import vtk
 
 logger = logging.getLogger(__name__)
 #======================================
 
 
+def _BoundsDistance(bounds, point, tolerance=0.0):
+    """The distance from point to the nearest point in bounds.
+
+    The bounds are padded by tolerance.  The distance is zero if the
+    point is inside the bounds.
+
+    """
+    d2 = 0.0
+    for j in range(3):
+        x = point[j]
+        lo = bounds[2 * j] - tolerance
+        hi = bounds[2 * j + 1] + tolerance
+        if x < lo:
+            d2 = d2 + (lo - x) ** 2
+        elif x > hi:
+            d2 = d2 + (x - hi) ** 2
+    return math.sqrt(d2)
+
+
 @implementer(IRenderPane)
 class RenderPane(EventHandler.EventHandler):
 
@@ -263,6 +310,9 @@ class RenderPane(EventHandler.EventHandler):
 
     """
 
+    # HasChangedSince() is covered by NeedsRender(), see ActorFactory
+    _PushModified = 1
+
     def __del__(self):
         print('RenderPane deleted!')
 
@@ -285,9 +335,16 @@ class RenderPane(EventHandler.EventHandler):
 
         # pick information list, this is filled in by DoSmartPick
         self._PickInformationList = []
+        # recent results of DoSmartPick, see _GetPickKey()
+        self._PickCache = PickCache.PickCache()
+        self._PickTime = vtk.vtkObject()
+        # incremented whenever the pane or its contents are modified
+        self._SceneStamp = 0
 
         # the actors in the pane
         self._ActorFactories = []
+        # the rendering quality, see SetRenderQuality()
+        self._RenderQuality = 1.0
         self._CurrentActor = None
         self._CurrentActorFactory = None
 
@@ -295,16 +352,28 @@ class RenderPane(EventHandler.EventHandler):
         self._Widgets = []
         self._CurrentWidget = None
         self._FocusWidget = None
+        self._WidgetIndex = None
 
         # cursor transform, for 3D cursor
         self._Cursors = []
         self._CursorOnFlag = 1
         self._CursorShownFlag = 0
+        # mouse position for the next cursor update, see StartRender()
+        self._CursorPosition = None
 
         # the time of the last modification/render
         self._MTime = vtk.vtkObject()
         self._RenderTime = vtk.vtkObject()
-        startMethod = lambda o, e, s=self: s.StartRender()
+
+        # set by Modified() on the pane or its contents, cleared by render
+        self._Dirty = 1
+        # factories and widgets that must be polled, see NeedsRender()
+        self._PolledObjects = None
+        # (object, observer tag) for the VTK objects that we observe
+        self._WatchedObjects = []
+        # start time of the current render, if it is being timed
+        self._RenderStartTime = None
+        startMethod = lambda o, e, s=self: s._OnStartRender()
         self._Renderer.AddObserver("StartEvent", startMethod)
         self._Renderer.AddObserver("EndEvent", self.EndRender)
 
@@ -374,8 +443,12 @@ class RenderPane(EventHandler.EventHandler):
     def tearDown(self):
         for actor in self.GetActorFactories():
             actor.RemoveFromRenderer(self._Renderer)
+            actor._RemoveDirtyListener(self)
         self._ActorFactories = []
 
+        for obj, tag in list(self._WatchedObjects):
+            self._UnwatchModified(obj)
+
         # remove all Atamai event handlers
         self.RemoveAllEventHandlers()
 
@@ -586,6 +659,7 @@ class RenderPane(EventHandler.EventHandler):
                 widget.ConfigureGeometry((evt.x, evt.y),
                                          (evt.width, evt.height))
                 widget.HandleEvent(evt)
+            self._WidgetIndex = None
             self.Modified()
             return EventHandler.EventHandler.HandleEvent(self, evt)
 
@@ -602,13 +676,8 @@ class RenderPane(EventHandler.EventHandler):
             self._MouseX = evt.x
             self._MouseY = evt.y
 
-            # set current widget to the one under the mouse
-            for widget in self._Widgets:
-                if widget.IsInWidget(evt):
-                    newCurrentWidget = widget
-                    break
-            else:  # or None if not over any widget
-                newCurrentWidget = None
+            # set current widget to the one under the mouse (or None)
+            newCurrentWidget = self._FindWidget(evt)
 
             # check to see if the focus should be changed
             if (newCurrentWidget != self._FocusWidget and
@@ -624,12 +693,9 @@ class RenderPane(EventHandler.EventHandler):
                  self._CurrentWidget != newCurrentWidget) or
                     self._FocusWidget != newFocusWidget):
                 if self._FocusWidget:
-                    # make a copy of the current event
-                    e = EventHandler.Event()
-                    for attr in dir(evt):
-                        setattr(e, attr, getattr(evt, attr))
-                    # but change the type to 'Leave'
-                    e.type = '8'  # 'Leave'
+                    # make a copy of the current event, but change
+                    # the type to 'Leave'
+                    e = EventHandler.DeriveEvent(evt, '8')
                     # and pass to the widget
                     self._FocusWidget.HandleEvent(e)
                 elif evt.type not in ('7', '8'):  # 'Enter','Leave'
@@ -640,12 +706,9 @@ class RenderPane(EventHandler.EventHandler):
                  self._CurrentWidget != newCurrentWidget) or
                     self._FocusWidget != newFocusWidget):
                 if newFocusWidget:
-                    # make a copy of the current event
-                    e = EventHandler.Event()
-                    for attr in dir(evt):
-                        setattr(e, attr, getattr(evt, attr))
-                    # but change the type to 'Enter'
-                    e.type = '7'  # 'Enter'
+                    # make a copy of the current event, but change
+                    # the type to 'Enter'
+                    e = EventHandler.DeriveEvent(evt, '7')
                     # and pass to the widget
                     newFocusWidget.HandleEvent(e)
                 elif evt.type not in ('7', '8'):  # 'Enter','Leave'
@@ -852,7 +915,7 @@ class RenderPane(EventHandler.EventHandler):
 
         """
 
-        self.DoSmartPick(evt)
+        self.DoSmartPick(evt, nearest=1)
 
         if self._PickInformationList:
             self._CurrentActor = self._PickInformationList[0].actor
@@ -928,9 +991,8 @@ class RenderPane(EventHandler.EventHandler):
         if evt.type in ('4', '5', '6', '7', '8'):  # mouse event
             if not self._Renderer.IsInViewport(evt.x, evt.y):
                 return
-            for widget in self._Widgets:
-                if widget.IsInWidget(evt):
-                    return
+            if self._FindWidget(evt):
+                return
 
         self._ShowCursor()
         self.DoCursorMotion(evt)
@@ -949,35 +1011,117 @@ class RenderPane(EventHandler.EventHandler):
     def DoCursorMotion(self, evt):
         """Internal method for moving the 3D cursor when the mouse moves."""
         # handle cursor motion, internal use only
-        # do the pick
-        return
-        self.DoSmartPick(evt)
+        # the cursor is only moved in StartRender(), so that there is
+        # at most one cursor pick per frame no matter how many motion
+        # events arrive between frames
+        if not self._Cursors:
+            return
+        self._CursorPosition = (evt.x, evt.y)
+        self._Dirty = 1
 
-        if self._PickInformationList:
-            pickInfo = self._PickInformationList[0]
-            position = pickInfo.position
-            normal = pickInfo.normal
-            vector = pickInfo.vector
+    def _UpdateCursor(self):
+        """Move the 3D cursor to the most recent mouse position."""
+        x, y = self._CursorPosition
+        self._CursorPosition = None
+
+        # a full DoSmartPick() is far too slow to do for every frame, so
+        # intersect the view ray with the slice planes, or else read the
+        # depth under the mouse from the previous frame
+        pick = self._CursorPickSlicePlanes(x, y)
+        if pick is None:
+            pick = self._CursorPickDepth(x, y)
+
+        self._UpdateCursorTransform(*pick)
+
+    def _CursorPickSlicePlanes(self, x, y):
+        """Intersect the view ray through x,y with the slice planes.
+
+        The result is (position, normal, vector) for the nearest slice
+        plane, or None if the ray misses all of them.
+
+        """
+        planes = []
+        for factory in self._ActorFactories:
+            self._GetSlicePlanes(factory, planes)
+        if not planes:
+            return None
+
+        p1, p2 = RayPicking.GetViewRays(self._Renderer, ((x, y),))
+        best = None
+        for factory, actor in planes:
+            t = factory.IntersectWithLines(p1, p2)
+            with np.errstate(invalid='ignore'):
+                points = p1 + t[:, np.newaxis] * (p2 - p1)
+            RayPicking.ClipIntersections(actor, points, t)
+            if not np.isnan(t[0]) and (best is None or t[0] < best[0]):
+                best = (t[0], tuple(points[0].tolist()), factory)
+
+        if best is None:
+            return None
+        t, position, factory = best
+        return (position, factory.GetTransformedNormal(),
+                factory.GetTransformedVector2())
+
+    def _GetSlicePlanes(self, factory, planes):
+        """Collect (factory, actor) for the visible slice planes."""
+        if hasattr(factory, 'IntersectWithLines'):
+            actors = factory._ActorDict.get(self._Renderer, [])
+            if isinstance(actors, dict):
+                actors = list(actors.values())
+            for actor in actors:
+                if RayPicking.IsPickable(actor):
+                    planes.append((factory, actor))
+        for child in factory.GetChildren():
+            self._GetSlicePlanes(child, planes)
+
+    def _CursorPickDepth(self, x, y):
+        """Find the cursor position from the z-buffer.
+
+        The depth buffer still holds the previous frame when this is
+        called from StartRender().  The cursor was drawn into that frame
+        too, so if the depth is on the cursor itself, or if there is
+        nothing under the mouse, the cursor stays at its current depth
+        or goes to the focal plane of the camera.
+
+        """
+        renderer = self._Renderer
+        camera = renderer.GetActiveCamera()
+        normal = camera.GetViewPlaneNormal()
+        vector = camera.GetViewUp()
+
+        z = renderer.GetRenderWindow().GetZbufferDataAtPoint(x, y)
+        if 0.0 < z < 1.0:
+            position = self._DisplayToWorld(x, y, z)
+            if not self._IsOnCursor(position):
+                return (position, normal, vector)
+            position = self._Cursors[0].GetCursorPosition()
         else:
-            # no actor: place cursor in focal plane of camera
-            camera = self._Renderer.GetActiveCamera()
+            position = camera.GetFocalPoint()
+
+        # get the z-buffer depth of the position
+        fx, fy, fz = position
+        renderer.SetWorldPoint(fx, fy, fz, 1.0)
+        renderer.WorldToDisplay()
+        z = renderer.GetDisplayPoint()[2]
 
-            # get the z-buffer depth of focal point
-            fx, fy, fz = camera.GetFocalPoint()
-            self._Renderer.SetWorldPoint(fx, fy, fz, 1.0)
-            self._Renderer.WorldToDisplay()
-            z = self._Renderer.GetDisplayPoint()[2]
+        return (self._DisplayToWorld(x, y, z), normal, vector)
 
-            # find world-coord from mouse position
-            self._Renderer.SetDisplayPoint(evt.x, evt.y, z)
-            self._Renderer.DisplayToWorld()
-            x0, y0, z0, w = self._Renderer.GetWorldPoint()
+    def _DisplayToWorld(self, x, y, z):
+        # find world-coord from display coords
+        self._Renderer.SetDisplayPoint(x, y, z)
+        self._Renderer.DisplayToWorld()
+        x0, y0, z0, w = self._Renderer.GetWorldPoint()
 
-            position = (old_div(x0, w), old_div(y0, w), old_div(z0, w))
-            normal = camera.GetViewPlaneNormal()
-            vector = camera.GetViewUp()
+        return (old_div(x0, w), old_div(y0, w), old_div(z0, w))
 
-        self._UpdateCursorTransform(position, normal, vector)
+    def _IsOnCursor(self, position):
+        """Check whether a world position is within a cursor's bounds."""
+        for cursor in self._Cursors:
+            for actor in cursor._ActorDict.get(self._Renderer, []):
+                if (actor.GetVisibility() and
+                        _BoundsDistance(actor.GetBounds(), position) == 0):
+                    return 1
+        return 0
 
     #--------------------------------------
     def _ShowCursor(self):
@@ -1018,26 +1162,56 @@ class RenderPane(EventHandler.EventHandler):
             cursor.SetVisibility(self._Renderer, 0)
 
     #--------------------------------------
-    def DoSmartPick(self, evt):
+    def DoSmartPick(self, evt, nearest=0):
         """Internal method to do a pick at the event x,y coordinates.
 
         Perform a pick in order to convert the x,y display coords
         of the event into x,y,z world coordinates according to where
         the view ray intersects each ActorFactory under the mouse.
 
+        Only the ActorFactories that own one of the props that were
+        hit by the picker are asked for pick information.  If *nearest*
+        is set, then only the nearest pick is guaranteed to be in the
+        list: the factories are asked in order of the distance from
+        the camera to the bounds of their picked actors, and the search
+        stops when no remaining factory can provide a nearer pick.
+
         The pick results are stored in the _PickInformationList
-        variable.
+        variable.  They are also kept in the PickCache, and are reused
+        if the same position is picked again before the camera or the
+        scene changes.  The PickInformation objects in the list are
+        shared with the cache and should not be modified.
 
         """
 
         evt.picker = self._Picker
 
+        key = self._GetPickKey(evt, nearest)
+        if key is not None:
+            entry = self._PickCache.Get(key, self._IsPickCurrent)
+            if entry is not None:
+                # make sure the picker is in the state that the list
+                # was made from, in case the event is passed on
+                if self._Picker.GetRenderer() is not self._Renderer or \
+                        self._Picker.GetSelectionPoint()[0:2] != \
+                        (evt.x, evt.y):
+                    self._Picker.Pick(evt.x, evt.y, 0, self._Renderer)
+                self._PickInformationList = list(entry[1])
+                return self._PickInformationList
+            self._PickTime.Modified()
+
         self._Picker.Pick(evt.x, evt.y, 0, self._Renderer)
         cameraPosition = evt.renderer.GetActiveCamera().GetPosition()
-        pickInfoList = []
-
-        # query all factories for positions and normals
-        for factory in self._ActorFactories:
+        candidates = self._FindPickedFactories(evt.renderer, cameraPosition)
+        if nearest:
+            candidates.sort(key=lambda candidate: candidate[0:2])
+        picks = []
+        best = None
+
+        # query the picked factories for positions and normals
+        for bound, index, factory in candidates:
+            if nearest and best is not None and bound > best:
+                break
             for pickInfo in factory.GetPickList(evt):
                 position = pickInfo.position
                 pickInfo.distance = \
@@ -1045,15 +1219,274 @@ class RenderPane(EventHandler.EventHandler):
                               ((position[1] - cameraPosition[1]) ** 2) +
                               ((position[2] - cameraPosition[2]) ** 2))
                 pickInfo.factory = factory
-                pickInfoList.append(pickInfo)
+                picks.append((pickInfo.distance, index, len(picks), pickInfo))
+                if best is None or pickInfo.distance < best:
+                    best = pickInfo.distance
 
-        # sort the list
-        pickInfoList.sort(key = lambda pn1: pn1.distance)
-        # old lambda function -- lambda pn1, pn2: 2 * (pn1.distance > pn2.distance) - 1)
+        # sort the list, ties are kept in the order of the factories
+        picks.sort(key=lambda pick: pick[0:3])
+        pickInfoList = [pick[3] for pick in picks]
         self._PickInformationList = pickInfoList
+        if key is not None:
+            self._PickCache.Add(key, (self._PickTime.GetMTime(),
+                                      list(pickInfoList)))
 
         return pickInfoList
 
+    def _GetPickKey(self, evt, nearest):
+        """Get a key for the PickCache that describes the pick and scene.
+
+        The key changes whenever the camera, the viewport, any prop in
+        the renderer, the input to the mapper of any visible pickable
+        prop, or anything that marks the pane as modified changes.
+        Factories that must be polled for modifications are checked by
+        _IsPickCurrent() instead.  None is returned if the cache is
+        disabled.
+
+        """
+        if self._PickCache.GetSize() == 0:
+            return None
+        renderer = self._Renderer
+        camera = renderer.GetActiveCamera()
+        props = renderer.GetViewProps()
+        n = props.GetNumberOfItems()
+        propMTime = 0
+        props.InitTraversal()
+        for i in range(n):
+            prop = props.GetNextProp()
+            propMTime = max(propMTime, prop.GetMTime())
+            if prop.GetVisibility() and prop.GetPickable():
+                propMTime = max(propMTime, self._GetPropInputMTime(prop))
+        return (evt.x, evt.y, nearest, self._SceneStamp,
+                camera, camera.GetMTime(), n, propMTime,
+                tuple(renderer.GetOrigin()), tuple(renderer.GetSize()))
+
+    def _GetPropInputMTime(self, prop):
+        """Get the MTime of the data that a prop's mapper will pick.
+
+        The prop's own MTime does not include its mapper's input, so the
+        input is brought up to date (as the pick itself would do) and
+        its MTime is returned.  The parts of an assembly are included.
+
+        """
+        mtime = 0
+        if prop.IsA("vtkAssembly"):
+            parts = prop.GetParts()
+            parts.InitTraversal()
+            for i in range(parts.GetNumberOfItems()):
+                mtime = max(mtime,
+                            self._GetPropInputMTime(parts.GetNextProp3D()))
+            return mtime
+        try:
+            mapper = prop.GetMapper()
+        except AttributeError:
+            return 0
+        if mapper is not None and mapper.GetNumberOfInputConnections(0):
+            mapper.GetInputAlgorithm().Update()
+            mtime = mapper.GetInputDataObject(0, 0).GetMTime()
+        return mtime
+
+    def _IsPickCurrent(self, entry):
+        """Check that no polled factory has changed since a cached pick."""
+        pickTime = entry[0]
+        if ActorFactory.RequiresPolling(self):
+            return not self.HasChangedSince(pickTime)
+        for obj in self._GetPolledObjects():
+            if obj.HasChangedSince(pickTime):
+                return 0
+        return 1
+
+    def GetPickCache(self):
+        """Get the PickCache that holds recent DoSmartPick() results."""
+        return self._PickCache
+
+    def _FindPickedFactories(self, renderer, cameraPosition, factories=None):
+        """Find the factories that own the props hit by the last pick.
+
+        A list of (bound, index, factory) tuples is returned, in the
+        order in which the factories were connected.  The bound is the
+        distance from the camera to the bounds of the factory's picked
+        actors, no pick on the factory can be nearer than this.  The
+        search can be limited to a list of (index, factory) pairs.
+
+        """
+        props = self._Picker.GetProp3Ds()
+        n = props.GetNumberOfItems()
+        if n == 0:
+            return []
+        picked = {}
+        props.InitTraversal()
+        for i in range(n):
+            picked[props.GetNextProp3D()] = 1
+
+        tolerance = self._GetPickTolerance()
+        if factories is None:
+            factories = enumerate(self._ActorFactories)
+
+        candidates = []
+        for index, factory in factories:
+            bound = None
+            for actor in factory.GetActors(renderer):
+                if actor in picked:
+                    d = _BoundsDistance(actor.GetBounds(), cameraPosition,
+                                        tolerance)
+                    if bound is None or d < bound:
+                        bound = d
+            if bound is not None:
+                candidates.append((bound, index, factory))
+
+        return candidates
+
+    def _GetPickTolerance(self):
+        """Get the picker tolerance in world units.
+
+        The picker pads the bounds by its tolerance, which is a fraction
+        of the size of the viewport at the focal plane.
+
+        """
+        renderer = self._Renderer
+        camera = renderer.GetActiveCamera()
+        if camera.GetParallelProjection():
+            height = 2 * camera.GetParallelScale()
+        else:
+            height = 2 * camera.GetDistance() * \
+                math.tan(math.radians(camera.GetViewAngle() / 2.0))
+        width, h = renderer.GetSize()[:2]
+        aspect = float(width) / max(h, 1)
+        return self._Picker.GetTolerance() * height * \
+            math.sqrt(1.0 + aspect ** 2)
+
+    #--------------------------------------
+    def PickMany(self, xy):
+        """Pick many display points at once.
+
+        The display points are given as an (N,2) array.  The result is
+        a tuple of four arrays, with the nearest pick for each point:
+
+          positions  - (N,3) world coordinates, NaN if nothing was hit
+
+          normals    - (N,3) normals, NaN if the factory has none
+
+          factories  - (N,) the index of the factory in the list from
+                       GetActorFactories(), or -1 if nothing was hit
+
+          distances  - (N,) the distance from the camera, or inf
+
+        The view rays are intersected with the actors of the factories
+        all at once, through the plane geometry of factories that provide
+        an IntersectWithLines() method (e.g. SlicePlaneFactory) and
+        through cell locators for plain ActorFactories.  Factories with
+        their own GetPickList(), such as the volume factories, are picked
+        one point at a time with the pane's picker.
+
+        """
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        n = len(xy)
+        positions = np.full((n, 3), np.nan)
+        normals = np.full((n, 3), np.nan)
+        factoryIds = np.full(n, -1, dtype=int)
+        distances = np.full(n, np.inf)
+        if n == 0:
+            return positions, normals, factoryIds, distances
+
+        renderer = self._Renderer
+        cameraPosition = np.array(renderer.GetActiveCamera().GetPosition())
+        p1, p2 = RayPicking.GetViewRays(renderer, xy)
+        tolerance = self._GetPickTolerance()
+
+        def Update(index, t, normal):
+            points = p1 + t[:, np.newaxis] * (p2 - p1)
+            d = np.sqrt(np.sum((points - cameraPosition) ** 2, axis=1))
+            nearer = d < distances
+            positions[nearer] = points[nearer]
+            normals[nearer] = normal[nearer]
+            factoryIds[nearer] = index
+            distances[nearer] = d[nearer]
+
+        fallback = []
+        for index, factory in enumerate(self._ActorFactories):
+            queries = []
+            if not self._GetRayQueries(factory, queries):
+                fallback.append((index, factory))
+                continue
+            for factory, actor in queries:
+                if factory is not None:
+                    t = factory.IntersectWithLines(p1, p2)
+                    normal = np.empty((n, 3))
+                    normal[:] = factory.GetTransformedNormal()
+                else:
+                    t, normal = RayPicking.IntersectActor(
+                        actor, p1, p2, tolerance)
+                with np.errstate(invalid='ignore'):
+                    points = p1 + t[:, np.newaxis] * (p2 - p1)
+                RayPicking.ClipIntersections(actor, points, t)
+                Update(index, t, normal)
+
+        if fallback:
+            self._PickManyWithPicker(xy, fallback, positions, normals,
+                                     factoryIds, distances)
+
+        return positions, normals, factoryIds, distances
+
+    def _GetRayQueries(self, factory, queries):
+        """Collect the actors of a factory that PickMany can intersect.
+
+        A (factory, actor) pair is added to the queries for each actor
+        that is intersected through factory.IntersectWithLines(), and a
+        (None, actor) pair for each actor that is intersected with a
+        cell locator.  False is returned if the factory or one of its
+        children must be picked with the picker instead.
+
+        """
+        actors = factory._ActorDict.get(self._Renderer, [])
+        if isinstance(actors, dict):
+            actors = list(actors.values())
+        if hasattr(factory, 'IntersectWithLines'):
+            for actor in actors:
+                if RayPicking.IsPickable(actor):
+                    queries.append((factory, actor))
+        elif type(factory).GetPickList == ActorFactory.ActorFactory.GetPickList:
+            for actor in actors:
+                if RayPicking.IsPickable(actor):
+                    if not actor.IsA('vtkActor'):
+                        return 0
+                    queries.append((None, actor))
+        else:
+            return 0
+        for child in factory.GetChildren():
+            if not self._GetRayQueries(child, queries):
+                return 0
+        return 1
+
+    def _PickManyWithPicker(self, xy, factories, positions, normals,
+                            factoryIds, distances):
+        """Pick points one at a time for the factories given."""
+        renderer = self._Renderer
+        cameraPosition = renderer.GetActiveCamera().GetPosition()
+        evt = EventHandler.Event()
+        evt.renderer = renderer
+        evt.pane = self
+        evt.picker = self._Picker
+        for i in range(len(xy)):
+            evt.x = int(round(xy[i, 0]))
+            evt.y = int(round(xy[i, 1]))
+            self._Picker.Pick(xy[i, 0], xy[i, 1], 0, renderer)
+            for bound, index, factory in self._FindPickedFactories(
+                    renderer, cameraPosition, factories):
+                if bound >= distances[i]:
+                    continue
+                for pickInfo in factory.GetPickList(evt):
+                    position = pickInfo.position
+                    d = math.sqrt(
+                        (position[0] - cameraPosition[0]) ** 2 +
+                        (position[1] - cameraPosition[1]) ** 2 +
+                        (position[2] - cameraPosition[2]) ** 2)
+                    if d < distances[i]:
+                        positions[i] = position
+                        normals[i] = pickInfo.normal or (np.nan,) * 3
+                        factoryIds[i] = index
+                        distances[i] = d
+
     #--------------------------------------
     def DoStartMotion(self, evt):
         """Generic handler for ButtonPress events.
@@ -1232,18 +1665,39 @@ class RenderPane(EventHandler.EventHandler):
         widget.ConfigureGeometry(self._Renderer.GetOrigin(),
                                  self._Renderer.GetSize())
         widget.AddToRenderer(self._Renderer)
+        widget._AddDirtyListener(self)
+        self._PolledObjects = None
+        self._WidgetIndex = None
         self.Modified()
 
     def RemoveWidget(self, widget):
         """Remove a widget from the RenderPane."""
         self._Widgets.remove(widget)
         widget.RemoveFromRenderer(self._Renderer)
+        widget._RemoveDirtyListener(self)
+        self._PolledObjects = None
+        self._WidgetIndex = None
         self.Modified()
 
     def GetWidgets(self):
         """Get a list of all widgets."""
         return self._Widgets
 
+    def _InvalidateWidgetIndex(self):
+        # called by a widget when its geometry changes
+        self._WidgetIndex = None
+
+    def _FindWidget(self, evt):
+        # find the widget under the mouse, or None
+        if not self._Widgets:
+            return None
+        if self._WidgetIndex is None:
+            self._WidgetIndex = SpatialIndex.GridIndex()
+            self._WidgetIndex.Build(
+                [(w, SpatialIndex.GetWidgetRect(w)) for w in self._Widgets])
+        return self._WidgetIndex.Find(evt.x, evt.y,
+                                      lambda w: w.IsInWidget(evt))
+
     #--------------------------------------
     def ConnectActorFactory(self, actorFactory):
         """Connect an ActorFactory to this RenderPane.
@@ -1256,6 +1710,10 @@ class RenderPane(EventHandler.EventHandler):
         """
         self._ActorFactories.append(actorFactory)
         actorFactory.AddToRenderer(self._Renderer)
+        actorFactory._AddDirtyListener(self)
+        if self._RenderQuality != actorFactory.GetRenderQuality():
+            actorFactory.SetRenderQuality(self._RenderQuality)
+        self._PolledObjects = None
         self.Modified()
 
     def DisconnectActorFactory(self, actorFactory):
@@ -1266,12 +1724,25 @@ class RenderPane(EventHandler.EventHandler):
         actorFactory.RemoveFromRenderer(self._Renderer)
         if actorFactory in self._ActorFactories:
             self._ActorFactories.remove(actorFactory)
+            if actorFactory not in self._ActorFactories:
+                actorFactory._RemoveDirtyListener(self)
+            self._PolledObjects = None
             self.Modified()
 
     def GetActorFactories(self):
         """Get a list of all connected ActorFactories."""
         return self._ActorFactories
 
+    #--------------------------------------
+    def SetRenderQuality(self, quality):
+        """Set the rendering quality, where 1.0 is full quality."""
+        self._RenderQuality = quality
+        for actorFactory in self._ActorFactories:
+            actorFactory.SetRenderQuality(quality)
+
+    def GetRenderQuality(self):
+        return self._RenderQuality
+
     #--------------------------------------
     def GetCurrentActor(self):
         """Get the current vtkActor."""
@@ -1285,6 +1756,93 @@ class RenderPane(EventHandler.EventHandler):
     def Modified(self):
         """Update the timestamp."""
         self._MTime.Modified()
+        self._Dirty = 1
+        self._SceneStamp = self._SceneStamp + 1
+
+    def _MarkDirty(self):
+        """Called when a connected factory or widget is modified."""
+        self._Dirty = 1
+        self._SceneStamp = self._SceneStamp + 1
+
+    def _InvalidatePolling(self):
+        """Called when the hierarchy of a connected factory changes."""
+        self._PolledObjects = None
+        self._SceneStamp = self._SceneStamp + 1
+
+    def _GetWatchedObjects(self):
+        """Get the VTK objects that are observed for modifications.
+
+        Override this in derived classes that display VTK pipelines
+        directly, rather than through an ActorFactory.
+
+        """
+        return []
+
+    def _UpdateWatchedObjects(self):
+        """Observe exactly the objects returned by _GetWatchedObjects()."""
+        watched = [obj for obj in self._GetWatchedObjects() if obj is not None]
+        for obj, tag in list(self._WatchedObjects):
+            if not [o for o in watched if o is obj]:
+                self._UnwatchModified(obj)
+        for obj in watched:
+            self._WatchModified(obj)
+
+    def _WatchModified(self, obj):
+        """Mark the pane dirty whenever the VTK object *obj* is modified."""
+        if obj is None or self._FindWatched(obj) is not None:
+            return
+        tag = obj.AddObserver('ModifiedEvent', self._OnWatchedModified)
+        self._WatchedObjects.append((obj, tag))
+
+    def _UnwatchModified(self, obj):
+        """Stop watching an object passed to _WatchModified()."""
+        item = self._FindWatched(obj)
+        if item is not None:
+            obj.RemoveObserver(item[1])
+            self._WatchedObjects.remove(item)
+
+    def _FindWatched(self, obj):
+        # data objects are not hashable, so search by identity
+        for item in self._WatchedObjects:
+            if item[0] is obj:
+                return item
+        return None
+
+    def _OnWatchedModified(self, obj, event):
+        self._Dirty = 1
+        self._SceneStamp = self._SceneStamp + 1
+
+    def NeedsRender(self):
+        """Determine whether the pane must be rendered.
+
+        Modifications to the pane, its factories and its widgets are
+        pushed to the pane as they occur, so this check does not have to
+        walk the factory hierarchy the way HasChangedSince() does.  The
+        only objects that are polled are those with a HasChangedSince()
+        override that does not support the push mechanism.
+
+        """
+        if self._Dirty:
+            return 1
+        sinceMTime = self._RenderTime.GetMTime()
+        if ActorFactory.RequiresPolling(self):
+            return self.HasChangedSince(sinceMTime)
+        for obj in self._GetPolledObjects():
+            if obj.HasChangedSince(sinceMTime):
+                return 1
+        return 0
+
+    def _GetPolledObjects(self):
+        """Get the factories and widgets that must be polled."""
+        if self._PolledObjects is None:
+            polled = []
+            for factory in self._ActorFactories:
+                polled = polled + factory.GetPolledFactories()
+            for widget in self._Widgets:
+                if ActorFactory.RequiresPolling(widget):
+                    polled.append(widget)
+            self._PolledObjects = polled
+        return self._PolledObjects
 
     def onCameraModified(self, obj, evt):
         self.Modified()
@@ -1318,10 +1876,19 @@ class RenderPane(EventHandler.EventHandler):
         #return self._Renderer.GetMTime()  # JDG
         return self._RenderTime.GetMTime()
 
+    #--------------------------------------
+    def _OnStartRender(self):
+        if RenderTiming.GetRenderTimer().IsEnabled():
+            self._RenderStartTime = RenderTiming.Clock()
+        self.StartRender()
+
     #--------------------------------------
     def StartRender(self):
         """This method is called immediately before a render is performed."""
 
+        if self._CursorPosition is not None and self._CursorShownFlag:
+            self._UpdateCursor()
+
         for cursor in self._Cursors:
             if cursor.GetVisibility(self._Renderer):
                 cursor.Update(self._Renderer)
@@ -1343,6 +1910,11 @@ class RenderPane(EventHandler.EventHandler):
     def EndRender(self, obj, evt):
         """This method keeps first at end of renderpane rendering"""
         self._RenderTime.Modified()
+        self._Dirty = 0
+        if self._RenderStartTime is not None:
+            RenderTiming.GetRenderTimer().Add(
+                'renderer', self, RenderTiming.Clock() - self._RenderStartTime)
+            self._RenderStartTime = None
 
     #--------------------------------------
     def ResetView(self):
@@ -0,0 +1,370 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: RenderTiming.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+RenderTiming - optional instrumentation of the rendering pipeline
+
+  The RenderTimer collects the timings that are needed to find out
+  what makes a frame slow:
+
+    'window'   -- wall time of each PaneFrame.Render() that rendered
+    'renderer' -- time from the start to the end of each RenderPane's
+                  render, including the StartEvent callbacks
+    'callback' -- time spent in each factory's OnRenderEvent()
+    'pipeline' -- execution time of the reslice and color mapping
+                  filters for each SlicePlaneFactory input
+
+  Each timing is kept in a RollingStatistics object for the last
+  few hundred samples, under a category (listed above) and a label
+  that identifies the frame, pane or factory, e.g. 'RenderPane-2' or
+  'SlicePlane-0[1] reslice'.
+
+  Timing is off by default, and costs a single attribute lookup per
+  render and per callback while it is off.  There is one RenderTimer
+  for the whole process:
+
+    timer = RenderTiming.GetRenderTimer()
+    timer.Enable()
+    timer.SetLogInterval(10.0)   # log a summary every 10 seconds
+    ...
+    stats = timer.GetStatistics('renderer', pane)
+    print(stats.GetMean(), stats.GetPercentile(90))
+
+Derived From:
+
+  object
+
+See Also:
+
+  PaneFrame, RenderPane, SlicePlaneFactory
+
+Initialization:
+
+  RollingStatistics(*size*=200)
+
+  RenderTimer()
+
+Public Methods (RollingStatistics):
+
+  Add(*value*)                 -- add a sample, in seconds
+
+  GetCount()                   -- number of samples in the window
+
+  GetTotalCount()              -- number of samples since Reset()
+
+  GetLast(), GetMean(), GetMinimum(), GetMaximum()
+                               -- statistics of the samples in the
+                                  window, zero if there are none
+
+  GetPercentile(*p*)           -- the p'th percentile (0 to 100)
+
+  Reset()                      -- discard all samples
+
+Public Methods (RenderTimer):
+
+  Enable(), Disable(), IsEnabled()
+                               -- turn timing on or off
+
+  GetLabel(*obj*)              -- the label used for a frame, pane
+                                  or factory
+
+  Add(*category*,*obj*,*seconds*)
+                               -- add a sample, obj is an object or
+                                  a label
+
+  GetStatistics(*category*,*obj*)
+                               -- the RollingStatistics for an object
+                                  or label, or None
+
+  GetCategories(), GetLabels(*category*)
+                               -- what has been recorded so far
+
+  GetReport()                  -- a multi-line table of all timings
+
+  GetSummary()                 -- a one-line summary, for logging
+
+  SetLogInterval(*seconds*)    -- log the summary at most this often,
+                                  zero (the default) turns logging off
+
+  Reset()                      -- discard all the statistics
+
+Module Functions:
+
+  GetRenderTimer()             -- the process-wide RenderTimer
+
+  TimedCallback(*func*)        -- decorator for OnRenderEvent() methods
+                                  that records them as 'callback'
+
+  Clock()                      -- the clock used for all timings
+
+"""
+
+#======================================
+from builtins import object
+import collections
+import functools
+import logging
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# a high-resolution clock for measuring intervals
+Clock = getattr(time, 'perf_counter', time.time)
+
+#======================================
+
+
+class RollingStatistics(object):
+
+    def __init__(self, size=200):
+        self._Samples = collections.deque(maxlen=size)
+        self._TotalCount = 0
+
+    def Add(self, value):
+        self._Samples.append(value)
+        self._TotalCount = self._TotalCount + 1
+
+    def Reset(self):
+        self._Samples.clear()
+        self._TotalCount = 0
+
+    def GetCount(self):
+        return len(self._Samples)
+
+    def GetTotalCount(self):
+        return self._TotalCount
+
+    def GetLast(self):
+        if not self._Samples:
+            return 0.0
+        return self._Samples[-1]
+
+    def GetMean(self):
+        if not self._Samples:
+            return 0.0
+        return sum(self._Samples) / len(self._Samples)
+
+    def GetMinimum(self):
+        if not self._Samples:
+            return 0.0
+        return min(self._Samples)
+
+    def GetMaximum(self):
+        if not self._Samples:
+            return 0.0
+        return max(self._Samples)
+
+    def GetPercentile(self, p):
+        """Get the p'th percentile, by linear interpolation."""
+        if not self._Samples:
+            return 0.0
+        samples = sorted(self._Samples)
+        f = (len(samples) - 1) * min(max(p, 0.0), 100.0) / 100.0
+        i = int(f)
+        if i + 1 >= len(samples):
+            return samples[-1]
+        return samples[i] + (samples[i + 1] - samples[i]) * (f - i)
+
+#======================================
+
+
+class RenderTimer(object):
+
+    # the order in which categories are reported
+    Categories = ('window', 'renderer', 'callback', 'pipeline')
+
+    def __init__(self):
+        self._Enabled = 0
+        # {category: {label: RollingStatistics}}
+        self._Statistics = {}
+        # labels are assigned on first use, and numbered per class
+        self._Labels = weakref.WeakKeyDictionary()
+        self._LabelCounts = {}
+        self._LogInterval = 0.0
+        self._LastLogTime = None
+
+    def Enable(self):
+        self._Enabled = 1
+
+    def Disable(self):
+        self._Enabled = 0
+
+    def IsEnabled(self):
+        return self._Enabled
+
+    def SetLogInterval(self, seconds):
+        self._LogInterval = seconds
+        self._LastLogTime = None
+
+    def GetLogInterval(self):
+        return self._LogInterval
+
+    def GetLabel(self, obj):
+        """Get the label for a frame, pane or factory."""
+        if isinstance(obj, str):
+            return obj
+        try:
+            return self._Labels[obj]
+        except KeyError:
+            pass
+        name = obj.__class__.__name__
+        if name.endswith('Factory'):
+            name = name[0:-7]
+        count = self._LabelCounts.get(name, 0)
+        self._LabelCounts[name] = count + 1
+        label = '%s-%d' % (name, count)
+        self._Labels[obj] = label
+        return label
+
+    def Add(self, category, obj, seconds):
+        """Add a timing sample for the given object or label."""
+        label = self.GetLabel(obj)
+        table = self._Statistics.setdefault(category, {})
+        stats = table.get(label)
+        if stats is None:
+            stats = table[label] = RollingStatistics()
+        stats.Add(seconds)
+
+        # the window render is the end of a frame, a good time to log
+        if self._LogInterval and category == 'window':
+            now = Clock()
+            if self._LastLogTime is None:
+                self._LastLogTime = now
+            elif now - self._LastLogTime >= self._LogInterval:
+                self._LastLogTime = now
+                logger.info(self.GetSummary())
+
+    def GetStatistics(self, category, obj):
+        try:
+            return self._Statistics[category][self.GetLabel(obj)]
+        except KeyError:
+            return None
+
+    def GetCategories(self):
+        known = [c for c in self.Categories if c in self._Statistics]
+        return known + sorted(c for c in self._Statistics
+                              if c not in self.Categories)
+
+    def GetLabels(self, category):
+        return sorted(self._Statistics.get(category, {}))
+
+    def Reset(self):
+        self._Statistics = {}
+        self._LastLogTime = None
+
+    def GetReport(self):
+        """Get a table of all the timings, in milliseconds."""
+        lines = ['%-36s %8s %9s %9s %9s %9s' %
+                 ('(ms)', 'count', 'last', 'mean', 'p90', 'max')]
+        for category in self.GetCategories():
+            lines.append(category)
+            for label in self.GetLabels(category):
+                stats = self._Statistics[category][label]
+                lines.append('  %-34s %8d %9.3f %9.3f %9.3f %9.3f' %
+                             (label, stats.GetTotalCount(),
+                              stats.GetLast() * 1000.0,
+                              stats.GetMean() * 1000.0,
+                              stats.GetPercentile(90) * 1000.0,
+                              stats.GetMaximum() * 1000.0))
+        return '\n'.join(lines)
+
+    def GetSummary(self, n=3):
+        """Get the mean window time and the n slowest contributors."""
+        parts = []
+        for label in self.GetLabels('window'):
+            stats = self._Statistics['window'][label]
+            parts.append('%s %.1f ms' % (label, stats.GetMean() * 1000.0))
+        slowest = []
+        for category in self.GetCategories():
+            if category == 'window':
+                continue
+            for label, stats in self._Statistics[category].items():
+                slowest.append((stats.GetMean(), label))
+        slowest.sort(reverse=True)
+        if slowest:
+            parts.append('slowest: ' + ', '.join(
+                '%s %.1f ms' % (label, mean * 1000.0)
+                for mean, label in slowest[0:n]))
+        return 'render timing: ' + '; '.join(parts)
+
+#======================================
+
+_RenderTimer = RenderTimer()
+
+
+def GetRenderTimer():
+    """Get the RenderTimer that is shared by the whole process."""
+    return _RenderTimer
+
+
+def TimedCallback(func):
+    """Record the time spent in an OnRenderEvent() method."""
+    name = '.' + func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kw):
+        timer = _RenderTimer
+        if not timer._Enabled:
+            return func(self, *args, **kw)
+        start = Clock()
+        try:
+            return func(self, *args, **kw)
+        finally:
+            timer.Add('callback', timer.GetLabel(self) + name,
+                      Clock() - start)
+    return wrapper
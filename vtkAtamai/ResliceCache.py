@@ -0,0 +1,214 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: ResliceCache.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+ResliceCache - remember recently resliced images
+
+  Scrubbing back and forth through a volume reslices the same few
+  positions over and over.  The ResliceCache is a least-recently-used
+  cache of reslice outputs that is limited by memory rather than by
+  the number of images.  The SlicePlaneFactory stores a copy of each
+  slice it reslices, keyed by everything that the slice depends on
+  (the input and its MTime, the reslice matrix, the output geometry,
+  the slab settings and the interpolation mode), and displays the
+  stored copy instead of reslicing when the slice is revisited.
+
+  There is one cache for the whole process, so the memory limit holds
+  for all of the factories together:
+
+    cache = ResliceCache.GetResliceCache()
+    cache.SetMemoryLimit(256*1024)
+    print(cache.GetHitRate())
+
+Derived From:
+
+  object
+
+See Also:
+
+  SlicePlaneFactory, PickCache
+
+Initialization:
+
+  ResliceCache(*limit*=65536)
+
+Public Methods:
+
+  Get(*key*)                   -- get the stored vtkImageData, or None
+
+  Contains(*key*)              -- true if an image is stored for key,
+                                  this is not counted as a hit or miss
+
+  Add(*key*,*image*)           -- store an image, the least recently
+                                  used images are discarded until the
+                                  cache is within its memory limit
+
+  SetMemoryLimit(*limit*)      -- the memory limit in kilobytes, zero
+                                  disables the cache
+  GetMemoryLimit()
+
+  GetMemorySize()              -- the kilobytes used by the images
+
+  GetNumberOfItems()           -- the number of images in the cache
+
+  GetNumberOfHits()            -- the number of Get() calls that found
+  GetNumberOfMisses()             an image, and that did not
+
+  GetHitRate()                 -- the fraction of Get() calls that
+                                  found an image
+
+  ResetStatistics()            -- set the hit and miss counts to zero
+
+  Clear()                      -- discard all images
+
+Module Functions:
+
+  GetResliceCache()            -- the cache shared by the process
+
+"""
+
+#======================================
+from builtins import object
+import collections
+
+#======================================
+
+# the default memory limit, in kilobytes
+_MemoryLimit = 65536
+
+
+class ResliceCache(object):
+
+    def __init__(self, limit=_MemoryLimit):
+        self._MemoryLimit = limit
+        self._MemorySize = 0
+        # key -> (size, image), least recently used first
+        self._Items = collections.OrderedDict()
+        self.ResetStatistics()
+
+    def Get(self, key):
+        item = self._Items.pop(key, None)
+        if item is None:
+            self._Misses = self._Misses + 1
+            return None
+        # re-insert to make this the most recently used
+        self._Items[key] = item
+        self._Hits = self._Hits + 1
+        return item[1]
+
+    def Contains(self, key):
+        return key in self._Items
+
+    def Add(self, key, image):
+        self._Discard(key)
+        size = image.GetActualMemorySize()
+        if size > self._MemoryLimit:
+            return
+        self._Items[key] = (size, image)
+        self._MemorySize = self._MemorySize + size
+        self._Prune()
+
+    def _Discard(self, key):
+        item = self._Items.pop(key, None)
+        if item is not None:
+            self._MemorySize = self._MemorySize - item[0]
+
+    def _Prune(self):
+        while self._MemorySize > self._MemoryLimit:
+            size, image = self._Items.popitem(last=False)[1]
+            self._MemorySize = self._MemorySize - size
+
+    def SetMemoryLimit(self, limit):
+        self._MemoryLimit = limit
+        self._Prune()
+
+    def GetMemoryLimit(self):
+        return self._MemoryLimit
+
+    def GetMemorySize(self):
+        return self._MemorySize
+
+    def GetNumberOfItems(self):
+        return len(self._Items)
+
+    def GetNumberOfHits(self):
+        return self._Hits
+
+    def GetNumberOfMisses(self):
+        return self._Misses
+
+    def GetHitRate(self):
+        total = self._Hits + self._Misses
+        if total == 0:
+            return 0.0
+        return float(self._Hits) / total
+
+    def ResetStatistics(self):
+        self._Hits = 0
+        self._Misses = 0
+
+    def Clear(self):
+        self._Items.clear()
+        self._MemorySize = 0
+
+
+_ResliceCache = ResliceCache()
+
+
+def GetResliceCache():
+    """Get the ResliceCache that is shared by the process."""
+    return _ResliceCache
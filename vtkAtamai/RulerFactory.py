@@ -120,6 +120,7 @@ To Do:
 from .ActorFactory import *
 from .ConeMarkerFactory import *
 from .SphereMarkFactory import *
+from . import RenderTiming
 import math
 
 
@@ -222,16 +223,25 @@ class RulerFactory(ActorFactory):
             print("Warning: No Slice Planes have been set for RulerFactory.")
             return
 
-        picker = event.picker
-        picker.Pick(event.x,
-                    event.y,
-                    0.0,
-                    event.renderer)
-
         position = None
-        for plane in self._Planes:
-            if picker.GetActor() in plane.GetActors(event.renderer):
-                position = picker.GetPickPosition()
+        if hasattr(event, 'pane'):
+            # the pane caches its picks, so the same position is not
+            # picked again unless the scene has changed
+            picklist = event.pane.DoSmartPick(event, nearest=1)
+            if picklist:
+                for plane in self._Planes:
+                    if picklist[0].actor in plane.GetActors(event.renderer):
+                        position = picklist[0].position
+        else:
+            picker = event.picker
+            picker.Pick(event.x,
+                        event.y,
+                        0.0,
+                        event.renderer)
+
+            for plane in self._Planes:
+                if picker.GetActor() in plane.GetActors(event.renderer):
+                    position = picker.GetPickPosition()
 
         if (position == None):
             return
@@ -376,6 +386,7 @@ class RulerFactory(ActorFactory):
         self.PutAsideRuler(renderer)
         renderer.AddObserver('StartEvent', self.OnRenderEvent)
 
+    @RenderTiming.TimedCallback
     def OnRenderEvent(self, renderer, event):
         # Update scale for cones
         matrix = self._Transform.GetMatrix()
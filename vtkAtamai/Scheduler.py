@@ -0,0 +1,217 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: Scheduler.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+"""
+Scheduler - a priority queue of timed callbacks
+
+  The Scheduler keeps the callbacks registered with
+  PaneFrame.ScheduleOnce() and PaneFrame.ScheduleEvery() in a heap
+  ordered by deadline, so that the GUI toolkit only has to arm a
+  single timer for the earliest deadline instead of polling.
+
+  Periodic callbacks are rescheduled relative to their previous
+  deadline rather than to the time at which they actually ran, so
+  they do not drift.  If the scheduler falls behind by more than one
+  period, the missed calls are skipped rather than run back-to-back.
+
+  UnSchedule() only marks the entry as cancelled, the entry is
+  discarded when it reaches the top of the heap.
+
+Derived From:
+
+  object
+
+See Also:
+
+  PaneFrame
+
+Initialization:
+
+  Scheduler()
+
+Public Methods:
+
+  Add(*id*,*ms*,*func*,*period*=0)
+                               -- call func after ms milliseconds, and
+                                  every period milliseconds after that
+                                  if period is greater than zero
+
+  Remove(*id*)                 -- cancel a callback
+
+  RunDue()                     -- call every callback whose deadline
+                                  has passed, returns the number called
+
+  GetTimeout()                 -- milliseconds until the next deadline,
+                                  or None if nothing is scheduled
+
+  SetDeadlineCallback(*func*)  -- func() is called whenever a callback
+                                  is added with an earlier deadline than
+                                  all the others, so that the timer can
+                                  be re-armed
+
+  GetNumberOfScheduled()       -- number of active callbacks
+
+"""
+
+#======================================
+from builtins import object
+import heapq
+import math
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# a clock that isn't affected by changes to the system time
+_Clock = getattr(time, 'monotonic', time.time)
+
+#======================================
+
+
+class Scheduler(object):
+
+    def __init__(self):
+        # heap of [deadline, sequence, id, func, period], times in seconds
+        self._Heap = []
+        # map from id to heap entry
+        self._Entries = {}
+        # sequence number that keeps the heap order stable for ties
+        self._Sequence = 0
+        self._DeadlineCallback = None
+
+    def SetDeadlineCallback(self, func):
+        self._DeadlineCallback = func
+
+    def GetDeadlineCallback(self):
+        return self._DeadlineCallback
+
+    def GetNumberOfScheduled(self):
+        return len(self._Entries)
+
+    def Add(self, id, millisecs, func, period=0):
+        """Schedule func to be called after millisecs (and every period)."""
+        self.Remove(id)
+        self._Sequence = self._Sequence + 1
+        entry = [_Clock() + millisecs / 1000.0, self._Sequence, id, func,
+                 period / 1000.0]
+        self._Entries[id] = entry
+        heapq.heappush(self._Heap, entry)
+        if self._Heap[0] is entry and self._DeadlineCallback:
+            self._DeadlineCallback()
+        return id
+
+    def Remove(self, id):
+        """Cancel a callback, unknown ids are ignored."""
+        entry = self._Entries.pop(id, None)
+        if entry is not None:
+            entry[3] = None
+
+    def _Prune(self):
+        # discard cancelled entries from the top of the heap
+        heap = self._Heap
+        while heap and heap[0][3] is None:
+            heapq.heappop(heap)
+
+    def GetTimeout(self):
+        """Get the milliseconds until the next deadline, or None."""
+        self._Prune()
+        if not self._Heap:
+            return None
+        return max(0.0, (self._Heap[0][0] - _Clock()) * 1000.0)
+
+    def RunDue(self):
+        """Call all the callbacks whose deadlines have passed."""
+        now = _Clock()
+        heap = self._Heap
+
+        # collect everything that is due before calling anything, so
+        # that callbacks that reschedule themselves can't starve us
+        due = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if entry[3] is None:
+                continue
+            due.append(entry)
+            period = entry[4]
+            if period > 0:
+                deadline = entry[0] + period
+                if deadline <= now:
+                    deadline = deadline + \
+                        period * (math.floor((now - deadline) / period) + 1)
+                entry[0] = deadline
+                self._Sequence = self._Sequence + 1
+                entry[1] = self._Sequence
+
+        for entry in due:
+            if entry[4] > 0:
+                heapq.heappush(heap, entry)
+
+        count = 0
+        for entry in due:
+            # skip callbacks that were cancelled by an earlier callback
+            func = entry[3]
+            if func is None:
+                continue
+            if entry[4] <= 0:
+                del self._Entries[entry[2]]
+                entry[3] = None
+            try:
+                func()
+            except Exception:
+                logger.exception("Scheduler: scheduled callback failed")
+            count = count + 1
+
+        return count
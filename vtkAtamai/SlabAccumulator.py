@@ -0,0 +1,263 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: SlabAccumulator.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+SlabAccumulator - a thick slab as a sliding window of thin slices
+
+  Scrolling a thick slab by one slice changes only the two slices at
+  its ends, so the SlabAccumulator keeps the thin slices of the slab
+  and updates the blended result when slices enter at one end and
+  leave at the other.  The cost of each step depends on the number of
+  slices that enter, not on the thickness of the slab:
+
+    VTK_IMAGE_SLAB_MEAN, VTK_IMAGE_SLAB_SUM -- a running sum, the
+        slices that leave are subtracted and the slices that enter
+        are added, and the sum is recomputed once per window length
+        so that rounding errors do not build up
+
+    VTK_IMAGE_SLAB_MAX, VTK_IMAGE_SLAB_MIN -- the window is split into
+        two blocks, the slices that will leave first (with the maximum
+        of each suffix of the block) and the slices that have entered
+        since the block was built (with their running maximum), and
+        the block is rebuilt when it is used up, or when the direction
+        of scrolling is reversed
+
+  The slices are numpy arrays of the same shape, in order along the
+  slab normal.  The SlicePlaneFactory uses a SlabAccumulator for each
+  of its inputs when the slab thickness of its vtkImageSlabReslice is
+  set, see SlicePlaneFactory.SetIncrementalSlab().
+
+Derived From:
+
+  object
+
+See Also:
+
+  SlicePlaneFactory
+
+Initialization:
+
+  SlabAccumulator(*mode*=vtk.VTK_IMAGE_SLAB_MEAN)
+
+Public Methods:
+
+  SetBlendMode(*mode*)         -- min, max, mean or sum, this resets
+  GetBlendMode()                  the accumulator
+
+  SetTrapezoidIntegration(*flag*) -- for mean and sum, give the slices
+  GetTrapezoidIntegration()          at the ends half the weight
+
+  Reset(*slices*)              -- start again with these slices
+
+  Shift(*slices*,*forward*=1)  -- add the slices at the leading end of
+                                  the window (in the order in which they
+                                  enter) and remove as many slices from
+                                  the trailing end, the leading end is
+                                  the last slice if forward is true, and
+                                  the first slice if it is false
+
+  GetNumberOfSlices()          -- the number of slices in the window
+
+  GetResult()                  -- the blended slices, as float64 for
+                                  mean and sum
+
+"""
+
+#======================================
+from builtins import range
+from builtins import object
+import collections
+import numpy as np
+import vtk
+
+#======================================
+
+
+class SlabAccumulator(object):
+
+    def __init__(self, mode=vtk.VTK_IMAGE_SLAB_MEAN):
+        self._BlendMode = mode
+        self._TrapezoidIntegration = 0
+        self.Reset([])
+
+    def SetBlendMode(self, mode):
+        self._BlendMode = mode
+        self.Reset([])
+
+    def GetBlendMode(self):
+        return self._BlendMode
+
+    def SetTrapezoidIntegration(self, flag):
+        self._TrapezoidIntegration = flag
+
+    def GetTrapezoidIntegration(self):
+        return self._TrapezoidIntegration
+
+    def GetNumberOfSlices(self):
+        return len(self._Slices)
+
+    def Reset(self, slices):
+        # the window, in order along the slab normal
+        self._Slices = collections.deque(slices)
+        self._Forward = 1
+        if self._BlendMode in (vtk.VTK_IMAGE_SLAB_MEAN,
+                               vtk.VTK_IMAGE_SLAB_SUM):
+            self._Resum()
+        else:
+            self._Rebuild()
+
+    def Shift(self, slices, forward=1):
+        n = len(self._Slices)
+        if len(slices) >= n:
+            # nothing is left of the old window
+            slices = list(slices)[len(slices) - n:]
+            if not forward:
+                slices.reverse()
+            self.Reset(slices)
+            return
+        if self._BlendMode in (vtk.VTK_IMAGE_SLAB_MEAN,
+                               vtk.VTK_IMAGE_SLAB_SUM):
+            self._ShiftSum(slices, forward)
+        else:
+            self._ShiftExtreme(slices, forward)
+
+    def GetResult(self):
+        slices = self._Slices
+        if self._BlendMode in (vtk.VTK_IMAGE_SLAB_MEAN,
+                               vtk.VTK_IMAGE_SLAB_SUM):
+            n = len(slices)
+            result = self._Sum
+            if self._TrapezoidIntegration and n > 1:
+                result = result - 0.5 * (slices[0] + slices[-1])
+                n = n - 1
+            if self._BlendMode == vtk.VTK_IMAGE_SLAB_MEAN:
+                result = result / n
+            return result
+        if self._Next < len(self._Suffix):
+            if self._Entering is None:
+                return self._Suffix[self._Next]
+            return self._Combine(self._Suffix[self._Next], self._Entering)
+        return self._Entering
+
+    #--------------------------------------
+    # mean and sum
+
+    def _Resum(self):
+        self._Steps = 0
+        self._Sum = None
+        for s in self._Slices:
+            if self._Sum is None:
+                self._Sum = s.astype(np.float64)
+            else:
+                self._Sum += s
+
+    def _ShiftSum(self, slices, forward):
+        for s in slices:
+            if forward:
+                self._Sum -= self._Slices.popleft()
+                self._Slices.append(s)
+            else:
+                self._Sum -= self._Slices.pop()
+                self._Slices.appendleft(s)
+            self._Sum += s
+        self._Steps = self._Steps + len(slices)
+        if self._Steps >= len(self._Slices):
+            self._Resum()
+
+    #--------------------------------------
+    # max and min
+
+    def _Combine(self, a, b):
+        if self._BlendMode == vtk.VTK_IMAGE_SLAB_MIN:
+            return np.minimum(a, b)
+        return np.maximum(a, b)
+
+    def _Rebuild(self):
+        # the suffix blends of the window in the order that the slices
+        # will leave, which is the first slice first when scrolling
+        # forward
+        items = list(self._Slices)
+        if not self._Forward:
+            items.reverse()
+        suffix = [None] * len(items)
+        for i in range(len(items) - 1, -1, -1):
+            if i == len(items) - 1:
+                suffix[i] = items[i]
+            else:
+                suffix[i] = self._Combine(items[i], suffix[i + 1])
+        self._Suffix = suffix
+        self._Next = 0
+        self._Entering = None
+
+    def _ShiftExtreme(self, slices, forward):
+        if (forward and 1 or 0) != self._Forward:
+            self._Forward = forward and 1 or 0
+            self._Rebuild()
+        for s in slices:
+            if self._Next >= len(self._Suffix):
+                self._Rebuild()
+            self._Next = self._Next + 1
+            if forward:
+                self._Slices.popleft()
+                self._Slices.append(s)
+            else:
+                self._Slices.pop()
+                self._Slices.appendleft(s)
+            if self._Entering is None:
+                self._Entering = s
+            else:
+                self._Entering = self._Combine(self._Entering, s)
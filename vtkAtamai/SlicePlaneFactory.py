@@ -41,6 +41,7 @@ from __future__ import absolute_import
 
 from builtins import map
 from builtins import range
+from builtins import object
 from past.utils import old_div
 __rcs_info__ = {
     #
@@ -183,25 +184,319 @@ Public Methods:
                              line defined by endpoints p1,p2 intersects
                              the plane
 
+    IntersectWithLines(p1,p2) -- for (N,3) arrays of segment endpoints,
+                             return the parametric position where each
+                             segment crosses the area of the plane, or
+                             NaN if it misses (see RayPicking)
+
   Get the implicit function for the slice:
 
     GetPlaneEquation() -- a vtkPlane for e.g. slicing polydata
 
+  While the render quality is below 1.0 (see LODController), the
+  slices are resampled with nearest-neighbor interpolation.  In
+  progressive mode (the default), the slices are also resampled at a
+  coarser spacing while the quality is 0.25 or less, so that the number
+  of pixels is roughly proportional to the quality.  The refinement
+  render after a drag ends or pauses is done at full resolution:
+
+    SetProgressiveReslice(*boolean*) -- coarse reslicing at low quality
+
+  If RenderTiming is enabled, the execution times of the reslice and
+  color mapping filters for each input are recorded as 'pipeline'.
+
+  The threading of the reslice and color mapping filters is set with
+  the factory's ThreadSettings, which take their defaults from the
+  process-wide ThreadSettings:
+
+    GetThreadSettings() -- e.g. GetThreadSettings().SetNumberOfThreads(8)
+
+  Each slice that is resliced is stored in the shared ResliceCache,
+  and when a slice position is revisited, e.g. while scrubbing with
+  Push() or SetSliceIndex(), the stored slice is color mapped instead
+  of reslicing again.  Slices are not cached while a nonlinear
+  ImageTransform is set.
+
+  While the slice is being pushed, the next few slices in the same
+  direction are resliced in the background by the SlicePrefetcher.
+
+  Thick slabs are set with the SlabThickness and BlendMode of the
+  vtkImageSlabReslice from GetImageReslice().  By default, a thick slab
+  is computed from thin slices spaced by the SlabResolution, which are
+  kept in a SlabAccumulator, so that when the plane is pushed by a
+  whole number of slices only the slices that enter the slab have to
+  be resliced.  The cost of scrolling is then independent of the slab
+  thickness:
+
+    SetIncrementalSlab(*boolean*) -- sliding-window slabs (default on)
+
 """
 
 #======================================
 from . import ActorFactory
 from . import OutlineFactory
+from . import RenderTiming
+from . import RayPicking
+from . import ResliceCache
+from . import SlabAccumulator
+from . import SlicePrefetcher
+from . import ThreadSettings
 import math
+import numpy as np
 import vtk
+from vtk.util import numpy_support
 import logging
 
 logger = logging.getLogger(__name__)
 #======================================
 
 
+def _Quantize(values, tolerance):
+    # round values to a multiple of tolerance, for use in a key
+    return tuple([int(round(old_div(v, tolerance))) for v in values])
+
+
+def _MatrixKey(matrix, tolerance):
+    # a key for a 4x4 matrix, positions are rounded to tolerance and
+    # the other elements to 1e-9
+    elements = []
+    for i in range(4):
+        for j in range(4):
+            if j == 3 and i < 3:
+                elements.append(round(old_div(matrix.GetElement(i, j),
+                                              tolerance)))
+            else:
+                elements.append(round(matrix.GetElement(i, j) * 1e9))
+    return tuple([int(e) for e in elements])
+
+
+# the settings of a reslice filter that affect its output, other than
+# the transform and the output origin that are set for each slice, the
+# SlabMode and SlabNumberOfSlices that vtkImageSlabReslice sets, and the
+# OutputDirection, of which Python only gets the first row
+_ResliceSettings = ('OutputSpacing', 'OutputExtent', 'OutputScalarType',
+                    'OutputDimensionality',
+                    'BackgroundColor', 'InterpolationMode',
+                    'Wrap', 'Mirror', 'Border', 'BorderThickness',
+                    'ScalarShift', 'ScalarScale', 'TransformInputSampling',
+                    'AutoCropOutput', 'SlabThickness', 'BlendMode',
+                    'SlabResolution', 'SlabTrapezoidIntegration',
+                    'SlabSliceSpacingFraction')
+
+
+def _GetResliceSettings(reslice):
+    # the (name, value) of each setting that this VTK version has
+    settings = []
+    for name in _ResliceSettings:
+        method = getattr(reslice, 'Get' + name, None)
+        if method is not None:
+            settings.append((name, method()))
+    return tuple(settings)
+
+
+# the settings that the thin slices of an _IncrementalSlab do not share
+# with the slab, the rescaling is applied after the slices are blended
+_ThickSliceSettings = ('OutputSpacing', 'OutputExtent',
+                       'OutputDimensionality', 'AutoCropOutput',
+                       'ScalarShift', 'ScalarScale', 'SlabThickness',
+                       'BlendMode', 'SlabResolution',
+                       'SlabTrapezoidIntegration',
+                       'SlabSliceSpacingFraction')
+
+
+def _SetResliceSettings(reslice, settings):
+    # apply settings from _GetResliceSettings() to another reslice filter
+    for name, value in settings:
+        method = getattr(reslice, 'Set' + name, None)
+        if method is not None:
+            method(value)
+
+
+def _GetResliceExtras(reslice, tolerance):
+    # a key for the stencil, the reslice axes, the interpolator and the
+    # output direction of a reslice filter, or None if they are not set
+    # or are at their defaults, the direction is read from the output
+    # information so it is only current after UpdateInformation()
+    stencil = None
+    if reslice.GetNumberOfInputPorts() > 1 and \
+            reslice.GetNumberOfInputConnections(1):
+        producer = reslice.GetInputConnection(1, 0).GetProducer()
+        producer.UpdateInformation()
+        stencil = (producer.__this__,
+                   producer.GetExecutive().GetPipelineMTime())
+    axes = reslice.GetResliceAxes()
+    if axes is not None:
+        axes = _MatrixKey(axes, tolerance)
+    interpolator = None
+    if hasattr(reslice, 'GetInterpolator'):
+        interpolator = reslice.GetInterpolator()
+        # the default interpolator is set up from the InterpolationMode
+        if interpolator.IsA('vtkImageInterpolator'):
+            interpolator = None
+        else:
+            interpolator = (interpolator.__this__, interpolator.GetMTime())
+    direction = None
+    info = reslice.GetOutputInformation(0)
+    if info.Has(vtk.vtkDataObject.DIRECTION()):
+        direction = info.Get(vtk.vtkDataObject.DIRECTION())
+        if direction == (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0):
+            direction = None
+    if (stencil is None and axes is None and interpolator is None and
+            direction is None):
+        return None
+    return (stencil, axes, interpolator, direction)
+
+
+
+class _SliceJob(object):
+    # reslice one slice on a worker thread, with a reslice filter of its
+    # own that is set up like the one in the SlicePlaneFactory
+
+    def __init__(self, input, matrix, origin, settings):
+        self._Input = input
+        self._Matrix = matrix
+        self._Origin = origin
+        self._Settings = settings
+
+    def __call__(self):
+        transform = vtk.vtkTransform()
+        transform.SetMatrix(self._Matrix)
+
+        reslice = vtk.vtkImageSlabReslice()
+        reslice.SetInputData(self._Input)
+        reslice.SetResliceTransform(transform)
+        _SetResliceSettings(reslice, self._Settings)
+        reslice.SetOutputOrigin(self._Origin)
+        reslice.SetOptimization(2)
+        reslice.Update()
+
+        image = vtk.vtkImageData()
+        image.ShallowCopy(reslice.GetOutput())
+        return image
+
+
+class _IncrementalSlab(object):
+    # a thick slab that is computed from thin slices, so that when it
+    # moves along its normal by whole slices only the slices that enter
+    # the slab are resliced
+
+    def __init__(self):
+        self._Transform = vtk.vtkTransform()
+        self._Reslice = vtk.vtkImageReslice()
+        self._Reslice.SetResliceTransform(self._Transform)
+        self._Reslice.SetOptimization(2)
+        self._Accumulator = SlabAccumulator.SlabAccumulator()
+        # the geometry key and the position of slice zero
+        self._Geometry = None
+        self._Position = 0.0
+        self._HalfWidth = 0
+        self._Extent = None
+        # the slice at the center of the slab
+        self._Index = 0
+        self._Output = None
+
+    def GetImageReslice(self):
+        return self._Reslice
+
+    def GetOutput(self):
+        return self._Output
+
+    def Update(self, reslice, port, geometry, position, tolerance):
+        step = reslice.GetSlabResolution()
+        half = int(reslice.GetSlabThickness() / (2.0 * step))
+        index = None
+        if geometry == self._Geometry and half == self._HalfWidth:
+            x = (position - self._Position) / step
+            index = int(round(x))
+            if abs(x - index) * step > tolerance:
+                index = None
+
+        if index is None:
+            # start again with the current position as slice zero
+            self._SetUp(reslice, port, geometry, position, half)
+            index = 0
+            self._Accumulator.Reset(self._GetSlices(-half, half))
+        elif index - self._Index > 2 * half or \
+                self._Index - index > 2 * half:
+            self._Accumulator.Reset(
+                self._GetSlices(index - half, index + half))
+        elif index > self._Index:
+            self._Accumulator.Shift(
+                self._GetSlices(self._Index + half + 1, index + half), 1)
+        elif index < self._Index:
+            slices = self._GetSlices(index - half, self._Index - half - 1)
+            slices.reverse()
+            self._Accumulator.Shift(slices, 0)
+        self._Index = index
+
+        self._Output = self._MakeImage(reslice)
+
+    def _SetUp(self, reslice, port, geometry, position, half):
+        self._Geometry = geometry
+        self._Position = position
+        self._HalfWidth = half
+
+        # the thin slices are stacked along the output z axis, with the
+        # current slice at z = 0
+        thin = self._Reslice
+        thin.SetInputConnection(port)
+        self._Transform.SetMatrix(reslice.GetResliceTransform().GetMatrix())
+        spacing = reslice.GetOutputSpacing()
+        origin = reslice.GetOutputOrigin()
+        thin.SetOutputSpacing(spacing[0], spacing[1],
+                              reslice.GetSlabResolution())
+        thin.SetOutputOrigin(origin[0], origin[1], 0.0)
+        _SetResliceSettings(thin, [(key, value) for key, value in
+                                   _GetResliceSettings(reslice)
+                                   if key not in _ThickSliceSettings])
+        self._Extent = reslice.GetOutputExtent()
+
+        self._Accumulator.SetBlendMode(reslice.GetBlendMode())
+        self._Accumulator.SetTrapezoidIntegration(
+            reslice.GetSlabTrapezoidIntegration())
+
+    def _GetSlices(self, first, last):
+        # reslice the thin slices from first to last, as flat arrays
+        thin = self._Reslice
+        extent = self._Extent
+        thin.SetOutputExtent(extent[0], extent[1], extent[2], extent[3],
+                             first, last)
+        thin.Update()
+        scalars = numpy_support.vtk_to_numpy(
+            thin.GetOutput().GetPointData().GetScalars())
+        # copy, the output will be overwritten by the next slices
+        return list(scalars.reshape(last - first + 1, -1).copy())
+
+    def _MakeImage(self, reslice):
+        output = self._Reslice.GetOutput()
+        scalarType = output.GetScalarType()
+        components = output.GetNumberOfScalarComponents()
+        dtype = np.dtype(numpy_support.get_numpy_array_type(scalarType))
+        result = self._Accumulator.GetResult()
+        shift = reslice.GetScalarShift()
+        scale = reslice.GetScalarScale()
+        if shift != 0.0 or scale != 1.0:
+            result = (result + shift) * scale
+        if result.dtype != dtype:
+            if dtype.kind in 'iu':
+                info = np.iinfo(dtype)
+                result = np.clip(np.rint(result), info.min, info.max)
+            result = result.astype(dtype)
+
+        image = vtk.vtkImageData()
+        image.SetExtent(self._Extent)
+        image.SetSpacing(reslice.GetOutputSpacing())
+        image.SetOrigin(reslice.GetOutputOrigin())
+        image.GetPointData().SetScalars(numpy_support.numpy_to_vtk(
+            result.reshape(-1, components), deep=1, array_type=scalarType))
+        return image
+
+
 class SlicePlaneFactory(ActorFactory.ActorFactory):
 
+    # inputs and lookup tables are watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self):
 
         ActorFactory.ActorFactory.__init__(self)
@@ -220,7 +515,25 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         self._ImagePreClips = {}
         self._ImagePostClips = {}
         self._ImageMapToColors = {}
+        self._ThreadSettings = ThreadSettings.ThreadSettings(
+            ThreadSettings.GetThreadSettings())
         self._ClippingPlanes = {}
+        # the ResliceCache key of the current slice, and the cached
+        # image that is being displayed instead of the reslice output
+        self._ResliceKeys = {}
+        self._CachedSlices = {}
+        # the input pipeline MTime when each input was last resliced
+        self._ResliceInputMTimes = {}
+        # the input pipeline MTime and lookup table that the color
+        # format of each input was chosen for, see OnExecuteInformation()
+        self._ColorFormatKeys = {}
+        # for predicting the next slices, see Push()
+        self._LastPushTime = None
+        # the sliding-window slab for each input, see _UpdateSlab()
+        self._Slabs = {}
+
+        # renderer -> StartEvent observer tag, see OnRenderEvent()
+        self._RendererObservers = {}
 
         self._PushColor = [1.0, 1.0, 0.0]
         self._RotateColor = [1.0, 0.0, 1.0]
@@ -240,6 +553,8 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
 
         self._SliceInterpolate = 1
         self._TextureInterpolate = 1
+        self._ProgressiveReslice = 1
+        self._IncrementalSlab = 1
 
         self._DisablePushAction = 0
         self._RestrictPlaneToVolume = 0
@@ -274,6 +589,245 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         del(self._Plane)
         del(self._ResliceAxes)
 
+    def AddToRenderer(self, renderer):
+        ActorFactory.ActorFactory.AddToRenderer(self, renderer)
+        self._RendererObservers[renderer] = \
+            renderer.AddObserver('StartEvent', self.OnRenderEvent)
+
+    def RemoveFromRenderer(self, renderer):
+        if renderer in self._RendererObservers:
+            renderer.RemoveObserver(self._RendererObservers[renderer])
+            del self._RendererObservers[renderer]
+        ActorFactory.ActorFactory.RemoveFromRenderer(self, renderer)
+
+    def OnRenderEvent(self, renderer, event):
+        # before the pipeline is updated, check the color formats and
+        # check for cached slices
+        SlicePrefetcher.GetSlicePrefetcher().Collect()
+        for name in self._Inputs:
+            self.OnExecuteInformation(self._ImageMapToColors[name])
+            if not self._UpdateSlab(name):
+                self._UpdateCachedSlice(name)
+
+    def _GetResliceKey(self, name, update=0, axes=None, origin=None):
+        # get the ResliceCache key for the current slice of input `name`,
+        # or for the slice with the given reslice axes and output origin,
+        # or None if the slice cannot be cached
+        reslice = self._ImageReslicers[name]
+        transform = reslice.GetResliceTransform()
+        if transform is not None and \
+                not transform.IsA('vtkHomogeneousTransform'):
+            return None
+
+        # the pipeline MTime of the input covers all upstream changes,
+        # but it is only current after UpdateInformation()
+        port = self._Inputs[name]
+        producer = port.GetProducer()
+        if update:
+            reslice.UpdateInformation()
+
+        if axes is None:
+            axes = self._ResliceAxes
+        if origin is None:
+            origin = reslice.GetOutputOrigin()
+
+        # positions only have to match to a millionth of a pixel, so that
+        # a slice gets the same key however the plane was moved there
+        spacing = reslice.GetOutputSpacing()
+        tolerance = 1e-6 * min([abs(x) for x in spacing]) or 1e-9
+
+        imageTransform = self._ImageTransforms.get(name)
+        if imageTransform is not None:
+            imageTransform = (imageTransform.__this__,
+                              imageTransform.GetMTime())
+
+        return (producer.__this__, port.GetIndex(),
+                producer.GetExecutive().GetPipelineMTime(),
+                transform and transform.__this__, imageTransform,
+                _MatrixKey(self._Transform.GetMatrix(), tolerance),
+                _MatrixKey(axes, tolerance),
+                _Quantize(origin, tolerance),
+                _GetResliceSettings(reslice),
+                _GetResliceExtras(reslice, tolerance))
+
+    def _UpdateCachedSlice(self, name):
+        # if the current slice is in the cache, color map the cached
+        # image, otherwise color map the output of the reslice filter
+        key = self._GetResliceKey(name, update=1)
+        if key is not None and key == self._ResliceKeys.get(name):
+            return
+        self._ResliceKeys[name] = key
+
+        image = None
+        if key is not None:
+            image = ResliceCache.GetResliceCache().Get(key)
+
+        colors = self._ImageMapToColors[name]
+        if image is not None:
+            SlicePrefetcher.GetSlicePrefetcher().Used(key)
+            # VTK-6
+            if vtk.vtkVersion().GetVTKMajorVersion() > 5:
+                colors.SetInputData(image)
+            else:
+                colors.SetInput(image)
+        elif self._CachedSlices.get(name) is not None:
+            colors.SetInputConnection(
+                self._ImageReslicers[name].GetOutputPort())
+        self._CachedSlices[name] = image
+
+    def _UseIncrementalSlab(self, name):
+        # whether input `name` is a thick slab that can be computed by
+        # sliding a window of thin slices
+        reslice = self._ImageReslicers[name]
+        transform = reslice.GetResliceTransform()
+        step = reslice.GetSlabResolution()
+        return (self._IncrementalSlab and
+                vtk.vtkVersion().GetVTKMajorVersion() > 5 and
+                transform is not None and
+                transform.IsA('vtkLinearTransform') and
+                step > 0 and reslice.GetSlabThickness() >= 2 * step and
+                _GetResliceExtras(reslice, 1.0) is None)
+
+    def _UpdateSlab(self, name):
+        # color map the sliding-window slab for input `name`, or return
+        # false if the slab (if any) must come from the reslice filter
+        self._ImageReslicers[name].UpdateInformation()
+        if not self._UseIncrementalSlab(name):
+            if self._Slabs.pop(name, None) is not None:
+                # make _UpdateCachedSlice() reconnect the reslice filter
+                self._ResliceKeys.pop(name, None)
+            return 0
+
+        key = self._GetResliceKey(name, update=1)
+        slab = self._Slabs.get(name)
+        if slab is not None and key == self._ResliceKeys.get(name):
+            return 1
+        self._ResliceKeys[name] = key
+
+        # the slab geometry, apart from the position along the normal
+        axes = vtk.vtkMatrix4x4()
+        axes.DeepCopy(self._ResliceAxes)
+        position = 0.0
+        for i in range(3):
+            position = position + \
+                axes.GetElement(i, 3) * axes.GetElement(i, 2)
+            axes.SetElement(i, 3, 0.0)
+        reslice = self._ImageReslicers[name]
+        spacing = reslice.GetOutputSpacing()
+        tolerance = 1e-6 * min([abs(x) for x in spacing]) or 1e-9
+        geometry = key[0:6] + (_MatrixKey(axes, tolerance),) + key[7:]
+
+        if slab is None:
+            slab = _IncrementalSlab()
+            self._ThreadSettings.AddFilter(slab.GetImageReslice())
+            self._TimePipeline(slab.GetImageReslice(), name, 'slab')
+            self._Slabs[name] = slab
+        slab.Update(reslice, self._Inputs[name], geometry, position,
+                    tolerance)
+
+        image = slab.GetOutput()
+        self._ImageMapToColors[name].SetInputData(image)
+        self._CachedSlices[name] = image
+        return 1
+
+    def _OnResliceEnd(self, reslice, event, name):
+        # store a copy of each complete slice in the cache
+        if name not in self._Inputs:
+            return
+        key = self._GetResliceKey(name)
+        if key is None:
+            return
+        self._ResliceInputMTimes[name] = key[2]
+        cache = ResliceCache.GetResliceCache()
+        if cache.GetMemoryLimit() <= 0:
+            return
+        output = reslice.GetOutput()
+        wholeExtent = reslice.GetOutputInformation(0).Get(
+            vtk.vtkStreamingDemandDrivenPipeline.WHOLE_EXTENT())
+        if tuple(output.GetExtent()) != tuple(wholeExtent):
+            return
+        image = vtk.vtkImageData()
+        image.DeepCopy(output)
+        cache.Add(key, image)
+
+    def _PrefetchSlices(self, step):
+        # reslice the slices that are likely to be shown next
+        now = RenderTiming.Clock()
+        elapsed = now - (self._LastPushTime or 0.0)
+        self._LastPushTime = now
+
+        prefetcher = SlicePrefetcher.GetSlicePrefetcher()
+        offsets = prefetcher.Predict(step, elapsed)
+        if not offsets:
+            return
+        jobs = []
+        for name in self._Inputs:
+            if not self._UseIncrementalSlab(name):
+                jobs = jobs + self._MakePrefetchJobs(name, offsets)
+        prefetcher.Submit(self, jobs)
+
+    def _MakePrefetchJobs(self, name, offsets):
+        # make a (key, func) job for each offset along the normal
+        reslice = self._ImageReslicers[name]
+        transform = reslice.GetResliceTransform()
+        image = reslice.GetInput()
+        if (image is None or transform is None or
+                not transform.IsA('vtkLinearTransform')):
+            return []
+
+        # the workers copy the settings from _GetResliceSettings(), but
+        # not a stencil, reslice axes, or an interpolator of another kind
+        if _GetResliceExtras(reslice, 1.0) is not None:
+            return []
+
+        # only use the input if it is up to date, and if all of it is in
+        # memory (the reslice filter may have requested just a few slices)
+        port = self._Inputs[name]
+        producer = port.GetProducer()
+        producer.UpdateInformation()
+        if (producer.GetExecutive().GetPipelineMTime() !=
+                self._ResliceInputMTimes.get(name)):
+            return []
+        wholeExtent = producer.GetOutputInformation(port.GetIndex()).Get(
+            vtk.vtkStreamingDemandDrivenPipeline.WHOLE_EXTENT())
+        if tuple(image.GetExtent()) != tuple(wholeExtent):
+            return []
+
+        # the workers get their own reference to the data
+        input = vtk.vtkImageData()
+        input.ShallowCopy(image)
+
+        # the reslice matrix without the current reslice axes
+        inverse = vtk.vtkMatrix4x4()
+        inverse.DeepCopy(self._ResliceAxes)
+        inverse.Invert()
+        base = vtk.vtkMatrix4x4()
+        vtk.vtkMatrix4x4.Multiply4x4(transform.GetMatrix(), inverse, base)
+
+        settings = _GetResliceSettings(reslice)
+
+        planeOrigin = self._Plane.GetOrigin()
+        normal = self._Plane.GetNormal()
+        spacingX, spacingY, spacingZ = reslice.GetOutputSpacing()
+
+        jobs = []
+        for offset in offsets:
+            (x, y, z), (originX, originY) = self._GetResliceOrigin(
+                [planeOrigin[i] + offset * normal[i] for i in range(3)])
+            axes = vtk.vtkMatrix4x4()
+            axes.DeepCopy(self._ResliceAxes)
+            axes.SetElement(0, 3, x)
+            axes.SetElement(1, 3, y)
+            axes.SetElement(2, 3, z)
+            origin = (0.5 * spacingX + originX, 0.5 * spacingY + originY, 0.0)
+
+            key = self._GetResliceKey(name, axes=axes, origin=origin)
+            matrix = vtk.vtkMatrix4x4()
+            vtk.vtkMatrix4x4.Multiply4x4(base, axes, matrix)
+            jobs.append((key, _SliceJob(input, matrix, origin, settings)))
+
+        return jobs
+
     def GetOutlineVisibility(self):
         return self._bOutlineIsVisible
 
@@ -342,6 +896,18 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
                 return 1
         return 0
 
+    def _GetWatchedObjects(self):
+        watched = ActorFactory.ActorFactory._GetWatchedObjects(self)
+        for name in self._Inputs:
+            producer = self._Inputs[name].GetProducer()
+            watched.append(producer)
+            # changes to a plain vtkImageData are only seen on the data
+            if producer.IsA('vtkTrivialProducer'):
+                watched.append(producer.GetOutputDataObject(0))
+        for name in self._LookupTables:
+            watched.append(self._LookupTables[name])
+        return watched
+
     def GetPlane(self):
         return self._Plane
 
@@ -416,36 +982,63 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
     def GetNumberOfInputs(self):
         return len(self._Inputs)
 
-    def OnExecuteInformation(self, colors, event="ExecuteInformationEvent"):
-
-        image = colors.GetInput()
-
-        # VTK-6
-        # if vtk.vtkVersion().GetVTKMajorVersion() > 5:
-        #    print 'SlicePlaneFactory:OnExecuteInformation - fix UpdateInformation()!'
-        #    #image.UpdateInformation()  # TODO: VTK-6 figure out what to do here
-        # else:
-        # image.UpdateInformation()  # TODO: VTK-6 figure out what to do here
-
-        # 2017-05-18: colors must be updated here otherwise we handle e.g. RGB pngs incorrectly
+    def _GetInputGeometry(self, name):
+        # the whole extent, origin and spacing of input `name`, from the
+        # pipeline information so that the input does not have to execute
+        port = self._Inputs[name]
+        producer = port.GetProducer()
+        producer.UpdateInformation()
         if vtk.vtkVersion().GetVTKMajorVersion() > 5:
-            if colors.GetLookupTable() is None:
-                colors.SetLookupTable(vtk.vtkLookupTable())  # provide a dummy table
-            colors.Update()
+            info = producer.GetOutputInformation(port.GetIndex())
+            extent = info.Get(
+                vtk.vtkStreamingDemandDrivenPipeline.WHOLE_EXTENT())
+            origin = info.Get(vtk.vtkDataObject.ORIGIN())
+            spacing = info.Get(vtk.vtkDataObject.SPACING())
+        else:
+            image = producer.GetOutput(port.GetIndex())
+            extent = image.GetWholeExtent()
+            origin = image.GetOrigin()
+            spacing = image.GetSpacing()
+        return (extent or (0, -1, 0, -1, 0, -1),
+                origin or (0.0, 0.0, 0.0),
+                spacing or (1.0, 1.0, 1.0))
+
+    def OnExecuteInformation(self, colors, event="ExecuteInformationEvent"):
 
         for name in self._ImageMapToColors:
             if colors == self._ImageMapToColors[name]:
                 break
 
-        if image.GetNumberOfScalarComponents() == 3:
+        # the color format depends only on the number of components and
+        # the scalar type of the input, which are in the pipeline
+        # information, so nothing has to execute to find them
+        port = self._Inputs[name]
+        producer = port.GetProducer()
+        producer.UpdateInformation()
+        key = (producer.GetExecutive().GetPipelineMTime(),
+               self._LookupTables[name])
+        if self._ColorFormatKeys.get(name) == key:
+            return
+        self._ColorFormatKeys[name] = key
+
+        if vtk.vtkVersion().GetVTKMajorVersion() > 5:
+            info = producer.GetOutputInformation(port.GetIndex())
+            components = vtk.vtkImageData.GetNumberOfScalarComponents(info)
+            scalarType = vtk.vtkImageData.GetScalarType(info)
+        else:
+            image = producer.GetOutput(port.GetIndex())
+            components = image.GetNumberOfScalarComponents()
+            scalarType = image.GetScalarType()
+
+        if components == 3:
             colors.SetOutputFormatToRGB()
-            if self._LookupTables[name] and image.GetScalarType() != 3:
+            if self._LookupTables[name] and scalarType != 3:
                 colors.SetLookupTable(self._LookupTables[name])
             else:
                 colors.SetLookupTable(None)
-        elif image.GetNumberOfScalarComponents() == 4:
+        elif components == 4:
             colors.SetOutputFormatToRGBA()
-            if self._LookupTables[name] and image.GetScalarType() != 3:
+            if self._LookupTables[name] and scalarType != 3:
                 colors.SetLookupTable(self._LookupTables[name])
             else:
                 colors.SetLookupTable(None)
@@ -485,7 +1078,7 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         reslice.SetSlabThickness(0.0)
 
         reslice.SetResliceTransform(resliceTransform)
-        if self._SliceInterpolate:
+        if self._SliceInterpolate and self._RenderQuality >= 1.0:
             reslice.SetInterpolationModeToLinear()
         else:
             reslice.SetInterpolationModeToNearestNeighbor()
@@ -502,6 +1095,14 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         except:
             pass
 
+        self._ThreadSettings.AddFilter(reslice)
+        self._ThreadSettings.AddFilter(colors)
+
+        self._TimePipeline(reslice, name, 'reslice')
+        reslice.AddObserver('EndEvent',
+                            lambda o, e, n=name: self._OnResliceEnd(o, e, n))
+        self._TimePipeline(colors, name, 'colors')
+
         coords = vtk.vtkTextureMapToPlane()
         coords.SetInputConnection(self._Plane.GetOutputPort())
         coords.AutomaticPlaneGenerationOff()
@@ -533,10 +1134,28 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         ## JDG self.OnExecuteInformation(colors)
         self._UpdateNormal()
         self._UpdateOrigin()
+        self._UpdateWatchedObjects()
         self.Modified()
 
         return name
 
+    def _TimePipeline(self, alg, name, stage):
+        # record each execution of alg, if RenderTiming is enabled
+        start = []
+
+        def OnStart(o, e):
+            if RenderTiming.GetRenderTimer().IsEnabled():
+                start.append(RenderTiming.Clock())
+
+        def OnEnd(o, e):
+            if start:
+                timer = RenderTiming.GetRenderTimer()
+                label = '%s[%s] %s' % (timer.GetLabel(self), name, stage)
+                timer.Add('pipeline', label, RenderTiming.Clock() - start.pop())
+
+        alg.AddObserver('StartEvent', OnStart)
+        alg.AddObserver('EndEvent', OnEnd)
+
     def RemoveInputConnection(self, name=0):
 
         actors = self._ActorDict
@@ -566,7 +1185,13 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         del self._ImageTransforms[name]
         del self._TransformGrids[name]
         del self._ClippingPlanes[name]
+        self._ResliceKeys.pop(name, None)
+        self._CachedSlices.pop(name, None)
+        self._ResliceInputMTimes.pop(name, None)
+        self._ColorFormatKeys.pop(name, None)
+        self._Slabs.pop(name, None)
 
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def SetInputData(self, image_data, name=0, table=None):
@@ -591,6 +1216,7 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
 
         self._UpdateNormal()
         self._UpdateOrigin()
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def GetInputConnection(self, name=0):
@@ -627,7 +1253,12 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
 
     def SetSliceInterpolate(self, val):
         self._SliceInterpolate = val
-        if val:
+        self._UpdateSliceInterpolation()
+        self.Modified()
+
+    def _UpdateSliceInterpolation(self):
+        # interpolation is only done at full quality
+        if self._SliceInterpolate and self._RenderQuality >= 1.0:
             for name in self._ImageReslicers:
                 reslice = self._ImageReslicers[name]
                 reslice.SetInterpolationModeToLinear()
@@ -635,8 +1266,50 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
             for name in self._ImageReslicers:
                 reslice = self._ImageReslicers[name]
                 reslice.SetInterpolationModeToNearestNeighbor()
+
+    def SetRenderQuality(self, quality):
+        factor = self._GetResliceFactor()
+        ActorFactory.ActorFactory.SetRenderQuality(self, quality)
+        self._UpdateSliceInterpolation()
+        if self._GetResliceFactor() != factor:
+            self._UpdateNormal()
+
+    def _GetResliceFactor(self):
+        # the factor by which the output spacing is increased, chosen
+        # so that the number of pixels is roughly proportional to the
+        # render quality, and so that the extent stays a power of two
+        if not self._ProgressiveReslice or self._RenderQuality >= 1.0:
+            return 1
+        return 2 ** int(round(0.5 * math.log(1.0 / self._RenderQuality, 2)))
+
+    def SetProgressiveReslice(self, val):
+        factor = self._GetResliceFactor()
+        self._ProgressiveReslice = val
+        if self._GetResliceFactor() != factor:
+            self._UpdateNormal()
+
+    def GetProgressiveReslice(self):
+        return self._ProgressiveReslice
+
+    def ProgressiveResliceOn(self):
+        self.SetProgressiveReslice(1)
+
+    def ProgressiveResliceOff(self):
+        self.SetProgressiveReslice(0)
+
+    def SetIncrementalSlab(self, val):
+        self._IncrementalSlab = val
         self.Modified()
 
+    def GetIncrementalSlab(self):
+        return self._IncrementalSlab
+
+    def IncrementalSlabOn(self):
+        self.SetIncrementalSlab(1)
+
+    def IncrementalSlabOff(self):
+        self.SetIncrementalSlab(0)
+
     def GetSliceInterpolate(self):
         return self._SliceInterpolate
 
@@ -665,6 +1338,9 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
     def TextureInterpolateOff(self):
         self.SetTextureInterpolate(0)
 
+    def GetThreadSettings(self):
+        return self._ThreadSettings
+
     def GetImageReslice(self, name=0):
 
         # get the associated reslicer
@@ -682,6 +1358,7 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
                 actor = actors[name]
                 if actor.GetTexture():
                     actor.GetTexture().SetLookupTable(table)
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def GetLookupTable(self, name=0):
@@ -813,10 +1490,7 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
 
         i = self._PlaneOrientation
 
-        image = self._ImageReslicers[0].GetInput()
-        extent = image.GetExtent()
-        origin = image.GetOrigin()
-        spacing = image.GetSpacing()
+        extent, origin, spacing = self._GetInputGeometry(0)
 
         xbounds = [origin[0] + spacing[0] * (extent[0] - 0.5),
                    origin[0] + spacing[0] * (extent[1] + 0.5)]
@@ -898,19 +1572,9 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
     def SetSliceIndex(self, index):
 
         # set the slice index in terms of the data extent
-        image = self._ImageReslicers[0].GetInput()
-
-        # VTK-6
-        if vtk.vtkVersion().GetVTKMajorVersion() > 5:
-            print('SlicePlaneFactory:SetSliceIndex - fix UpdateInformation()!')
-            # image.UpdateInformation()  # TODO: VTK-6 figure out what to do
-            # here
-        else:
-            image.UpdateInformation()  # TODO: VTK-6 figure out what to do here
-
-        originX, originY, originZ = image.GetOrigin()
-        spacingX, spacingY, spacingZ = image.GetSpacing()
-        del image
+        extent, origin, spacing = self._GetInputGeometry(0)
+        originX, originY, originZ = origin
+        spacingX, spacingY, spacingZ = spacing
 
         planeOriginX, planeOriginY, planeOriginZ = self._Plane.GetOrigin()
         planeNormalX, planeNormalY, planeNormalZ = self._Plane.GetNormal()
@@ -934,20 +1598,12 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         if len(self._ImageReslicers) == 0:
             return -1
 
-        image = self._ImageReslicers[0].GetInput()
-
-        # VTK-6
-        # if vtk.vtkVersion().GetVTKMajorVersion() > 5:
-        #    print 'SlicePlaneFactory:GetSliceIndex - fix UpdateInformation()!'
-        #    #image.UpdateInformation()  # TODO: VTK-6 figure out what to do here
-        # else:
-        # image.UpdateInformation()  # TODO: VTK-6 figure out what to do here
+        extent, origin, spacing = self._GetInputGeometry(0)
 
         planeOriginX, planeOriginY, planeOriginZ = plane.GetOrigin()
         planeNormalX, planeNormalY, planeNormalZ = plane.GetNormal()
-        originX, originY, originZ = image.GetOrigin()
-        spacingX, spacingY, spacingZ = image.GetSpacing()
-        del image
+        originX, originY, originZ = origin
+        spacingX, spacingY, spacingZ = spacing
 
         if planeNormalX == 0 and planeNormalY == 0:
             return old_div((planeOriginZ - originZ), spacingZ)
@@ -973,7 +1629,13 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         self.Modified()
 
         # return the actual amount pushed, in case we hit bounds
-        return (o2[0] - o1[0]) * n[0] + (o2[1] - o1[1]) * n[1] + (o2[2] - o1[2]) * n[2]
+        amount = (o2[0] - o1[0]) * n[0] + (o2[1] - o1[1]) * n[1] + (o2[2] - o1[2]) * n[2]
+
+        # if the plane moved freely, keep going in the same direction
+        if amount != 0:
+            self._PrefetchSlices(distance)
+
+        return amount
 
     def SetNormal(self, *a):
         # set the normal of the slice plane
@@ -1163,6 +1825,15 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
 
         return (p1[0] + t * lx, p1[1] + t * ly, p1[2] + t * lz)
 
+    def IntersectWithLines(self, p1, p2):
+        # vectorized version of IntersectWithLine, but only the part of
+        # the plane that is displayed counts as an intersection
+        transform = self._Transform
+        return RayPicking.IntersectParallelogram(
+            transform.TransformPoint(self._Plane.GetOrigin()),
+            transform.TransformPoint(self._Plane.GetPoint1()),
+            transform.TransformPoint(self._Plane.GetPoint2()), p1, p2)
+
     def _UpdateOrigin(self):
         # a protected method, called when the slice plane moves along
         # its normal
@@ -1220,18 +1891,8 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         planeOrigin = self._Plane.GetOrigin()
 
         matrix = self._ResliceAxes
-        matrix.SetElement(0, 3, 0)
-        matrix.SetElement(1, 3, 0)
-        matrix.SetElement(2, 3, 0)
-
-        # transpose is an exact way to invert a pure rotation matrix
-        matrix.Transpose()
-        originX, originY, originZ, w = \
-            matrix.MultiplyPoint(planeOrigin + (1.0,))
-
-        matrix.Transpose()
-        newOriginX, newOriginY, newOriginZ, w = \
-            matrix.MultiplyPoint((0.0, 0.0, originZ, 1.0))
+        (newOriginX, newOriginY, newOriginZ), (originX, originY) = \
+            self._GetResliceOrigin(planeOrigin)
 
         matrix.SetElement(0, 3, newOriginX)
         matrix.SetElement(1, 3, newOriginY)
@@ -1255,6 +1916,26 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
 
         ## JDG self.Modified()
 
+    def _GetResliceOrigin(self, planeOrigin):
+        # for a plane with the given origin, get the translation of the
+        # reslice axes and the x,y position of the origin on the slice
+        matrix = vtk.vtkMatrix4x4()
+        matrix.DeepCopy(self._ResliceAxes)
+        matrix.SetElement(0, 3, 0)
+        matrix.SetElement(1, 3, 0)
+        matrix.SetElement(2, 3, 0)
+
+        # transpose is an exact way to invert a pure rotation matrix
+        matrix.Transpose()
+        originX, originY, originZ, w = \
+            matrix.MultiplyPoint(tuple(planeOrigin) + (1.0,))
+
+        matrix.Transpose()
+        newOriginX, newOriginY, newOriginZ, w = \
+            matrix.MultiplyPoint((0.0, 0.0, originZ, 1.0))
+
+        return (newOriginX, newOriginY, newOriginZ), (originX, originY)
+
     def _UpdateNormal(self):
 
         # a private method, called when a property of the slice plane changes
@@ -1330,19 +2011,9 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
         for name in self._Inputs:
             reslice = self._ImageReslicers[name]
             coords = self._TextureCoords[name]
-            image = reslice.GetInput()
 
             # calculate appropriate pixel spacing for the reslicing
-
-            # VTK-6
-            # if vtk.vtkVersion().GetVTKMajorVersion() > 5:
-            #    print 'SlicePlaneFactory:_UpdateNormal - fix UpdateInformation()!'
-            #    #image.UpdateInformation()  # TODO: VTK-6 figure out what to do here
-            # else:
-            # image.UpdateInformation()  # TODO: VTK-6 figure out what to do
-            # here
-
-            spacing = image.GetSpacing()
+            extent, origin, spacing = self._GetInputGeometry(name)
 
             spacingX = abs(planeAxis1[0] * spacing[0]) +\
                 abs(planeAxis1[1] * spacing[1]) +\
@@ -1352,6 +2023,11 @@ class SlicePlaneFactory(ActorFactory.ActorFactory):
                 abs(planeAxis2[1] * spacing[1]) +\
                 abs(planeAxis2[2] * spacing[2])
 
+            # use fewer pixels while interacting at reduced quality
+            factor = self._GetResliceFactor()
+            spacingX = spacingX * factor
+            spacingY = spacingY * factor
+
             # pad extent up to a power of two for efficient texture mapping
 
             extentX = 1
@@ -0,0 +1,268 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: SlicePrefetcher.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+SlicePrefetcher - reslice the next few slices in the background
+
+  While the user scrolls through a volume one slice at a time, the
+  slices that will be needed next can be predicted from the direction
+  and speed of the scrolling.  The SlicePrefetcher reslices them on a
+  pool of worker threads (vtkImageReslice does not hold the Python GIL
+  while it executes) and, when they are done, puts them into the
+  ResliceCache, so that the UI thread only has to color map and upload
+  a slice that is ready.
+
+  The SlicePlaneFactory calls Predict() each time the slice is pushed,
+  and Submit() with a job for each predicted slice.  The finished
+  slices are moved into the cache by Collect(), which the factory
+  calls before each render, so the cache is only ever used from the
+  UI thread.
+
+  There is one prefetcher for the whole process:
+
+    prefetcher = SlicePrefetcher.GetSlicePrefetcher()
+    prefetcher.SetDepth(8)
+    prefetcher.SetNumberOfWorkers(4)
+    print(prefetcher.GetHitRate())
+
+Derived From:
+
+  object
+
+See Also:
+
+  ResliceCache, SlicePlaneFactory
+
+Initialization:
+
+  SlicePrefetcher(*depth*=4,*workers*=2)
+
+Public Methods:
+
+  Predict(*step*,*elapsed*)     -- given the distance and the time in
+                                  seconds since the previous slice, get
+                                  the offsets of the next slices
+
+  Submit(*owner*,*jobs*)        -- start a list of (*key*,*func*) jobs,
+                                  where func() returns the vtkImageData
+                                  for the key; jobs from the same owner
+                                  that have not started are cancelled
+
+  Collect()                    -- move finished slices into the
+                                  ResliceCache
+
+  Used(*key*)                  -- called when a slice is taken from the
+                                  cache, to count prefetched slices that
+                                  were displayed
+
+  SetDepth(*depth*)            -- the number of slices to predict, zero
+  GetDepth()                      disables prefetching
+
+  SetNumberOfWorkers(*n*)      -- the number of worker threads, zero
+  GetNumberOfWorkers()            disables prefetching
+
+  SetTimeout(*seconds*)        -- a pause longer than this ends the
+  GetTimeout()                    scroll, and nothing is predicted
+
+  GetNumberOfPending()         -- the number of jobs not yet collected
+
+  GetNumberOfPrefetches()      -- the number of slices that were put in
+                                  the cache
+
+  GetNumberOfHits()            -- the number of prefetched slices that
+                                  were displayed
+
+  GetHitRate()                 -- hits divided by prefetches
+
+  ResetStatistics()            -- set the counts to zero
+
+  Wait()                       -- wait for all of the jobs to finish
+
+Module Functions:
+
+  GetSlicePrefetcher()         -- the prefetcher shared by the process
+
+"""
+
+#======================================
+from builtins import object
+from concurrent import futures
+import logging
+
+from . import ResliceCache
+
+logger = logging.getLogger(__name__)
+
+#======================================
+
+
+class SlicePrefetcher(object):
+
+    def __init__(self, depth=4, workers=2):
+        self._Depth = depth
+        self._NumberOfWorkers = workers
+        self._Timeout = 0.5
+        self._Executor = None
+        # key -> (owner, future)
+        self._Pending = {}
+        # keys of prefetched slices that have not been displayed yet
+        self._Prefetched = set()
+        self.ResetStatistics()
+
+    def Predict(self, step, elapsed):
+        if (step == 0 or elapsed > self._Timeout or
+                not self._Depth or not self._NumberOfWorkers):
+            return []
+        # keep the same direction and speed
+        return [step * (i + 1) for i in range(self._Depth)]
+
+    def Submit(self, owner, jobs):
+        if not self._NumberOfWorkers:
+            return
+        keys = set([key for key, func in jobs])
+        for key in list(self._Pending):
+            other, future = self._Pending[key]
+            if other is owner and key not in keys and future.cancel():
+                del self._Pending[key]
+
+        cache = ResliceCache.GetResliceCache()
+        if self._Executor is None:
+            self._Executor = futures.ThreadPoolExecutor(
+                self._NumberOfWorkers)
+        for key, func in jobs:
+            if key in self._Pending or cache.Contains(key):
+                continue
+            self._Pending[key] = (owner, self._Executor.submit(func))
+
+    def Collect(self):
+        cache = ResliceCache.GetResliceCache()
+        for key in list(self._Pending):
+            future = self._Pending[key][1]
+            if not future.done():
+                continue
+            del self._Pending[key]
+            if future.cancelled():
+                continue
+            try:
+                image = future.result()
+            except Exception:
+                logger.exception("SlicePrefetcher")
+                continue
+            cache.Add(key, image)
+            self._Prefetched.add(key)
+            self._Prefetches = self._Prefetches + 1
+
+    def Used(self, key):
+        if key in self._Prefetched:
+            self._Prefetched.discard(key)
+            self._Hits = self._Hits + 1
+
+    def Wait(self):
+        futures.wait([future for owner, future in
+                      list(self._Pending.values())])
+
+    def SetDepth(self, depth):
+        self._Depth = depth
+
+    def GetDepth(self):
+        return self._Depth
+
+    def SetNumberOfWorkers(self, n):
+        if n == self._NumberOfWorkers:
+            return
+        if self._Executor is not None:
+            # running jobs finish in the background
+            for owner, future in list(self._Pending.values()):
+                future.cancel()
+            self._Executor.shutdown(wait=False)
+            self._Executor = None
+        self._NumberOfWorkers = n
+
+    def GetNumberOfWorkers(self):
+        return self._NumberOfWorkers
+
+    def SetTimeout(self, seconds):
+        self._Timeout = seconds
+
+    def GetTimeout(self):
+        return self._Timeout
+
+    def GetNumberOfPending(self):
+        return len(self._Pending)
+
+    def GetNumberOfPrefetches(self):
+        return self._Prefetches
+
+    def GetNumberOfHits(self):
+        return self._Hits
+
+    def GetHitRate(self):
+        if self._Prefetches == 0:
+            return 0.0
+        return float(self._Hits) / self._Prefetches
+
+    def ResetStatistics(self):
+        self._Prefetches = 0
+        self._Hits = 0
+
+
+_SlicePrefetcher = SlicePrefetcher()
+
+
+def GetSlicePrefetcher():
+    """Get the SlicePrefetcher that is shared by the process."""
+    return _SlicePrefetcher
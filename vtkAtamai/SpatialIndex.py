@@ -0,0 +1,240 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: SpatialIndex.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+"""
+SpatialIndex - find which rectangle is under a point
+
+  The GridIndex divides the bounding box of a set of rectangles into a
+  uniform grid, and records which rectangles overlap each grid cell.
+  A point query only has to look at the rectangles in one cell, so it
+  takes nearly constant time no matter how many rectangles there are.
+  It is used by the PaneFrame to find the pane under the mouse, and by
+  the RenderPane and Widget to find the widget under the mouse.
+
+  The index is not updated incrementally, it is rebuilt from scratch
+  whenever the geometry changes (which is rare compared to the number
+  of mouse events).
+
+  When rectangles overlap, the one that came first in the list that
+  the index was built from is returned, just as for a linear search.
+  Items that have no rectangle (e.g. widgets with a custom IsInWidget
+  method) are tested with a callback on every query.
+
+Derived From:
+
+  object
+
+See Also:
+
+  PaneFrame, RenderPane, Widget
+
+Initialization:
+
+  GridIndex(*inclusive*=0)
+
+  *inclusive* - if set, points on the right and top edges of a
+                rectangle are inside it (like vtkViewport.IsInViewport),
+                otherwise they are outside (like Widget.IsInWidget)
+
+Public Methods:
+
+  Build(*entries*)            -- build the index from a list of
+                                 (*item*, *rect*) pairs, where *rect* is
+                                 (*xmin*,*ymin*,*xmax*,*ymax*) or None
+
+  Find(*x*,*y*,*test*=None)   -- get the first item that contains the
+                                 point, or None; test(*item*) is called
+                                 for the items that have no rectangle
+
+  GetNumberOfItems()          -- the number of items in the index
+
+Module Functions:
+
+  GetWidgetRect(*widget*)     -- get the rectangle that a widget responds
+                                 to, or None if it can't be determined
+
+"""
+
+#======================================
+from builtins import range
+from builtins import object
+import math
+
+#======================================
+
+
+class GridIndex(object):
+
+    # the grid is never larger than this in either dimension
+    MaximumGridSize = 64
+
+    def __init__(self, inclusive=0):
+        self._Inclusive = inclusive
+        self.Build([])
+
+    def GetNumberOfItems(self):
+        return len(self._Items)
+
+    def Build(self, entries):
+        """Build the index from (item, rect) pairs."""
+        self._Items = [item for item, rect in entries]
+        self._Rects = [rect for item, rect in entries]
+        # indices of items that must always be tested with a callback
+        self._Untested = tuple([i for i, rect in enumerate(self._Rects)
+                                if rect is None])
+        self._Cells = []
+        self._Origin = (0.0, 0.0)
+        self._CellSize = (1.0, 1.0)
+        self._GridSize = (0, 0)
+
+        rects = [rect for rect in self._Rects if rect is not None]
+        if not rects:
+            return
+
+        xmin = min([r[0] for r in rects])
+        ymin = min([r[1] for r in rects])
+        xmax = max([r[2] for r in rects])
+        ymax = max([r[3] for r in rects])
+
+        # roughly two cells per rectangle along each axis
+        n = min(max(int(2 * math.sqrt(len(rects)) + 0.5), 1),
+                self.MaximumGridSize)
+        cw = max((xmax - xmin) / float(n), 1e-6)
+        ch = max((ymax - ymin) / float(n), 1e-6)
+        self._Origin = (xmin, ymin)
+        self._CellSize = (cw, ch)
+        self._GridSize = (n, n)
+
+        cells = [[] for i in range(n * n)]
+        for i, rect in enumerate(self._Rects):
+            if rect is None:
+                continue
+            i0, j0 = self._CellOf(rect[0], rect[1])
+            i1, j1 = self._CellOf(rect[2], rect[3])
+            for j in range(j0, j1 + 1):
+                for k in range(i0, i1 + 1):
+                    cells[j * n + k].append(i)
+
+        # each cell holds its item indices in increasing order, merged
+        # with the untested items so that Find() doesn't have to sort
+        untested = list(self._Untested)
+        self._Cells = [tuple(sorted(cell + untested)) for cell in cells]
+
+    def _CellOf(self, x, y):
+        n, m = self._GridSize
+        i = int(math.floor((x - self._Origin[0]) / self._CellSize[0]))
+        j = int(math.floor((y - self._Origin[1]) / self._CellSize[1]))
+        return (min(max(i, 0), n - 1), min(max(j, 0), m - 1))
+
+    def Find(self, x, y, test=None):
+        """Get the first item that contains (x, y), or None."""
+        n, m = self._GridSize
+        i = (x - self._Origin[0]) / self._CellSize[0]
+        j = (y - self._Origin[1]) / self._CellSize[1]
+        if not self._Cells or i < 0 or j < 0 or i > n or j > m:
+            # outside of all the rectangles
+            candidates = self._Untested
+        else:
+            # points on the far edge of the grid go in the last cell
+            candidates = self._Cells[min(int(j), m - 1) * n +
+                                     min(int(i), n - 1)]
+
+        rects = self._Rects
+        inclusive = self._Inclusive
+        for index in candidates:
+            rect = rects[index]
+            if rect is None:
+                if test is not None and test(self._Items[index]):
+                    return self._Items[index]
+            elif inclusive:
+                if (rect[0] <= x and x <= rect[2] and
+                        rect[1] <= y and y <= rect[3]):
+                    return self._Items[index]
+            else:
+                if (rect[0] <= x and x < rect[2] and
+                        rect[1] <= y and y < rect[3]):
+                    return self._Items[index]
+        return None
+
+#======================================
+
+
+def _DefiningClass(cls, name):
+    for c in cls.__mro__:
+        if name in c.__dict__:
+            return c
+    return None
+
+
+def GetWidgetRect(widget):
+    """Get the rectangle that the widget's IsInWidget() responds to.
+
+    The rectangle comes from the widget's _GetHitRect() method, but
+    only if _GetHitRect() is defined by the same class as IsInWidget()
+    or by a subclass of it.  Otherwise, IsInWidget() has been overridden
+    in a way that we know nothing about, and None is returned.
+    """
+    cls = type(widget)
+    rectClass = _DefiningClass(cls, '_GetHitRect')
+    testClass = _DefiningClass(cls, 'IsInWidget')
+    if rectClass is None or testClass is None or \
+            not issubclass(rectClass, testClass):
+        return None
+    try:
+        return widget._GetHitRect()
+    except AttributeError:
+        # the geometry has not been configured yet
+        return None
@@ -85,6 +85,7 @@ Public Methods:
 """
 
 from .ActorFactory import *
+from . import RenderTiming
 import math
 
 
@@ -167,6 +168,7 @@ class SphereMarkFactory(ActorFactory):
         ActorFactory.AddToRenderer(self, renderer)
         renderer.AddObserver('StartEvent', self.OnRenderEvent)
 
+    @RenderTiming.TimedCallback
     def OnRenderEvent(self, renderer, event):
 
         x, y, z = self.GetPosition()
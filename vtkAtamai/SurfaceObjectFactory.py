@@ -135,6 +135,9 @@ logger = logging.getLogger(__name__)
 
 class SurfaceObjectFactory(ActorFactory):
 
+    # the property is watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self):
         ActorFactory.__init__(self)
         self._input_data = None
@@ -151,6 +154,8 @@ class SurfaceObjectFactory(ActorFactory):
         self._PolyDataNormals = None
         self._Stripper = None
 
+        self._UpdateWatchedObjects()
+
     def SetStripping(self, val):
         if val and not self._Stripper:
             self._TriangleFilter = vtk.vtkTriangleFilter()
@@ -224,6 +229,9 @@ class SurfaceObjectFactory(ActorFactory):
     def GetFeatureAngle(self):
         return self._FeatureAngle
 
+    def _GetWatchedObjects(self):
+        return ActorFactory._GetWatchedObjects(self) + [self._Property]
+
     def HasChangedSince(self, sinceMTime):
         if ActorFactory.HasChangedSince(self, sinceMTime):
             return 1
@@ -233,6 +241,7 @@ class SurfaceObjectFactory(ActorFactory):
 
     def SetProperty(self, property):
         self._Property = property
+        self._UpdateWatchedObjects()
         for ren in self._Renderers:
             actor = self._ActorDict[ren][0]
             actor.SetProperty(property)
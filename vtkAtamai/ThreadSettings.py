@@ -0,0 +1,233 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: ThreadSettings.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+ThreadSettings - the threading used by the reslice and color filters
+
+  The reslice and color mapping filters of the SlicePlaneFactory, the
+  ImagePane and the VolumeFactory are multithreaded, but they are
+  created with VTK's default number of threads, which is often far
+  fewer than the cores on a workstation.  A ThreadSettings holds the
+  number of threads and whether to use VTK's SMP tools rather than
+  the vtkMultiThreader, and applies them to the filters that have been
+  added to it, again whenever a setting changes.
+
+  There is one ThreadSettings for the whole process, and each of the
+  factories and panes above has one of its own whose parent is the
+  process-wide one.  A setting of None is taken from the parent, or
+  for the process-wide settings, from VTK's defaults:
+
+    ThreadSettings.GetThreadSettings().SetNumberOfThreads(32)
+    pane.GetThreadSettings().SetNumberOfThreads(8)
+
+  With SMP enabled, the threads come from the vtkSMPTools backend,
+  which is shared by the process.  Its backend is chosen with
+  SetSMPBackend(), and its number of threads is the number set for
+  the process-wide settings, so per-factory thread counts only apply
+  to the vtkMultiThreader.
+
+Derived From:
+
+  object
+
+See Also:
+
+  SlicePlaneFactory, ImagePane, VolumeFactory
+
+Initialization:
+
+  ThreadSettings(*parent*=None)
+
+Public Methods:
+
+  SetNumberOfThreads(*n*)      -- the number of threads for each
+                                  filter, or None (the default)
+  GetNumberOfThreads()
+
+  SetEnableSMP(*flag*)         -- use vtkSMPTools instead of the
+                                  vtkMultiThreader, or None (the default)
+  GetEnableSMP()
+
+  GetParent()                  -- the settings that None is taken from
+
+  AddFilter(*filter*)          -- apply the settings to the filter now
+                                  and whenever they change, the filter
+                                  is not kept alive by the settings
+
+  Apply(*filter*)              -- apply the settings to the filter once
+
+Module Functions:
+
+  GetThreadSettings()          -- the settings shared by the process
+
+  SetSMPBackend(*name*)        -- e.g. 'Sequential', 'STDThread' or
+                                  'TBB', returns false if the backend
+                                  is not available in this VTK build
+
+  GetSMPBackend()              -- the backend in use, or None if this
+                                  VTK has no SMP tools
+
+"""
+
+#======================================
+from builtins import object
+import weakref
+import vtk
+
+#======================================
+
+
+class ThreadSettings(object):
+
+    def __init__(self, parent=None):
+        self._Parent = parent
+        self._NumberOfThreads = None
+        self._EnableSMP = None
+        # the filters by their address, and the settings that inherit
+        # from these settings
+        self._Filters = weakref.WeakValueDictionary()
+        self._Children = weakref.WeakSet()
+        if parent is not None:
+            parent._Children.add(self)
+
+    def GetParent(self):
+        return self._Parent
+
+    def SetNumberOfThreads(self, n):
+        self._NumberOfThreads = n
+        if self is _ThreadSettings:
+            _InitializeSMPTools(n)
+        self._Update()
+
+    def GetNumberOfThreads(self):
+        return self._NumberOfThreads
+
+    def SetEnableSMP(self, flag):
+        self._EnableSMP = flag
+        self._Update()
+
+    def GetEnableSMP(self):
+        return self._EnableSMP
+
+    def AddFilter(self, alg):
+        self._Filters[alg.__this__] = alg
+        self.Apply(alg)
+
+    def Apply(self, alg):
+        n = self._GetSetting('_NumberOfThreads')
+        if not n:
+            n = vtk.vtkMultiThreader.GetGlobalDefaultNumberOfThreads()
+        alg.SetNumberOfThreads(n)
+        flag = self._GetSetting('_EnableSMP')
+        try:
+            if flag is None:
+                flag = vtk.vtkThreadedImageAlgorithm.\
+                    GetGlobalDefaultEnableSMP()
+            alg.SetEnableSMP(flag and 1 or 0)
+        except AttributeError:
+            # VTK 8 and earlier have no SMP image filters
+            pass
+
+    def _GetSetting(self, attr):
+        settings = self
+        while settings is not None:
+            value = getattr(settings, attr)
+            if value is not None:
+                return value
+            settings = settings._Parent
+        return None
+
+    def _Update(self):
+        for alg in list(self._Filters.values()):
+            self.Apply(alg)
+        for child in list(self._Children):
+            child._Update()
+
+
+def _InitializeSMPTools(n):
+    # the vtkSMPTools thread pool is shared by the process, zero
+    # gives the backend's default number of threads
+    try:
+        vtk.vtkSMPTools.Initialize(n or 0)
+    except AttributeError:
+        pass
+
+
+def SetSMPBackend(name):
+    """Set the vtkSMPTools backend, return false if not available."""
+    try:
+        result = vtk.vtkSMPTools.SetBackend(name)
+    except AttributeError:
+        return False
+    _InitializeSMPTools(_ThreadSettings.GetNumberOfThreads())
+    return bool(result)
+
+
+def GetSMPBackend():
+    """Get the vtkSMPTools backend, or None."""
+    try:
+        return vtk.vtkSMPTools.GetBackend()
+    except AttributeError:
+        return None
+
+
+_ThreadSettings = ThreadSettings()
+
+
+def GetThreadSettings():
+    """Get the ThreadSettings that are shared by the process."""
+    return _ThreadSettings
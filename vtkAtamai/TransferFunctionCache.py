@@ -0,0 +1,359 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: TransferFunctionCache.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+TransferFunctionCache - numpy tables for lookup tables and transfer functions
+
+  Mapping scalar values to colors or opacities through VTK one value
+  at a time (GetTableValue(), GetValue(), GetColor()) is slow from
+  Python.  A TransferFunctionTable holds the whole of a vtkLookupTable,
+  vtkColorTransferFunction or vtkPiecewiseFunction as a numpy RGBA
+  array, so that any number of values can be mapped at once:
+
+    vtkLookupTable            -- the table itself, values are mapped
+                                 to the nearest table entry
+
+    vtkPiecewiseFunction      -- the nodes, with linear interpolation
+    vtkColorTransferFunction     between them, or a dense sampling of
+                                 the function if it has midpoints or
+                                 sharpness (or for a color transfer
+                                 function, a color space other than
+                                 RGB)
+
+  The alpha of a color transfer function is 1, and the color of a
+  piecewise function is white.
+
+  The TransferFunctionCache keeps one table per object and rebuilds it
+  when the object's MTime changes.  There is one cache for the whole
+  process, so the tables are shared by all the factories:
+
+    alpha = TransferFunctionCache.MapOpacity(table, values)
+
+Derived From:
+
+  object
+
+See Also:
+
+  VolumeRayQuery, VolumePlanesFactory
+
+Initialization:
+
+  TransferFunctionTable(*func*,*size*=4096)
+
+  TransferFunctionCache()
+
+Public Methods (TransferFunctionTable):
+
+  GetMTime()                   -- the MTime of the function when the
+                                  table was built
+
+  GetRange()                   -- the range of the function
+
+  GetValues()                  -- the scalar value for each table entry
+
+  GetRGBA()                    -- the (N,4) RGBA array, from 0 to 1
+
+  GetOpacity()                 -- the alpha column of the RGBA array
+
+  GetIndices(*values*,*range*=None)
+                               -- the nearest table entry for each value,
+                                  the range defaults to GetRange()
+
+  MapColors(*values*,*range*=None)
+                               -- map values to an (N,4) RGBA array
+
+  MapOpacity(*values*,*range*=None)
+                               -- map values to opacities, the range
+                                  is only used for lookup tables
+
+  IsOpaqueInRange(*low*,*high*,*threshold*=0.0,*range*=None)
+                               -- for arrays of value ranges, whether
+                                  any value in each range has an
+                                  opacity above the threshold
+
+Public Methods (TransferFunctionCache):
+
+  GetTable(*func*)             -- get an up-to-date table for func
+
+  MapColors(*func*,*values*,*range*=None)
+  MapOpacity(*func*,*values*,*range*=None)
+                               -- map values through func
+
+  GetNumberOfTables()          -- the number of tables in the cache
+
+  Clear()                      -- discard all tables
+
+Module Functions:
+
+  GetTransferFunctionCache()   -- the cache shared by the process
+
+  MapColors(*func*,*values*,*range*=None)
+  MapOpacity(*func*,*values*,*range*=None)
+                               -- map values with the shared cache
+
+"""
+
+#======================================
+from builtins import object
+import weakref
+import logging
+
+import numpy as np
+from vtk.util import numpy_support
+
+logger = logging.getLogger(__name__)
+
+# the number of samples for functions that cannot be stored exactly
+_TableSize = 4096
+
+#======================================
+
+
+class TransferFunctionTable(object):
+
+    def __init__(self, func, size=_TableSize):
+        self._MTime = func.GetMTime()
+        self._Nearest = 0
+        self._Clamping = 1
+        if func.IsA('vtkLookupTable'):
+            self._BuildFromLookupTable(func)
+        elif func.IsA('vtkColorTransferFunction'):
+            self._BuildFromColorTransferFunction(func, size)
+        elif func.IsA('vtkPiecewiseFunction'):
+            self._BuildFromPiecewiseFunction(func, size)
+        else:
+            raise TypeError("cannot make a table from a " +
+                            func.GetClassName())
+        self._Range = (float(self._Values[0]), float(self._Values[-1]))
+
+    def _BuildFromLookupTable(self, table):
+        if table.GetTable().GetNumberOfTuples() == 0:
+            # the table was never built, GetTableValue() would build it
+            table.Build()
+        n = table.GetNumberOfColors()
+        # newer VTK keeps the special colors after the table colors
+        rgba = numpy_support.vtk_to_numpy(table.GetTable())[0:n]
+        self._Nearest = 1
+        self._RGBA = rgba / 255.0
+        low, high = table.GetTableRange()
+        self._Values = np.linspace(low, high, len(rgba))
+
+    def _GetNodes(self, func, width):
+        nodes = np.zeros((func.GetSize(), width))
+        node = [0.0] * width
+        for i in range(len(nodes)):
+            func.GetNodeValue(i, node)
+            nodes[i] = node
+        return nodes
+
+    def _AddNodes(self, values, samples, nodeValues, nodeSamples):
+        # put the nodes into the sampled table, so that the corners
+        # of the function are not cut off
+        values = np.concatenate((values, nodeValues))
+        samples = np.concatenate((samples, nodeSamples))
+        order = np.argsort(values, kind='mergesort')
+        return values[order], samples[order]
+
+    def _BuildFromColorTransferFunction(self, func, size):
+        self._Clamping = func.GetClamping()
+        nodes = self._GetNodes(func, 6)
+        if len(nodes) == 0:
+            self._Values = np.zeros(1)
+            self._RGBA = np.zeros((1, 4))
+        elif ((nodes[:, 4] == 0.5).all() and (nodes[:, 5] == 0.0).all() and
+              func.GetColorSpace() == 0):
+            # no midpoints or sharpness, so it is piecewise linear
+            self._Values = nodes[:, 0]
+            self._RGBA = np.ones((len(nodes), 4))
+            self._RGBA[:, 0:3] = nodes[:, 1:4]
+        else:
+            low, high = func.GetRange()
+            rgb = np.zeros(3 * size)
+            func.GetTable(low, high, size, rgb)
+            self._Values, rgb = self._AddNodes(
+                np.linspace(low, high, size), rgb.reshape(size, 3),
+                nodes[:, 0], nodes[:, 1:4])
+            self._RGBA = np.ones((len(rgb), 4))
+            self._RGBA[:, 0:3] = rgb
+
+    def _BuildFromPiecewiseFunction(self, func, size):
+        self._Clamping = func.GetClamping()
+        nodes = self._GetNodes(func, 4)
+        if len(nodes) == 0:
+            self._Values = np.zeros(1)
+            self._RGBA = np.zeros((1, 4))
+            return
+        if (nodes[:, 2] == 0.5).all() and (nodes[:, 3] == 0.0).all():
+            # no midpoints or sharpness, so it is piecewise linear
+            self._Values = nodes[:, 0]
+            alpha = nodes[:, 1]
+        else:
+            low, high = func.GetRange()
+            alpha = np.zeros(size)
+            func.GetTable(low, high, size, alpha)
+            self._Values, alpha = self._AddNodes(
+                np.linspace(low, high, size), alpha,
+                nodes[:, 0], nodes[:, 1])
+        self._RGBA = np.ones((len(alpha), 4))
+        self._RGBA[:, 3] = alpha
+
+    def GetMTime(self):
+        return self._MTime
+
+    def GetRange(self):
+        return self._Range
+
+    def GetValues(self):
+        return self._Values
+
+    def GetRGBA(self):
+        return self._RGBA
+
+    def GetOpacity(self):
+        return self._RGBA[:, 3]
+
+    def GetIndices(self, values, range=None):
+        if range is None:
+            range = self._Range
+        maxidx = len(self._RGBA) - 1
+        span = (range[1] - range[0]) or 1.0
+        idx = np.rint((np.asarray(values, dtype=np.float64) - range[0]) /
+                      span * maxidx)
+        return np.clip(idx, 0, maxidx).astype(np.intp)
+
+    def _Interpolate(self, values, column):
+        values = np.asarray(values, dtype=np.float64)
+        result = np.interp(values, self._Values, self._RGBA[:, column])
+        if not self._Clamping:
+            result[(values < self._Values[0]) |
+                   (values > self._Values[-1])] = 0.0
+        return result
+
+    def MapColors(self, values, range=None):
+        if self._Nearest:
+            return self._RGBA[self.GetIndices(values, range)]
+        return np.stack([self._Interpolate(values, column)
+                         for column in (0, 1, 2, 3)], axis=-1)
+
+    def MapOpacity(self, values, range=None):
+        if self._Nearest:
+            return self._RGBA[self.GetIndices(values, range), 3]
+        return self._Interpolate(values, 3)
+
+    def IsOpaqueInRange(self, low, high, threshold=0.0, range=None):
+        # the number of table entries up to each index that are opaque
+        count = np.concatenate(
+            ([0], np.cumsum(self._RGBA[:, 3] > threshold)))
+        if self._Nearest:
+            first = self.GetIndices(low, range)
+            last = self.GetIndices(high, range) + 1
+            return count[last] > count[first]
+        # the function is linear between the table entries, so its
+        # maximum is at an end of the range or at an entry within it
+        low = np.asarray(low, dtype=np.float64)
+        high = np.asarray(high, dtype=np.float64)
+        first = np.searchsorted(self._Values, low, 'left')
+        last = np.searchsorted(self._Values, high, 'right')
+        return ((count[last] > count[first]) |
+                (self._Interpolate(low, 3) > threshold) |
+                (self._Interpolate(high, 3) > threshold))
+
+#======================================
+
+
+class TransferFunctionCache(object):
+
+    def __init__(self):
+        self._Tables = weakref.WeakKeyDictionary()
+
+    def GetTable(self, func):
+        table = self._Tables.get(func)
+        if table is None or table.GetMTime() != func.GetMTime():
+            table = TransferFunctionTable(func)
+            self._Tables[func] = table
+        return table
+
+    def MapColors(self, func, values, range=None):
+        return self.GetTable(func).MapColors(values, range)
+
+    def MapOpacity(self, func, values, range=None):
+        return self.GetTable(func).MapOpacity(values, range)
+
+    def GetNumberOfTables(self):
+        return len(self._Tables)
+
+    def Clear(self):
+        self._Tables.clear()
+
+
+_TransferFunctionCache = TransferFunctionCache()
+
+
+def GetTransferFunctionCache():
+    """Get the TransferFunctionCache that is shared by the process."""
+    return _TransferFunctionCache
+
+
+def MapColors(func, values, range=None):
+    """Map values to RGBA through func, using the shared cache."""
+    return _TransferFunctionCache.MapColors(func, values, range)
+
+
+def MapOpacity(func, values, range=None):
+    """Map values to opacity through func, using the shared cache."""
+    return _TransferFunctionCache.MapOpacity(func, values, range)
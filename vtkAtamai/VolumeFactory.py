@@ -116,12 +116,22 @@ Public Methods:
   GetClippingCube()      -- get the ClippingCubeFactory used to clip into
                             the volume
 
+  SetRenderQuality(*q*)  -- below full quality, the texture level of
+                            detail is chosen by quality rather than by
+                            the desired update rate
+
+  GetThreadSettings()    -- the threading of the reslice and color
+                            mapping filters, see ThreadSettings
+
 """
 
 #======================================
 from . import ActorFactory
 from . import ClippingCubeFactory
 from . import PaneFrame
+from . import RenderTiming
+from . import ThreadSettings
+from . import VolumeRayQuery
 import math
 import vtk
 
@@ -130,6 +140,9 @@ import vtk
 
 class VolumeFactory(ActorFactory.ActorFactory):
 
+    # input and transfer functions are watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self):
         ActorFactory.ActorFactory.__init__(self)
 
@@ -209,6 +222,12 @@ class VolumeFactory(ActorFactory.ActorFactory):
         self._ImageMapToColors = vtk.vtkImageMapToColors()
         self._ImageMapToColors.SetOutputFormatToRGBA()
 
+        self._ThreadSettings = ThreadSettings.ThreadSettings(
+            ThreadSettings.GetThreadSettings())
+        for alg in (self._RayCastReslice, self._ImageReslice1,
+                    self._ImageReslice2, self._ImageMapToColors):
+            self._ThreadSettings.AddFilter(alg)
+
         # strictly for VTK 3.2 compatibility
         self._ImageToStructuredPoints = vtk.vtkImageToStructuredPoints()
 
@@ -220,6 +239,8 @@ class VolumeFactory(ActorFactory.ActorFactory):
         self._PickThreshold = 0.99
         # the implicit volume for finding the gradient
         self._ImplicitVolume = vtk.vtkImplicitVolume()
+        self._RayQuery = VolumeRayQuery.VolumeRayQuery()
+        self._RayQuery.SetImplicitVolume(self._ImplicitVolume)
 
         # the texture dimensions (later this will be set automatically
         #    to provide the desired interactive rendering time)
@@ -293,6 +314,17 @@ class VolumeFactory(ActorFactory.ActorFactory):
     def GetLODIds(self):
         return self._lod
 
+    def SetRenderQuality(self, quality):
+        ActorFactory.ActorFactory.SetRenderQuality(self, quality)
+        if quality >= 1.0:
+            self._Volume.AutomaticLODSelectionOn()
+        else:
+            self._Volume.AutomaticLODSelectionOff()
+            if quality >= 0.5:
+                self._Volume.SetSelectedLODID(self._lod[1])
+            else:
+                self._Volume.SetSelectedLODID(self._lod[0])
+
     def HandleEvent(self, event):
         return self._ClippingCube.HandleEvent(event)
 
@@ -360,6 +392,7 @@ class VolumeFactory(ActorFactory.ActorFactory):
         # do the usual
         self.OnRenderEvent(renderer, vtkevent)
 
+    @RenderTiming.TimedCallback
     def OnRenderEvent(self, renderer, vtkevent):
         self._RenderTime.Modified()
 
@@ -595,6 +628,7 @@ class VolumeFactory(ActorFactory.ActorFactory):
 
         self._VolumeRayCastMapper.SetInput(obj)
         self._Input = input
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def GetInput(self):
@@ -618,6 +652,7 @@ class VolumeFactory(ActorFactory.ActorFactory):
     def SetColorTransferFunction(self, func):
         self._ColorTransferFunction = func
         self._VolumeProperty.SetColor(func)
+        self._UpdateWatchedObjects()
 
     def GetColorTransferFunction(self):
         return self._ColorTransferFunction
@@ -625,6 +660,7 @@ class VolumeFactory(ActorFactory.ActorFactory):
     def SetOpacityTransferFunction(self, func):
         self._OpacityTransferFunction = func
         self._VolumeProperty.SetScalarOpacity(func)
+        self._UpdateWatchedObjects()
 
     def GetOpacityTransferFunction(self):
         return self._OpacityTransferFunction
@@ -638,6 +674,7 @@ class VolumeFactory(ActorFactory.ActorFactory):
             self._ColorTransferFunction = None
             self._OpacityTransferFunction = None
         self._Volume.SetProperty(property)
+        self._UpdateWatchedObjects()
 
     def GetVolumeProperty(self):
         return self._VolumeProperty
@@ -656,6 +693,11 @@ class VolumeFactory(ActorFactory.ActorFactory):
     def GetVolumeBounds(self):
         return self._VolumeBounds
 
+    def _GetWatchedObjects(self):
+        return (ActorFactory.ActorFactory._GetWatchedObjects(self) +
+                [self._Input, self._LookupTable,
+                 self._ColorTransferFunction, self._OpacityTransferFunction])
+
     def HasChangedSince(self, sinceMTime):
         if (ActorFactory.ActorFactory.HasChangedSince(self, sinceMTime)):
             return 1
@@ -677,6 +719,9 @@ class VolumeFactory(ActorFactory.ActorFactory):
     def GetPickThreshold(self, thresh):
         return self._PickThreshold
 
+    def GetThreadSettings(self):
+        return self._ThreadSettings
+
     def GetPickList(self, event):
         # get a list of PickInformation objects, one for each picked actor
 
@@ -694,8 +739,6 @@ class VolumeFactory(ActorFactory.ActorFactory):
 
         # if we have entrance and exit points,
         if len(picklist) == 2:
-            discardedinfo = None
-
             point1 = picklist[0].position
             point2 = picklist[1].position
             vec = (point2[0] - point1[0],
@@ -715,82 +758,28 @@ class VolumeFactory(ActorFactory.ActorFactory):
                 table = self._LookupTable
                 if table:
                     vol.SetOutValue(self._LookupTable.GetTableRange()[0])
-                    _range = table.GetTableRange()
-                    maxidx = table.GetNumberOfColors() - 1
                 else:
                     return []
 
             if self._PickThreshold > 0.0 and not hitVolume:
-                # cast a ray into the volume from one side
-
-                # get mininum voxel spacing
-                spacing = min(list(map(abs, self._Input.GetSpacing())))
-
-                # get the number of steps required along the length
-                N = int(math.ceil(abs(old_div(pathlength, spacing))))
-                dx, dy, dz = (old_div(vec[0], N), old_div(vec[1], N), old_div(vec[2], N))
-                dr = math.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
-
-                transparency = 1.0
-                x0, y0, z0 = point1
-
-                for i in range(N):
-                    x = x0 + i * dx
-                    y = y0 + i * dy
-                    z = z0 + i * dz
-                    value = vol.FunctionValue(
-                        x + old_div(dx, 2), y + old_div(dy, 2), z + old_div(dz, 2))
-                    if self._OpacityTransferFunction:
-                        alpha = self._OpacityTransferFunction.GetValue(value)
-                    else:
-                        idx = int(round((value - _range[0]) /
-                                        (_range[1] - _range[0]) * maxidx))
-                        if idx < 0:
-                            idx = 0
-                        elif idx > maxidx:
-                            idx = maxidx
-                        alpha = table.GetTableValue(idx)[3]
-                    transparency = transparency * math.pow(1.0 - alpha, dr)
-                    # check if opacity is greater than threshold
-                    if (1.0 - transparency) > self._PickThreshold:
-                        if i != 0:
-                            picklist[0].position = (x, y, z)
-                            gx, gy, gz = vol.FunctionGradient(x, y, z)
-                            picklist[0].normal = (-gx, -gy, -gz)
-                        hitVolume = 1
-                        break
-                    table = self._LookupTable
-                    if discardedinfo:
-                        picklist[0] = discardedinfo
-
-                if hitVolume:
-                    # cast a ray into the volume from the other side
-                    x1, y1, z1 = point2
-                    transparency = 1.0
-                    for i in range(N):
-                        x = x1 - i * dx
-                        y = y1 - i * dy
-                        z = z1 - i * dz
-                        value = vol.FunctionValue(
-                            x - old_div(dx, 2), y - old_div(dy, 2), z - old_div(dz, 2))
-                        if self._OpacityTransferFunction:
-                            alpha = \
-                                self._OpacityTransferFunction.GetValue(value)
-                        else:
-                            idx = int(round((value - _range[0]) /
-                                            (_range[1] - _range[0]) * maxidx))
-                            if idx < 0:
-                                idx = 0
-                            elif idx > maxidx:
-                                idx = maxidx
-                            alpha = table.GetTableValue(idx)[3]
-                        transparency = transparency * math.pow(1.0 - alpha, dr)
-                        if (1.0 - transparency) > self._PickThreshold:
-                            if i != 0:
-                                picklist[1].position = (x, y, z)
-                                gx, gy, gz = vol.FunctionGradient(x, y, z)
-                                picklist[1].normal = (-gx, -gy, -gz)
-                            break
+                query = self._RayQuery
+                query.SetOpacityTransferFunction(
+                    self._OpacityTransferFunction)
+                query.SetLookupTable(self._LookupTable)
+                query.SetPickThreshold(self._PickThreshold)
+                query.SetStepSize(
+                    min(list(map(abs, self._Input.GetSpacing()))))
+
+                # cast a ray into the volume from each side
+                hit = query.CastRay(point1, point2)
+                if hit:
+                    entry, entryNormal, exit, exitNormal = hit
+                    if entry:
+                        picklist[0].position = entry
+                        picklist[0].normal = entryNormal
+                    if exit:
+                        picklist[1].position = exit
+                        picklist[1].normal = exitNormal
                 else:
                     picklist = []
 
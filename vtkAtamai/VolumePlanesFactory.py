@@ -142,14 +142,22 @@ Public Methods:
 from . import ActorFactory
 from . import ClippingCubeFactory
 from . import PaneFrame
+from . import RenderTiming
+from . import TransferFunctionCache
+from . import VolumeRayQuery
 import math
+import numpy as np
 import vtk
+from vtk.util import numpy_support
 
 #======================================
 
 
 class VolumePlanesFactory(ActorFactory.ActorFactory):
 
+    # input and lookup table are watched, see _GetWatchedObjects()
+    _PushModified = 1
+
     def __init__(self):
         ActorFactory.ActorFactory.__init__(self)
 
@@ -211,6 +219,7 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
                         planes.AddItem(bplanes.GetItemAsObject(5))
 
         self._Input = None
+        self._LookupTable = None
 
         # generate the pipeline
         self._ImagePrefilter = vtk.vtkImageShrink3D()
@@ -257,6 +266,9 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
         self._PickThreshold = 0.25
         # the implicit volume for finding the gradient
         self._ImplicitVolume = vtk.vtkImplicitVolume()
+        self._RayQuery = VolumeRayQuery.VolumeRayQuery()
+        self._RayQuery.SetImplicitVolume(self._ImplicitVolume)
+        self._RayQuery.SetModeToSurface()
 
         # the extent of the texture maps
         self._VolumeResolution = (64, 64, 64)
@@ -372,6 +384,7 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
         self.OnRenderEvent(renderer, vtkevent)
 
     # call when orientation changes
+    @RenderTiming.TimedCallback
     def OnRenderEvent(self, renderer, vtkevent):
         VPN = renderer.GetActiveCamera().GetViewPlaneNormal()
         absVPN = list(map(abs, VPN))
@@ -452,28 +465,7 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
                 vtable = self._LookupTable
                 if (oldtable.GetMTime() > table.GetMTime() or
                         vtable.GetMTime() > table.GetMTime() or needupdate):
-                    # map everything with alpha below threshold to transparent
-                    trange = oldtable.GetTableRange()
-                    vrange = vtable.GetTableRange()
-                    n = oldtable.GetNumberOfColors()
-                    m = vtable.GetNumberOfColors()
-                    table.SetTableRange(trange[0], trange[1])
-                    table.SetNumberOfColors(n)
-                    for j in range(n):
-                        r, g, b, a = oldtable.GetTableValue(j)
-                        v = trange[0] + j / (n - 1.0) * (trange[1] - trange[0])
-                        idx = int((v - vrange[0]) / (vrange[
-                                  1] - vrange[0]) * (m - 1.0) + 0.5)
-                        if idx < 0:
-                            idx = 0
-                        if idx > m - 1:
-                            idx = m - 1
-                        vr, vg, vb, va = vtable.GetTableValue(idx)
-                        # vr,vg,vb,va = vtable.GetColor(v)
-                        if va < self._OrthoPickThreshold or j == 0:
-                            table.SetTableValue(j, r, g, b, 0)
-                        else:
-                            table.SetTableValue(j, r, g, b, a)
+                    self._MergeOrthoPlanesLookupTable(table, oldtable, vtable)
 
             transform = self._OrthoPlanes.GetTransform()
             pos = transform.TransformPoint(self._OrthoPlanes.GetOrthoCenter())
@@ -705,6 +697,7 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
         self._ImplicitVolume.GetVolume().Update()
 
         self._Input = input
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def GetInput(self):
@@ -768,6 +761,7 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
         # the lookup table associated with the data
         self._LookupTable = table
         self._ImageMapToColors.SetLookupTable(table)
+        self._UpdateWatchedObjects()
         self.Modified()
 
     def GetLookupTable(self):
@@ -806,6 +800,10 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
     def GetVolumeResolution(self):
         return self._VolumeResolution
 
+    def _GetWatchedObjects(self):
+        return (ActorFactory.ActorFactory._GetWatchedObjects(self) +
+                [self._Input, self._LookupTable])
+
     def HasChangedSince(self, sinceMTime):
         if (ActorFactory.ActorFactory.HasChangedSince(self, sinceMTime)):
             return 1
@@ -821,6 +819,27 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
     def GetPickThreshold(self, thresh):
         return self._PickThreshold
 
+    def _MergeOrthoPlanesLookupTable(self, table, oldtable, vtable):
+        # copy oldtable (from the ortho planes) into table, but map
+        # everything with volume alpha below threshold to transparent
+        cache = TransferFunctionCache.GetTransferFunctionCache()
+        trange = oldtable.GetTableRange()
+        vrange = vtable.GetTableRange()
+        n = oldtable.GetNumberOfColors()
+        m = vtable.GetNumberOfColors()
+        rgba = cache.GetTable(oldtable).GetRGBA().copy()
+        v = trange[0] + np.arange(n) / (n - 1.0) * (trange[1] - trange[0])
+        idx = np.floor((v - vrange[0]) / (vrange[1] - vrange[0]) *
+                       (m - 1.0) + 0.5)
+        idx = np.clip(idx, 0, m - 1).astype(np.intp)
+        va = cache.GetTable(vtable).GetOpacity()[idx]
+        rgba[va < self._OrthoPickThreshold, 3] = 0.0
+        rgba[0, 3] = 0.0
+        table.SetTableRange(trange[0], trange[1])
+        table.SetTable(numpy_support.numpy_to_vtk(
+            np.floor(rgba * 255.0 + 0.5).astype(np.uint8), deep=1,
+            array_type=vtk.VTK_UNSIGNED_CHAR))
+
     def GetPickList(self, event):
         # get a list of PickInformation objects, one for each picked actor
 
@@ -899,66 +918,75 @@ class VolumePlanesFactory(ActorFactory.ActorFactory):
                 table = self._OrthoPlanesLookupTables[0]
             else:
                 table = self._LookupTable
-            range = table.GetTableRange()
-            maxidx = table.GetNumberOfColors() - 1
+            tableRange = table.GetTableRange()
 
-            if self._PickThreshold > 0.0 and not hitVolume:
-                # cast a ray into the volume from one side
+            if self._PickThreshold > 0.0 and not hitVolume and \
+                    not discardedinfo:
+                query = self._RayQuery
+                query.SetLookupTable(self._LookupTable)
+                query.SetPickThreshold(self._PickThreshold)
+                # get mininum voxel spacing
+                query.SetStepSize(
+                    min(list(map(abs, self._Input.GetSpacing()))))
+
+                # cast a ray into the volume from each side
+                hit = query.CastRay(point1, point2)
+                if hit:
+                    entry, entryNormal, exit, exitNormal = hit
+                    if entry:
+                        picklist[0].position = entry
+                        picklist[0].normal = entryNormal
+                    if exit:
+                        picklist[1].position = exit
+                        picklist[1].normal = exitNormal
+                else:
+                    # not tracking surface
+                    picklist = []
+
+            elif self._PickThreshold > 0.0 and not hitVolume:
+                # the first sample is on an ortho plane, which has its
+                # own lookup table, so use the ray query functions
+                query = self._RayQuery
 
                 # get mininum voxel spacing
                 spacing = min(list(map(abs, self._Input.GetSpacing())))
 
                 # get the number of steps required along the length
                 N = int(math.ceil(abs(old_div(pathlength, spacing))))
-                dx, dy, dz = (old_div(vec[0], N), old_div(vec[1], N), old_div(vec[2], N))
-                x0, y0, z0 = point1
-                for i in range(N):
-                    x = x0 + i * dx
-                    y = y0 + i * dy
-                    z = z0 + i * dz
-                    value = vol.FunctionValue(
-                        x + old_div(dx, 2), y + old_div(dy, 2), z + old_div(dz, 2))
-                    idx = int(round((value - range[
-                              0]) / (range[1] - range[0]) * maxidx))
-                    if idx < 0:
-                        idx = 0
-                    elif idx > maxidx:
-                        idx = maxidx
-                    alpha = table.GetTableValue(idx)[3]
-                    # check if alpha is greater than threshold
-                    if alpha > self._PickThreshold:
-                        if i != 0:
-                            picklist[0].position = (x, y, z)
-                            gx, gy, gz = vol.FunctionGradient(x, y, z)
-                            picklist[0].normal = (-gx, -gy, -gz)
-                        hitVolume = 1
-                        break
-                    table = self._LookupTable
-                    if discardedinfo:
-                        picklist[0] = discardedinfo
+                delta = np.array(vec) / N
+                steps = np.outer(np.arange(N), delta)
+
+                # cast a ray into the volume from one side
+                positions = np.array(point1) + steps
+                values = query.SampleVolume(positions + 0.5 * delta)
+                alpha = VolumeRayQuery.LookupTableAlpha(
+                    self._LookupTable, values, tableRange)
+                alpha[0:1] = VolumeRayQuery.LookupTableAlpha(
+                    table, values[0:1], tableRange)
+                i = VolumeRayQuery.FindSurfaceCrossing(
+                    alpha, self._PickThreshold)
+                if i != 0:
+                    picklist[0] = discardedinfo
+                if i is not None:
+                    if i != 0:
+                        picklist[0].position = tuple(positions[i].tolist())
+                        picklist[0].normal = tuple(
+                            query.GetNormals(positions[i:i + 1])[0].tolist())
+                        table = self._LookupTable
+                    hitVolume = 1
 
                 if hitVolume:
                     # cast a ray into the volume from the other side
-                    x1, y1, z1 = point2
-                    for i in range(N):
-                        x = x1 - i * dx
-                        y = y1 - i * dy
-                        z = z1 - i * dz
-                        value = vol.FunctionValue(
-                            x - old_div(dx, 2), y - old_div(dy, 2), z - old_div(dz, 2))
-                        idx = int(round((value - range[
-                                  0]) / (range[1] - range[0]) * maxidx))
-                        if idx < 0:
-                            idx = 0
-                        elif idx > maxidx:
-                            idx = maxidx
-                        alpha = table.GetTableValue(idx)[3]
-                        if alpha > self._PickThreshold:
-                            if i != 0:
-                                picklist[1].position = (x, y, z)
-                                gx, gy, gz = vol.FunctionGradient(x, y, z)
-                                picklist[1].normal = (-gx, -gy, -gz)
-                            break
+                    positions = np.array(point2) - steps
+                    values = query.SampleVolume(positions - 0.5 * delta)
+                    alpha = VolumeRayQuery.LookupTableAlpha(
+                        table, values, tableRange)
+                    i = VolumeRayQuery.FindSurfaceCrossing(
+                        alpha, self._PickThreshold)
+                    if i is not None and i != 0:
+                        picklist[1].position = tuple(positions[i].tolist())
+                        picklist[1].normal = tuple(
+                            query.GetNormals(positions[i:i + 1])[0].tolist())
                 else:
                     # not tracking surface
                     picklist = []
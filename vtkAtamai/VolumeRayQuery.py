@@ -0,0 +1,809 @@
+# =========================================================================
+#
+# Copyright (c) 2000 Atamai, Inc.
+#
+# Use, modification and redistribution of the software, in source or
+# binary forms, are permitted provided that the following terms and
+# conditions are met:
+#
+# 1) Redistribution of the source code, in verbatim or modified
+#    form, must retain the above copyright notice, this license,
+#    the following disclaimer, and any notices that refer to this
+#    license and/or the following disclaimer.
+#
+# 2) Redistribution in binary form must include the above copyright
+#    notice, a copy of this license and the following disclaimer
+#    in the documentation or with other materials provided with the
+#    distribution.
+#
+# 3) Modified copies of the source code must be clearly marked as such,
+#    and must not be misrepresented as verbatim copies of the source code.
+#
+# THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE SOFTWARE "AS IS"
+# WITHOUT EXPRESSED OR IMPLIED WARRANTY INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE.  IN NO EVENT SHALL ANY COPYRIGHT HOLDER OR OTHER PARTY WHO MAY
+# MODIFY AND/OR REDISTRIBUTE THE SOFTWARE UNDER THE TERMS OF THIS LICENSE
+# BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, LOSS OF DATA OR DATA BECOMING INACCURATE
+# OR LOSS OF PROFIT OR BUSINESS INTERRUPTION) ARISING IN ANY WAY OUT OF
+# THE USE OR INABILITY TO USE THE SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGES.
+#
+# =========================================================================
+
+#
+# This file represents a derivative work by Parallax Innovations Inc.
+#
+__rcs_info__ = {
+    #
+    #  Creation Information
+    #
+    'module_name': '$RCSfile: VolumeRayQuery.py,v $',
+    'creator': 'Parallax Innovations Inc.',
+    'project': 'Atamai Surgical Planning',
+    #
+    #  Current Information
+    #
+    'author': '$Author: jeremy_gill $',
+    'version': '$Revision: 1.1 $',
+    'date': '$Date: 2006/06/06 16:59:29 $',
+}
+try:
+    __version__ = __rcs_info__['version'].split(' ')[1]
+except:
+    __version__ = '0.0'
+
+
+"""
+VolumeRayQuery - fast ray casting through a volume for picking
+
+  The volume factories pick by marching along the segment of the pick
+  ray that lies inside the clipping cube, and moving the entry and exit
+  points to where the volume becomes opaque.  This module does the
+  march with numpy instead of calling vtkImplicitVolume once per step:
+  the steps are taken in blocks of a few hundred at a time, and the
+  samples in each block are trilinearly interpolated from a view of the
+  image scalars and mapped to opacity as arrays.  Rays that become
+  opaque are dropped after each block.
+
+  Empty space is skipped with a coarse grid of 8x8x8 voxel bricks that
+  holds the minimum and maximum value within each brick.  The bricks
+  whose whole range is transparent for the current opacity table (or
+  too transparent to pass the threshold, for Surface mode) are never
+  sampled, and the rays are clipped to the box around the bricks that
+  remain.  The grid is built the first time that more than one ray is
+  cast at once, and again whenever the volume is modified.  It needs
+  two values for every 512 voxels.  A single ray costs much less than
+  the grid, so CastRay() uses the grid if it is there but does not
+  build it, and marches the ray on its own with fewer numpy calls.
+
+  There are two ways to decide where the volume becomes opaque:
+
+    Accumulate -- the accumulated opacity along the ray exceeds the
+                  threshold (used by VolumeFactory)
+
+    Surface    -- the opacity of a single sample exceeds the
+                  threshold (used by the VolumePlanesFactories)
+
+  The VolumeRayQuery class can march any number of rays in one call
+  with CastRays(), which returns the entry and exit points and normals
+  as arrays.  The module functions are the building blocks, for
+  factories that need to do something unusual with the samples.
+
+  The results are the same as for the original march: the ray is cut
+  into N = ceil(length/spacing) steps, each step is sampled at its
+  midpoint, and the hit is put at the start of the first opaque step.
+  If the first step is opaque, the end point of the ray is kept as-is
+  (and so is its normal, which the caller got from the clipping cube).
+  The normal is the negated gradient reported by vtkImplicitVolume.
+
+Derived From:
+
+  object
+
+See Also:
+
+  VolumeFactory, VolumePlanesFactory, OldVolumePlanesFactory, EventBenchmark,
+  TransferFunctionCache
+
+Initialization:
+
+  VolumeRayQuery()
+
+Public Methods:
+
+  SetImplicitVolume(*vol*)     -- the vtkImplicitVolume to query, its
+                                  transform and OutValue are used
+
+  SetOpacityTransferFunction(*func*) -- get opacity from a
+                                  vtkPiecewiseFunction
+
+  SetLookupTable(*table*)      -- or from the alpha of a vtkLookupTable
+
+  SetPickThreshold(*t*)        -- the opacity that counts as a hit
+
+  SetModeToAccumulate(), SetModeToSurface()
+                               -- how the threshold is applied
+
+  SetStepSize(*d*)             -- the step size along the rays, the
+                                  default is the smallest voxel spacing
+
+  CastRays(*starts*,*ends*)    -- march along many rays at once, the
+                                  result is a RayHits object
+
+  CastRay(*start*,*end*)       -- march along one ray, returns a tuple
+                                  (entry, entryNormal, exit, exitNormal)
+                                  or None if nothing was hit, the
+                                  points and normals are None where the
+                                  end points of the ray are kept
+
+  SampleVolume(*points*)       -- the volume values at (N,3) points
+
+  GetNormals(*points*)         -- the surface normals at (N,3) points
+
+Module Functions:
+
+  TransformPoints(*transform*,*points*)
+                               -- transform an (N,3) array of points
+
+  SampleImage(*image*,*points*,*outValue*)
+                               -- trilinear interpolation of the first
+                                  scalar component at (N,3) points
+
+  SampleImplicitVolume(*vol*,*points*)
+                               -- vtkImplicitVolume.FunctionValue()
+                                  for (N,3) points
+
+  ImplicitVolumeGradient(*vol*,*points*)
+                               -- vtkImplicitVolume.FunctionGradient()
+                                  for (N,3) points
+
+  PiecewiseFunctionValues(*func*,*values*)
+                               -- vtkPiecewiseFunction.GetValue() for
+                                  an array of values
+
+  LookupTableAlpha(*table*,*values*,*range*=None)
+                               -- the alpha of a vtkLookupTable for an
+                                  array of values
+
+  FindAccumulatedCrossing(*alpha*,*dr*,*threshold*)
+                               -- index where the accumulated opacity
+                                  first exceeds the threshold, or None
+
+  FindSurfaceCrossing(*alpha*,*threshold*)
+                               -- index where the opacity first exceeds
+                                  the threshold, or None
+
+"""
+
+#======================================
+from builtins import object
+import math
+import logging
+
+import numpy as np
+import vtk
+from vtk.util import numpy_support
+
+from . import TransferFunctionCache
+
+logger = logging.getLogger(__name__)
+
+# tolerance for points on the boundary, in voxels
+_Tolerance = 1e-6
+
+# the number of steps to take along each ray before checking for hits,
+# this doubles after each check
+_FirstBlock = 256
+
+# the maximum number of samples per block, small enough to stay in cache
+_MaximumSamples = 1 << 16
+
+#======================================
+
+
+class _ImageSampler(object):
+    # holds a numpy view of an image for repeated sampling
+
+    # the eight corners of a voxel, as (i, j, k) offsets
+    Corners = np.array([[c & 1, (c >> 1) & 1, c >> 2] for c in range(8)])
+
+    # the size of the bricks for empty-space skipping
+    BrickSize = 8
+
+    def __init__(self, image):
+        self.Image = image
+        self._Bricks = None
+        scalars = image.GetPointData().GetScalars()
+        self.MTime = max(image.GetMTime(), scalars.GetMTime())
+        data = numpy_support.vtk_to_numpy(scalars)
+        if data.ndim > 1:
+            data = data[:, 0]
+        self.Data = data
+        dims = np.array(image.GetDimensions())
+        self.Dimensions = dims
+        self.Spacing = np.array(image.GetSpacing())
+        self.Upper = dims - 1.0
+        # the last voxel that has a neighbour along each axis
+        self.MaxBase = np.maximum(dims - 2, 0)
+        # the weights are zero along axes with only one sample
+        self.Varies = (dims > 1) * 1.0
+        self.Increments = np.array([1, dims[0], dims[0] * dims[1]])
+        self.Offsets = (self.Corners * (dims > 1)).dot(self.Increments)
+
+        # the matrix from world coordinates to structured coordinates
+        extent = image.GetExtent()
+        try:
+            m = image.GetPhysicalToIndexMatrix()
+            matrix = np.array([[m.GetElement(i, j) for j in range(4)]
+                               for i in range(3)])
+            d = image.GetDirectionMatrix()
+            self.Oriented = not all(
+                d.GetElement(i, j) == (i == j)
+                for i in range(3) for j in range(3))
+        except AttributeError:
+            matrix = np.zeros((3, 4))
+            matrix[:, 0:3] = np.diag(1.0 / self.Spacing)
+            matrix[:, 3] = -np.array(image.GetOrigin()) / self.Spacing
+            self.Oriented = 0
+        self.Rotation = matrix[:, 0:3].T.copy()
+        self.Translation = matrix[:, 3] - extent[0::2]
+
+    def IsValidFor(self, image):
+        scalars = image.GetPointData().GetScalars()
+        return (image is self.Image and scalars is not None and
+                max(image.GetMTime(), scalars.GetMTime()) == self.MTime)
+
+    def _ToIndex(self, points, affine=None, translate=1):
+        # convert points (or vectors) to structured coordinates, after
+        # applying the affine transform
+        if affine is None:
+            rotation = self.Rotation
+            translation = self.Translation
+        else:
+            rotation = affine[:, 0:3].T.dot(self.Rotation)
+            translation = affine[:, 3].dot(self.Rotation) + self.Translation
+        if translate:
+            return points.dot(rotation) + translation
+        return points.dot(rotation)
+
+    def _Locate(self, points, affine=None):
+        # find the voxel and the interpolation weights for each point,
+        # after applying the affine transform to the points
+        return self._LocateIndex(self._ToIndex(points, affine))
+
+    def _LocateIndex(self, index):
+        # like _Locate(), for points in structured coordinates
+        # like VTK, allow for roundoff at the boundaries
+        inside = ((index >= -_Tolerance) &
+                  (index <= self.Upper + _Tolerance)).all(axis=1)
+        index = index[inside]
+        base = np.clip(np.floor(index), 0, self.MaxBase)
+        weight = np.clip(index - base, 0.0, 1.0) * self.Varies
+        return inside, base.astype(np.intp), weight
+
+    def _Weights(self, weight):
+        # the trilinear weights of the eight corners
+        f = np.stack((1.0 - weight, weight), axis=2)
+        c = self.Corners
+        return (f[:, 0, c[:, 0]] * f[:, 1, c[:, 1]] * f[:, 2, c[:, 2]])
+
+    def _Interpolate(self, base, weight):
+        # index the corners directly, so the volume is never copied
+        flat = base.dot(self.Increments)
+        c = self.Data[flat[:, None] + self.Offsets].astype(np.float64)
+        # interpolate along x, then y, then z, the corners are ordered
+        # so that each of these halves the number of columns
+        for axis in range(3):
+            c = c[:, 0::2] + weight[:, axis, None] * (c[:, 1::2] - c[:, 0::2])
+        return c[:, 0]
+
+    def Sample(self, points, outValue=0.0, affine=None):
+        values = np.full(len(points), outValue, dtype=np.float64)
+        inside, base, weight = self._Locate(points, affine)
+        if len(base):
+            values[inside] = self._Interpolate(base, weight)
+        return values
+
+    def HasBricks(self):
+        return self._Bricks is not None
+
+    def GetBricks(self):
+        # the (min, max) of each brick, built the first time it is needed
+        if self._Bricks is None:
+            self._Bricks = self._BuildBricks()
+        return self._Bricks
+
+    def _BuildBricks(self):
+        # each brick covers BrickSize voxels along each axis, and its
+        # range includes the samples on its far faces so that it covers
+        # everything that can be interpolated within it
+        size = self.BrickSize
+        nx, ny, nz = self.Dimensions
+        data = self.Data.reshape(nz, ny, nx)
+
+        def Reduce(a, axis, n, ufunc):
+            starts = np.arange(0, max(n - 1, 1), size)
+            ends = np.minimum(starts + size, n - 1)
+            return ufunc(ufunc.reduceat(a, starts, axis=axis),
+                         np.take(a, ends, axis=axis))
+
+        # go one slab of bricks at a time, to keep the memory use small
+        low = []
+        high = []
+        for z in range(0, max(nz - 1, 1), size):
+            slab = data[z:min(z + size, nz - 1) + 1]
+            for ufunc, result in ((np.minimum, low), (np.maximum, high)):
+                # reduce the contiguous axes last, when they are small
+                r = Reduce(ufunc.reduce(slab, axis=0), 0, ny, ufunc)
+                result.append(Reduce(r, 1, nx, ufunc))
+        return np.array(low), np.array(high)
+
+    def GetBrickIndices(self, base):
+        # the (k, j, i) brick indices for the voxels found by _Locate()
+        brick = base // self.BrickSize
+        return brick[:, 2], brick[:, 1], brick[:, 0]
+
+    def Gradient(self, points, outGradient=(0.0, 0.0, 1.0), affine=None):
+        gradients = np.empty((len(points), 3))
+        gradients[:] = outGradient
+        inside, base, weight = self._Locate(points, affine)
+        if len(base) == 0:
+            return gradients
+        # the gradient at each corner as computed by vtkImageData,
+        # which is the negative of the central (or one-sided) difference
+        index = base[:, None, :] + self.Corners * (self.Dimensions > 1)
+        flat = index.dot(self.Increments)
+        corners = np.zeros(index.shape)
+        for axis in range(3):
+            if self.Dimensions[axis] == 1:
+                continue
+            i = index[:, :, axis]
+            lo = np.where(i > 0, -1, 0)
+            hi = np.where(i < self.Dimensions[axis] - 1, 1, 0)
+            step = self.Increments[axis]
+            diff = (self.Data[flat + lo * step].astype(np.float64) -
+                    self.Data[flat + hi * step])
+            corners[:, :, axis] = diff / ((hi - lo) * self.Spacing[axis])
+        gradients[inside] = (self._Weights(weight)[:, :, None] *
+                             corners).sum(axis=1)
+        return gradients
+
+#======================================
+
+
+def TransformPoints(transform, points):
+    """Transform an (N, 3) array of points with a vtkAbstractTransform."""
+    inPoints = vtk.vtkPoints()
+    inPoints.SetDataTypeToDouble()
+    inPoints.SetData(numpy_support.numpy_to_vtk(
+        np.ascontiguousarray(points, dtype=np.float64), deep=1))
+    outPoints = vtk.vtkPoints()
+    outPoints.SetDataTypeToDouble()
+    transform.TransformPoints(inPoints, outPoints)
+    return numpy_support.vtk_to_numpy(outPoints.GetData())
+
+
+def SampleImage(image, points, outValue=0.0):
+    """Trilinearly interpolate the first scalar component of an image
+    at an (N, 3) array of points, like vtkImplicitVolume does.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    return _ImageSampler(image).Sample(points, outValue)
+
+
+def _AffineMatrix(transform):
+    # get a linear transform as a (3, 4) array, or None if it is not
+    # linear (the identity is returned for no transform at all)
+    if transform is None:
+        return np.eye(3, 4)
+    if not transform.IsA('vtkLinearTransform'):
+        return None
+    m = transform.GetMatrix()
+    try:
+        matrix = np.array(m.GetData()).reshape(4, 4)
+    except AttributeError:
+        matrix = np.array([[m.GetElement(i, j) for j in range(4)]
+                           for i in range(4)])
+    if (matrix[3] != (0.0, 0.0, 0.0, 1.0)).any():
+        return None
+    return matrix[0:3]
+
+
+def SampleImplicitVolume(vol, points, sampler=None):
+    """Evaluate a vtkImplicitVolume at an (N, 3) array of points."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if sampler is None:
+        sampler = _ImageSampler(vol.GetVolume())
+    affine = _AffineMatrix(vol.GetTransform())
+    if affine is None:
+        points = TransformPoints(vol.GetTransform(), points)
+    return sampler.Sample(points, vol.GetOutValue(), affine)
+
+
+def ImplicitVolumeGradient(vol, points, sampler=None):
+    """Evaluate the gradient of a vtkImplicitVolume at (N, 3) points."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if sampler is None:
+        sampler = _ImageSampler(vol.GetVolume())
+    affine = _AffineMatrix(vol.GetTransform())
+    if sampler.Oriented or affine is None:
+        # not worth vectorizing, there are only a few hit points
+        return np.array([vol.FunctionGradient(*p) for p in points.tolist()])
+    # the chain rule, as in vtkImplicitFunction::FunctionGradient()
+    return sampler.Gradient(points, vol.GetOutGradient(),
+                            affine).dot(affine[:, 0:3])
+
+
+def PiecewiseFunctionValues(func, values):
+    """Evaluate a vtkPiecewiseFunction at an array of values."""
+    return TransferFunctionCache.MapOpacity(func, values)
+
+
+def LookupTableAlpha(table, values, range=None):
+    """Get the alpha from a vtkLookupTable for an array of values.
+
+    The values are mapped to table indices with the given range, which
+    is the range of the table by default.
+    """
+    return TransferFunctionCache.MapOpacity(table, values, range)
+
+
+def FindAccumulatedCrossing(alpha, dr, threshold):
+    """Find the first sample where the accumulated opacity exceeds the
+    threshold, given the opacity of each sample and the step length.
+    """
+    transparency = np.cumprod(np.power(1.0 - alpha, dr))
+    hits = np.flatnonzero(1.0 - transparency > threshold)
+    if len(hits) == 0:
+        return None
+    return int(hits[0])
+
+
+def FindSurfaceCrossing(alpha, threshold):
+    """Find the first sample whose opacity exceeds the threshold."""
+    hits = np.flatnonzero(np.asarray(alpha) > threshold)
+    if len(hits) == 0:
+        return None
+    return int(hits[0])
+
+#======================================
+
+
+class RayHits(object):
+
+    """The result of VolumeRayQuery.CastRays(), for M rays.
+
+    hit         -- (M,) bool, whether the volume was hit at all
+
+    entry, exit -- (M, 3) hit positions, these are the end points of
+                   the ray if nothing was hit or if the first step was
+                   already opaque
+
+    entryNormal, exitNormal -- (M, 3) normals at the hit positions,
+                   NaN where the end points of the ray were kept
+
+    moved       -- (M, 2) bool, whether entry and exit were moved
+    """
+
+    def __init__(self, starts, ends):
+        m = len(starts)
+        self.hit = np.zeros(m, dtype=bool)
+        self.entry = np.array(starts, dtype=np.float64)
+        self.exit = np.array(ends, dtype=np.float64)
+        self.entryNormal = np.full((m, 3), np.nan)
+        self.exitNormal = np.full((m, 3), np.nan)
+        self.moved = np.zeros((m, 2), dtype=bool)
+
+    def __len__(self):
+        return len(self.hit)
+
+#======================================
+
+
+class VolumeRayQuery(object):
+
+    def __init__(self):
+        self._ImplicitVolume = None
+        self._OpacityTransferFunction = None
+        self._LookupTable = None
+        self._PickThreshold = 0.99
+        self._Accumulate = 1
+        self._StepSize = None
+        self._Sampler = None
+        self._VisibleBricks = None
+        self._VisibleBricksKey = None
+        self._VisibleBox = None
+
+    def SetImplicitVolume(self, vol):
+        self._ImplicitVolume = vol
+
+    def GetImplicitVolume(self):
+        return self._ImplicitVolume
+
+    def SetOpacityTransferFunction(self, func):
+        self._OpacityTransferFunction = func
+
+    def GetOpacityTransferFunction(self):
+        return self._OpacityTransferFunction
+
+    def SetLookupTable(self, table):
+        self._LookupTable = table
+
+    def GetLookupTable(self):
+        return self._LookupTable
+
+    def SetPickThreshold(self, threshold):
+        self._PickThreshold = threshold
+
+    def GetPickThreshold(self):
+        return self._PickThreshold
+
+    def SetModeToAccumulate(self):
+        self._Accumulate = 1
+
+    def SetModeToSurface(self):
+        self._Accumulate = 0
+
+    def GetMode(self):
+        return self._Accumulate and 'Accumulate' or 'Surface'
+
+    def SetStepSize(self, step):
+        self._StepSize = step
+
+    def GetStepSize(self):
+        if self._StepSize:
+            return self._StepSize
+        return min(list(map(abs, self._ImplicitVolume.GetVolume().GetSpacing())))
+
+    def _GetSampler(self):
+        image = self._ImplicitVolume.GetVolume()
+        if self._Sampler is None or not self._Sampler.IsValidFor(image):
+            self._Sampler = _ImageSampler(image)
+        return self._Sampler
+
+    def SampleVolume(self, points):
+        """Get the values of the implicit volume at (N, 3) points."""
+        return SampleImplicitVolume(self._ImplicitVolume, points,
+                                    self._GetSampler())
+
+    def GetNormals(self, points):
+        """Get the surface normals at (N, 3) points."""
+        return -ImplicitVolumeGradient(self._ImplicitVolume, points,
+                                       self._GetSampler())
+
+    def _Opacity(self, values):
+        if self._OpacityTransferFunction:
+            return PiecewiseFunctionValues(self._OpacityTransferFunction,
+                                           values)
+        return LookupTableAlpha(self._LookupTable, values)
+
+    def _GetVisibleBricks(self, sampler):
+        # the bricks that have values that can stop the ray, the others
+        # can be skipped because their opacity makes no difference
+        func = self._OpacityTransferFunction or self._LookupTable
+        table = TransferFunctionCache.GetTransferFunctionCache().GetTable(func)
+        threshold = 0.0
+        if not self._Accumulate:
+            threshold = self._PickThreshold
+        key = (sampler, table, threshold)
+        if self._VisibleBricksKey != key:
+            low, high = sampler.GetBricks()
+            visible = table.IsOpaqueInRange(low, high, threshold)
+            self._VisibleBricks = visible
+            self._VisibleBricksKey = key
+            # the box around the visible bricks, in structured coords
+            self._VisibleBox = None
+            if visible.any():
+                size = sampler.BrickSize
+                k, j, i = np.nonzero(visible)
+                low = np.array([i.min(), j.min(), k.min()]) * size
+                high = (np.array([i.max(), j.max(), k.max()]) + 1) * size
+                self._VisibleBox = (low, np.minimum(high, sampler.Upper))
+        return self._VisibleBricks
+
+    def _ClipRays(self, starts, directions, steps, bricks):
+        # find the range of steps along each ray that passes through
+        # the box around the visible bricks, the rest can be skipped
+        begin = np.zeros(len(steps), dtype=np.intp)
+        end = steps.copy()
+        if not bricks:
+            return begin, end
+        vol = self._ImplicitVolume
+        affine = _AffineMatrix(vol.GetTransform())
+        threshold = 0.0
+        if not self._Accumulate:
+            threshold = self._PickThreshold
+        if affine is None or \
+                self._Opacity([vol.GetOutValue()])[0] > threshold:
+            # can't skip anything if outside the volume is opaque
+            return begin, end
+        sampler = self._GetSampler()
+        self._GetVisibleBricks(sampler)
+        if self._VisibleBox is None:
+            return begin, begin
+        low, high = self._VisibleBox
+        origin = sampler._ToIndex(starts, affine)
+        vec = sampler._ToIndex(directions, affine, translate=0)
+        # intersect the rays with the slabs that make up the box
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t0 = (low - origin) / vec
+            t1 = (high - origin) / vec
+        inside = (origin >= low) & (origin <= high)
+        parallel = (vec == 0)
+        near = np.where(parallel, np.where(inside, -np.inf, np.inf),
+                        np.minimum(t0, t1)).max(axis=1)
+        far = np.where(parallel, np.where(inside, np.inf, -np.inf),
+                       np.maximum(t0, t1)).min(axis=1)
+        # step i is sampled at i + 0.5, and allow for roundoff
+        begin = np.clip(np.floor(near - 0.5) - 1, 0, steps).astype(np.intp)
+        end = np.clip(np.ceil(far - 0.5) + 2, 0, steps).astype(np.intp)
+        end[near > far] = 0
+        return begin, np.maximum(begin, end)
+
+    def _SampleOpacity(self, points, bricks):
+        # the opacity at (N, 3) points, if bricks is set then only the
+        # points that are in visible bricks are interpolated
+        vol = self._ImplicitVolume
+        sampler = self._GetSampler()
+        affine = _AffineMatrix(vol.GetTransform())
+        if affine is None:
+            points = TransformPoints(vol.GetTransform(), points)
+        inside, base, weight = sampler._Locate(points, affine)
+        alpha = np.empty(len(points))
+        if len(base) < len(points):
+            alpha[~inside] = self._Opacity([vol.GetOutValue()])[0]
+        if not bricks:
+            alpha[inside] = self._Opacity(sampler._Interpolate(base, weight))
+            return alpha
+        visible = self._GetVisibleBricks(sampler)
+        keep = visible[sampler.GetBrickIndices(base)]
+        inner = np.zeros(len(base))
+        if keep.any():
+            inner[keep] = self._Opacity(
+                sampler._Interpolate(base[keep], weight[keep]))
+        alpha[inside] = inner
+        return alpha
+
+    def _MarchRay(self, start, direction, steps, affine):
+        # _March() for a single ray without the brick grid, the samples
+        # are placed directly in structured coordinates to keep the
+        # number of numpy calls per block small
+        sampler = self._GetSampler()
+        origin = sampler._ToIndex(start, affine)
+        vec = sampler._ToIndex(direction, affine, translate=0)
+        dr = math.sqrt(direction.dot(direction))
+        outAlpha = self._Opacity([self._ImplicitVolume.GetOutValue()])[0]
+        transparency = 1.0
+        position = 0
+        block = _FirstBlock
+        while position < steps:
+            n = min(block, _MaximumSamples, steps - position)
+            i = np.arange(position + 0.5, position + n)
+            inside, base, weight = sampler._LocateIndex(
+                origin + i[:, None] * vec)
+            alpha = np.full(n, outAlpha)
+            if len(base):
+                alpha[inside] = self._Opacity(
+                    sampler._Interpolate(base, weight))
+            if self._Accumulate:
+                t = transparency * np.cumprod(np.power(1.0 - alpha, dr))
+                transparency = t[-1]
+                opaque = np.flatnonzero((1.0 - t) > self._PickThreshold)
+            else:
+                opaque = np.flatnonzero(alpha > self._PickThreshold)
+            if len(opaque):
+                return position + int(opaque[0])
+            position = position + n
+            block = 2 * block
+        return -1
+
+    def _March(self, starts, directions, steps, bricks=1):
+        # the index of the first opaque step along each ray, or -1,
+        # the steps are done in blocks so that rays that hit early
+        # are dropped early
+        m = len(starts)
+        if m == 1 and not bricks:
+            affine = _AffineMatrix(self._ImplicitVolume.GetTransform())
+            if affine is not None:
+                return np.array([self._MarchRay(starts[0], directions[0],
+                                                int(steps[0]), affine)])
+        first = np.full(m, -1, dtype=np.intp)
+        transparency = np.ones(m)
+        dr = np.sqrt((directions ** 2).sum(axis=1))
+        # skip the steps that are outside of the visible bricks
+        position, end = self._ClipRays(starts, directions, steps, bricks)
+        active = np.flatnonzero(position < end)
+        block = _FirstBlock
+        while len(active):
+            start = position[active]
+            count = end[active] - start
+            n = min(block, _MaximumSamples // len(active), int(count.max()))
+            n = max(n, 1)
+            j = np.arange(n)
+            valid = j[None, :] < count[:, None]
+            # sample the middle of each step
+            i = start[:, None] + j[None, :]
+            points = starts[active, None, :] + \
+                (i[:, :, None] + 0.5) * directions[active, None, :]
+            if valid.all():
+                alpha = self._SampleOpacity(
+                    points.reshape(-1, 3), bricks).reshape(len(active), n)
+            else:
+                alpha = np.zeros((len(active), n))
+                alpha[valid] = self._SampleOpacity(points[valid], bricks)
+            if self._Accumulate:
+                t = transparency[active, None] * np.cumprod(
+                    np.power(1.0 - alpha, dr[active, None]), axis=1)
+                transparency[active] = t[:, -1]
+                opaque = (1.0 - t) > self._PickThreshold
+            else:
+                opaque = alpha > self._PickThreshold
+            opaque &= valid
+            found = opaque.any(axis=1)
+            first[active[found]] = start[found] + \
+                np.argmax(opaque[found], axis=1)
+            position[active] = start + n
+            active = active[~found & (count > n)]
+            block = 2 * block
+        return first
+
+    def CastRays(self, starts, ends):
+        """March along the rays from starts to ends, (M, 3) arrays."""
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 3)
+        hits = RayHits(starts, ends)
+        if len(starts) == 0:
+            return hits
+
+        vec = ends - starts
+        lengths = np.sqrt((vec ** 2).sum(axis=1))
+        # empty rays are hits with nothing moved
+        hits.hit[lengths == 0] = 1
+        rays = np.flatnonzero(lengths > 0)
+        if len(rays) == 0:
+            return hits
+
+        steps = np.ceil(lengths[rays] / self.GetStepSize()).astype(np.intp)
+        directions = vec[rays] / steps[:, None]
+
+        # building the brick grid costs more than a single ray saves
+        bricks = len(rays) > 1 or self._GetSampler().HasBricks()
+
+        # the march from the other side is only needed for hits
+        first = self._March(starts[rays], directions, steps, bricks)
+        hit = first >= 0
+        hits.hit[rays] = hit
+        rays, steps, directions, first = \
+            rays[hit], steps[hit], directions[hit], first[hit]
+        last = self._March(ends[rays], -directions, steps, bricks)
+
+        # the hit is at the start of the first opaque step
+        for j, (points, side, normal, index, sign) in enumerate((
+                (starts, hits.entry, hits.entryNormal, first, 1.0),
+                (ends, hits.exit, hits.exitNormal, last, -1.0))):
+            moved = index > 0
+            rows = rays[moved]
+            if len(rows):
+                side[rows] = points[rows] + \
+                    sign * index[moved, None] * directions[moved]
+                normal[rows] = self.GetNormals(side[rows])
+                hits.moved[rows, j] = 1
+        return hits
+
+    def CastRay(self, start, end):
+        """March along a single ray, see CastRays()."""
+        hits = self.CastRays([start], [end])
+        if not hits.hit[0]:
+            return None
+        result = []
+        for j, (side, normal) in enumerate(((hits.entry, hits.entryNormal),
+                                            (hits.exit, hits.exitNormal))):
+            if hits.moved[0, j]:
+                result.append(tuple(side[0].tolist()))
+                result.append(tuple(normal[0].tolist()))
+            else:
+                result.append(None)
+                result.append(None)
+        return tuple(result)
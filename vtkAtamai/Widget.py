@@ -124,10 +124,17 @@ Protected Members:
 
   _Widgets                     -- list of child widgets
 
+  _DirtyListeners              -- the parent widget or RenderPane, which is
+                                  told whenever this widget is modified
+
   _CurrentWidget               -- the child widget under the mouse
 
   _FocusWidget                 -- the widget receiving events
 
+  _WidgetIndex                 -- SpatialIndex for finding the child widget
+                                  under the mouse, rebuilt when the child
+                                  geometry changes
+
   _Renderer                    -- renderer for this widget
 
   _Actors                      -- the 2D actors inside the renderer
@@ -142,12 +149,16 @@ Protected Members:
 
 #======================================
 from .EventHandler import *
+from . import SpatialIndex
 import vtk
 
 
 #======================================
 class Widget(EventHandler):
 
+    # HasChangedSince() is covered by Modified(), see ActorFactory
+    _PushModified = 1
+
     def __init__(self, parent=None, x=0, y=0, width=0, height=0,
                  rx=0.0, ry=0.0, rwidth=0.0, rheight=0.0,
                  background=(0.75, 0.75, 0.75), foreground=(0.0, 0.0, 0.0)):
@@ -157,6 +168,9 @@ class Widget(EventHandler):
         # Store the modified time
         self._MTime = vtk.vtkObject()
 
+        # the parent that is told when we are modified
+        self._DirtyListeners = []
+
         # the basic allowed flags
         self._Config = {'x': x,
                         'y': y,
@@ -173,6 +187,7 @@ class Widget(EventHandler):
         self._Widgets = []
         self._CurrentWidget = None
         self._FocusWidget = None
+        self._WidgetIndex = None
 
         # the renderer that these widgets are located in
         self._Renderer = None
@@ -220,18 +235,49 @@ class Widget(EventHandler):
 
     def Modified(self):
         self._MTime.Modified()
+        self._MarkDirty()
+
+    def _MarkDirty(self):
+        # push the modification up to the RenderPane
+        for listener in self._DirtyListeners:
+            listener._MarkDirty()
+
+    def _AddDirtyListener(self, listener):
+        if listener not in self._DirtyListeners:
+            self._DirtyListeners.append(listener)
+
+    def _InvalidateWidgetIndex(self):
+        # called by a child widget when its geometry changes
+        self._WidgetIndex = None
+
+    def _FindWidget(self, event):
+        # find the child widget under the mouse
+        if self._WidgetIndex is None:
+            self._WidgetIndex = SpatialIndex.GridIndex()
+            self._WidgetIndex.Build(
+                [(w, SpatialIndex.GetWidgetRect(w)) for w in self._Widgets])
+        return self._WidgetIndex.Find(event.x, event.y,
+                                      lambda w: w.IsInWidget(event))
+
+    def _RemoveDirtyListener(self, listener):
+        if listener in self._DirtyListeners:
+            self._DirtyListeners.remove(listener)
 
     #--------------------------------------
     def AddWidget(self, widget):
         self._Widgets.append(widget)
         if self._Renderer:
             widget.AddToRenderer(self._Renderer)
+        widget._AddDirtyListener(self)
+        self._WidgetIndex = None
         self.Modified()
 
     def RemoveWidget(self, widget):
         if self._Renderer:
             widget.RemoveFromRenderer(self._Render)
         self._Widgets.remove(widget)
+        widget._RemoveDirtyListener(self)
+        self._WidgetIndex = None
         self.Modified()
 
     #--------------------------------------
@@ -250,16 +296,12 @@ class Widget(EventHandler):
                 widget.ConfigureGeometry(self._DisplayOrigin,
                                          self._DisplaySize)
                 widget.HandleEvent(event)
+            self._WidgetIndex = None
             return EventHandler.HandleEvent(self, event)
 
-        # set current widget to the one under the mouse
+        # set current widget to the one under the mouse (or None)
         if event.type in ('4', '5', '6', '7', '8'):
-            for widget in self._Widgets:
-                if widget.IsInWidget(event):
-                    newCurrentWidget = widget
-                    break
-            else:  # or None if not over any widget
-                newCurrentWidget = None
+            newCurrentWidget = self._FindWidget(event)
 
             # check to see if the focus should be changed
             if (newCurrentWidget != self._FocusWidget and
@@ -275,12 +317,9 @@ class Widget(EventHandler):
                  self._CurrentWidget != newCurrentWidget) or
                     self._FocusWidget != newFocusWidget):
                 if self._FocusWidget:
-                    # make a copy of the current event
-                    e = Event()
-                    for attr in dir(event):
-                        setattr(e, attr, getattr(event, attr))
-                    # but change the type to 'Leave'
-                    e.type = '8'  # 'Leave'
+                    # make a copy of the current event, but change
+                    # the type to 'Leave'
+                    e = DeriveEvent(event, '8')
                     # and pass to the widget
                     self._FocusWidget.HandleEvent(e)
 
@@ -289,12 +328,9 @@ class Widget(EventHandler):
                  self._CurrentWidget != newCurrentWidget) or
                     self._FocusWidget != newFocusWidget):
                 if newFocusWidget:
-                    # make a copy of the current event
-                    e = Event()
-                    for attr in dir(event):
-                        setattr(e, attr, getattr(event, attr))
-                    # but change the type to 'Enter'
-                    e.type = '7'  # 'Enter'
+                    # make a copy of the current event, but change
+                    # the type to 'Enter'
+                    e = DeriveEvent(event, '7')
                     # and pass to the widget
                     newFocusWidget.HandleEvent(e)
 
@@ -319,6 +355,13 @@ class Widget(EventHandler):
 
         return (x >= 0 and y >= 0 and x < width and y < height)
 
+    def _GetHitRect(self):
+        # the (xmin, ymin, xmax, ymax) rectangle used by IsInWidget(),
+        # this must be overridden along with IsInWidget()
+        x0, y0 = self._DisplayOrigin
+        width, height = self._DisplaySize
+        return (x0, y0, x0 + width, y0 + height)
+
     #--------------------------------------
     def AddToRenderer(self, renderer):
         self._Renderer = renderer
@@ -377,6 +420,11 @@ class Widget(EventHandler):
         self._DisplayOrigin = (x + x0, y + y0)
         self._DisplaySize = (w, h)
 
+        # our parent must re-index its widgets, and so must we
+        self._WidgetIndex = None
+        for listener in self._DirtyListeners:
+            listener._InvalidateWidgetIndex()
+
     #--------------------------------------
     def Configure(self, **kw):
         keys = list(kw.keys())
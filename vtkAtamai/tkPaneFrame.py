@@ -238,11 +238,10 @@ class tkPaneFrame(PaneFrame, tkinter.Widget):
         raise AttributeError(attr)
 
     def OnButtonPress(self, event):
-        self._RenderWindow.SetDesiredUpdateRate(5.0)
+        # the update rate is set by the LODController
         self.ConvertTkEvent(event)
 
     def OnButtonRelease(self, event):
-        self._RenderWindow.SetDesiredUpdateRate(0.0001)
         self.ConvertTkEvent(event)
 
     def ConvertTkEvent(self, event):
@@ -265,7 +264,7 @@ class tkPaneFrame(PaneFrame, tkinter.Widget):
             self.__InExpose = 1
             self.update()
             for pane in self._RenderPanes:
-                if pane.HasChangedSince(pane.GetRenderTime()):
+                if pane.NeedsRender():
                     pane.StartRender()
             self._RenderWindow.Render()
             self.__InExpose = 0
@@ -103,6 +103,9 @@ class EventTimer(wx.Timer):
 # ======================================
 class wxPaneFrame(PaneFrame.PaneFrame, baseClass):
 
+    # the wx.Timer for each ScheduleOnce() or ScheduleEvery() id
+    _Timers = {}
+
     # convert event types
     EvtType = {
         wx.EVT_CHAR.typeId: '2',
@@ -495,13 +498,39 @@ class wxPaneFrame(PaneFrame.PaneFrame, baseClass):
         wx.EVT_SET_FOCUS(self, self.ConvertFocusEvent)
         wx.EVT_KILL_FOCUS(self, self.ConvertFocusEvent)
 
+    def ScheduleOnce(self, millisecs, func):
+        # the PaneFrame scheduler is not driven by the wx main loop,
+        # so each scheduled function gets a wx.Timer of its own
+        return self._StartTimer(millisecs, func, True)
+
     def ScheduleEvery(self, millisecs, func):
         # schedule the specified function to be called each time the
         # specified number of milliseconds has elapsed
-
-        timer = EventTimer(func)
-        timer.Start(millisecs, False)
-        return timer
+        return self._StartTimer(millisecs, func, False)
+
+    def _StartTimer(self, millisecs, func, oneShot):
+        id = PaneFrame.PaneFrame._ScheduleId = \
+            PaneFrame.PaneFrame._ScheduleId + 1
+        if oneShot:
+            def Fire(id=id, func=func):
+                wxPaneFrame._Timers.pop(id, None)
+                func()
+        else:
+            Fire = func
+        timer = EventTimer(Fire)
+        wxPaneFrame._Timers[id] = timer
+        timer.Start(millisecs, oneShot)
+        return id
+
+    def UnSchedule(self, id):
+        timer = wxPaneFrame._Timers.pop(id, None)
+        if timer is not None:
+            timer.Stop()
+
+    def _ScheduleMotionFlush(self):
+        # CallAfter runs once the pending mouse events have been
+        # delivered, which is sooner than a timer
+        wx.CallAfter(self.FlushPendingMotion)
 
     def _CursorChangedEvent(self, obj, evt):
         """Change the wx cursor if the renderwindow's cursor was
@@ -566,12 +595,6 @@ class wxPaneFrame(PaneFrame.PaneFrame, baseClass):
         # this will check for __handle
         self.Render()
 
-    def cancelTimers(self):
-        # make sure timers get cancelled
-        if self._QualityRenderId is not None:
-            self._QualityRenderId.Destroy()
-            self._QualityRenderId = None
-
     def OnButtonDClick(self, event):
 
         event.Skip()
@@ -611,8 +634,6 @@ class wxPaneFrame(PaneFrame.PaneFrame, baseClass):
         # we do it this early in case any of the following VTK code
         # raises an exception.
 
-        # JDG
-        self._RenderWindow.SetDesiredUpdateRate(5)
         event.Skip()
 
         ctrl, shift = event.ControlDown(), event.ShiftDown()